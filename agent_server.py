@@ -0,0 +1,277 @@
+# agent_server.py
+"""Headless agent service: runs many Society of Mind research sessions at once.
+
+Tasks come in over HTTP (or from a JSONL file at startup), wait in a queue and are run by
+`--max-sessions` workers. Every session gets its own agent graph and coder work dir; the
+manager instructions are verified by the AVS once per distinct text and reused. Model calls
+and scrapes are capped process-wide (MAX_CONCURRENT_LLM_REQUESTS / MAX_CONCURRENT_SCRAPES).
+
+    POST /sessions               {"task": "...", "manager_instructions": "..." (optional)}
+    GET  /sessions               all sessions
+    GET  /sessions/{id}          status and result
+    GET  /sessions/{id}/events   progress as server-sent events (history, then live)
+
+    python agent_server.py --port 8100 --max-sessions 8
+"""
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+FINISHED = ("done", "failed", "rejected")
+EVENT_CONTENT_CHARS = 500
+
+class Session:
+    """One research task: its status, result and progress events"""
+    def __init__(self, task, manager_instructions):
+        self.id = uuid.uuid4().hex[:12]
+        self.task = task
+        self.manager_instructions = manager_instructions
+        self.status = "queued"
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.events = []
+        self.changed = asyncio.Event()
+
+    def to_json(self):
+        return {
+            "id": self.id,
+            "task": self.task,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "events": len(self.events),
+        }
+
+class AgentServer:
+    """aiohttp front end and asyncio scheduler; sessions themselves run in worker threads"""
+    def __init__(self, max_sessions=4, work_dir="coding", skip_verification=False):
+        self.max_sessions = max_sessions
+        self.work_dir = work_dir
+        self.skip_verification = skip_verification
+        self.sessions = {}
+        self.queue = None
+        self.loop = None
+        self.pool = ThreadPoolExecutor(max_workers=max_sessions, thread_name_prefix="session")
+        self.verdicts = {}  # manager instructions -> Future of the AVS verdict
+        self.verify_lock = threading.Lock()
+        self.app = web.Application()
+        self.app.add_routes([
+            web.post('/sessions', self.handle_create),
+            web.get('/sessions', self.handle_list),
+            web.get('/sessions/{id}', self.handle_get),
+            web.get('/sessions/{id}/events', self.handle_events),
+        ])
+        self.app.on_startup.append(self._start_workers)
+
+    # --- API ---
+
+    async def handle_create(self, request):
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({'error': 'invalid json'}, status=400)
+        if not isinstance(data, dict) or not isinstance(data.get('task'), str) or not data['task'].strip():
+            return web.json_response({'error': 'expected {"task": "..."}'}, status=400)
+        session = self.submit(data['task'], data.get('manager_instructions'))
+        return web.json_response(session.to_json(), status=202)
+
+    async def handle_list(self, request):
+        return web.json_response([session.to_json() for session in self.sessions.values()])
+
+    async def handle_get(self, request):
+        session = self.sessions.get(request.match_info['id'])
+        if session is None:
+            return web.json_response({'error': 'unknown session'}, status=404)
+        return web.json_response(session.to_json())
+
+    async def handle_events(self, request):
+        session = self.sessions.get(request.match_info['id'])
+        if session is None:
+            return web.json_response({'error': 'unknown session'}, status=404)
+        response = web.StreamResponse(headers={'Content-Type': 'text/event-stream', 'Cache-Control': 'no-cache'})
+        await response.prepare(request)
+        sent = 0
+        while True:
+            changed = session.changed
+            for event in session.events[sent:]:
+                await response.write(f"event: {event['type']}\ndata: {json.dumps(event)}\n\n".encode())
+            sent = len(session.events)
+            if session.status in FINISHED:
+                return response
+            await changed.wait()
+
+    # --- scheduling ---
+
+    def submit(self, task, manager_instructions=None):
+        """Queues a task; must be called on the server's event loop"""
+        from agents import manager_instructions as default_instructions
+        session = Session(task, manager_instructions or default_instructions)
+        self.sessions[session.id] = session
+        self._append(session, {"type": "queued", "time": time.time(), "queued": self.queue.qsize()})
+        self.queue.put_nowait(session)
+        return session
+
+    async def _start_workers(self, app):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.workers = [asyncio.create_task(self._worker()) for _ in range(self.max_sessions)]
+
+    async def _worker(self):
+        while True:
+            session = await self.queue.get()
+            try:
+                await self.loop.run_in_executor(self.pool, self._run_session, session)
+            except Exception as e:
+                logger.exception(f"Session {session.id} failed")
+                self._finish(session, "failed", error=str(e))
+
+    def _run_session(self, session):
+        """Runs in a worker thread"""
+        from autogen import UserProxyAgent
+        from agents import create_society_of_mind_agent
+        from concurrent_tools import limit_llm_requests, limited, llm_slots
+
+        self._emit(session, "verifying")
+        verdict = self._verify(session.manager_instructions)
+        if not verdict:
+            reason = "no AVS verdict in time" if verdict is None else "manager instructions rejected by the AVS"
+            self._finish(session, "rejected", error=reason)
+            return
+
+        started = time.monotonic()
+        self._emit(session, "started")
+        # a fresh agent graph per session; only the process-wide caches and limits are shared
+        agent = create_society_of_mind_agent(session.manager_instructions, work_dir=os.path.join(self.work_dir, session.id))
+        for member in [agent, agent.chat_manager, *agent._group_chat.agents]:
+            limit_llm_requests(member)
+        # the final answer is written by a direct client call, not a reply function
+        agent.response_preparer = limited(llm_slots, agent.response_preparer)
+        # the chat manager only rebroadcasts, so hooking the speakers sees every message once
+        for member in [agent, *agent._group_chat.agents]:
+            member.register_hook("process_message_before_send", self._progress_hook(session))
+        # SocietyOfMindAgent prints and swallows errors of the inner group chat, so record them on the way out
+        inner_errors = []
+        run_inner_chat = agent.initiate_chat
+        def recording_inner_chat(*args, **kwargs):
+            try:
+                return run_inner_chat(*args, **kwargs)
+            except Exception as e:
+                inner_errors.append(e)
+                raise
+        agent.initiate_chat = recording_inner_chat
+        requester = UserProxyAgent(
+            name="requester",
+            human_input_mode="NEVER",
+            code_execution_config=False,
+            default_auto_reply="",
+            is_termination_msg=lambda x: True,
+        )
+        chat = requester.initiate_chat(agent, message=session.task, max_turns=1, silent=True)
+        seconds = round(time.monotonic() - started, 1)
+        if inner_errors:
+            self._finish(session, "failed", error=f"group chat failed: {inner_errors[0]!r}", seconds=seconds)
+            return
+        if len(agent._group_chat.messages) < 2:
+            # nothing beyond the task itself: the group chat never got going
+            self._finish(session, "failed", error="group chat produced no replies", seconds=seconds)
+            return
+        result = chat.chat_history[-1].get("content") if chat.chat_history else None
+        self._finish(session, "done", result=result, seconds=seconds)
+
+    def _verify(self, manager_instructions):
+        if self.skip_verification:
+            return True
+        # one AVS round trip per distinct text: sessions with the same instructions share its future,
+        # different instructions verify in parallel
+        with self.verify_lock:
+            verdict = self.verdicts.get(manager_instructions)
+            owner = verdict is None
+            if owner:
+                verdict = self.verdicts[manager_instructions] = Future()
+        if owner:
+            from agents import verify_manager_instructions
+            try:
+                result = verify_manager_instructions(manager_instructions)
+            except Exception as e:
+                result = e
+            if result is None or isinstance(result, Exception):
+                # no verdict is not cached: the next session asks again
+                with self.verify_lock:
+                    self.verdicts.pop(manager_instructions, None)
+            if isinstance(result, Exception):
+                verdict.set_exception(result)
+            else:
+                verdict.set_result(result)
+        return verdict.result()
+
+    def _progress_hook(self, session):
+        def hook(sender, message, recipient, silent):
+            content = message.get("content") if isinstance(message, dict) else message
+            event = {"sender": sender.name, "recipient": recipient.name}
+            if isinstance(message, dict) and message.get("tool_calls"):
+                event["tool_calls"] = [call.get("function", {}).get("name") for call in message["tool_calls"]]
+            if isinstance(content, str):
+                event["content"] = content[:EVENT_CONTENT_CHARS]
+            self._emit(session, "message", **event)
+            return message
+        return hook
+
+    # --- progress ---
+
+    def _emit(self, session, event_type, **data):
+        """Thread-safe: records a progress event and wakes the session's event streams"""
+        event = {"type": event_type, "time": time.time(), **data}
+        self.loop.call_soon_threadsafe(self._append, session, event)
+
+    def _finish(self, session, status, **data):
+        def finish():
+            session.status = status
+            session.result = data.get("result")
+            session.error = data.get("error")
+            self._append(session, {"type": status, "time": time.time(), **data})
+        self.loop.call_soon_threadsafe(finish)
+
+    def _append(self, session, event):
+        session.events.append(event)
+        if event["type"] in ("started", "verifying"):
+            session.status = "running" if event["type"] == "started" else "verifying"
+        # wake everyone waiting on this session, then arm a new event for the next change
+        changed, session.changed = session.changed, asyncio.Event()
+        changed.set()
+
+    def run(self, host, port, tasks_file=None):
+        if tasks_file:
+            async def enqueue_file(app):
+                with open(tasks_file) as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            self.submit(entry['task'], entry.get('manager_instructions'))
+            self.app.on_startup.append(enqueue_file)
+        web.run_app(self.app, host=host, port=int(port), print=None)
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Headless multi-session agent server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--max-sessions", type=int, default=4, help="sessions running at once; the rest wait in the queue")
+    parser.add_argument("--work-dir", default="coding", help="each session's coder runs in <work-dir>/<session id>")
+    parser.add_argument("--tasks-file", help='JSONL of {"task": ...} entries to queue at startup')
+    parser.add_argument("--skip-verification", action="store_true", help="don't verify manager instructions with the AVS (local testing)")
+    args = parser.parse_args()
+    AgentServer(args.max_sessions, args.work_dir, args.skip_verification).run(args.host, args.port, args.tasks_file)
+
+if __name__ == "__main__":
+    main()
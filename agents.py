@@ -1,31 +1,21 @@
 #!/usr/bin/env python3
 
 import os
-import json
+import requests
 from dotenv import load_dotenv
 import autogen
-from autogen import ConversableAgent, UserProxyAgent
-from autogen.agentchat.contrib.capabilities.teachability import Teachability
+from autogen import UserProxyAgent
 from autogen.formatting_utils import colored
 from autogen.agentchat.contrib.society_of_mind_agent import SocietyOfMindAgent
-from qdrant_client import QdrantClient, models
-from sentence_transformers import SentenceTransformer
-from autogen.agentchat.contrib.retrieve_user_proxy_agent import RetrieveUserProxyAgent
-from autogen.retrieve_utils import TEXT_FORMATS
-import requests
-import pandas as pd
-from typing import Dict, Any
-from dotenv import load_dotenv
-from scrapegraphai.graphs import SmartScraperGraph
-from autogen import ConversableAgent, UserProxyAgent, register_function
-import asyncio
 import nest_asyncio
 from mytools import (
     TwitterPostAgent,
     TelegramPostAgent,
     WebScraperAgent
 )
-from aggregator import Aggregator # ADDED IMPORT
+from llm_cache import cached_llm_config, uncached_llm_config
+from speaker_selector import WorkflowSpeakerSelector
+from context_compaction import ContextCompactor, OutputStore
 import time # ADDED IMPORT
 import logging # ADDED IMPORT - for basic logging
 
@@ -45,11 +35,12 @@ config_list = [
     }
 ]
 
-llm_config = {
+# responses come from the shared disk cache (llm_cache.py); cache_seed=None keeps autogen's per-seed cache off
+llm_config = cached_llm_config({
     "config_list": config_list,
     "cache_seed": None,
     "timeout": 600
-}
+})
 
 manager_instructions = """You are the task orchestrator. For each task:
     1. Create initial plan of what analysis is needed
@@ -66,7 +57,7 @@ manager_instructions = """You are the task orchestrator. For each task:
         - Ask telegram-poster to post a brief tweet summarizing the findings
     8. Only finish when tweet is posted""" # ADDED manager_instructions - Step 4.2
 
-def create_group_chat(manager_instructions): # MODIFIED - Accept manager_instructions - Step 4.3
+def create_group_chat(manager_instructions, work_dir="coding"): # MODIFIED - Accept manager_instructions - Step 4.3
     """Creates a group chat with proper task management flow"""
     def safe_termination_check(x):
         if not x or not isinstance(x, dict):
@@ -106,7 +97,8 @@ def create_group_chat(manager_instructions): # MODIFIED - Accept manager_instruc
         system_message="""You gather relevant information:
         1. Focus on what manager requests
         2. Use reliable sources
-        3. Return structured results""",
+        3. Return structured results
+        4. When several sources are needed, call web_scraper for all of them in one reply so they are scraped in parallel""",
         is_termination_msg=safe_termination_check,
     )
 
@@ -116,7 +108,7 @@ def create_group_chat(manager_instructions): # MODIFIED - Accept manager_instruc
         system_message="""You write and execute Python code:
         1. Always make sure you manage to run the code
         2. Show your work and results""",
-        code_execution_config={"work_dir": "coding", "use_docker": False}, # REWRITTEN LINE - Step 4.4
+        code_execution_config={"work_dir": work_dir, "use_docker": False}, # REWRITTEN LINE - Step 4.4
         default_auto_reply="",
         max_consecutive_auto_reply=10,
         is_termination_msg=lambda x: x.get("content", "").rstrip().endswith("TERMINATE"),
@@ -140,13 +132,21 @@ def create_group_chat(manager_instructions): # MODIFIED - Accept manager_instruc
         3. Return posting results
         4. Posts content should be related to topic not the internal conversation""",
         is_termination_msg=safe_termination_check,
-        llm_config=llm_config  # Optional, if applicable
+        llm_config=uncached_llm_config(llm_config)  # posts have side effects, so never replay a cached reply
     )
 
+    # each round would otherwise resend the whole transcript, raw scraper and coder output included
+    output_store = OutputStore()
+    for agent, max_tokens in ((manager, 6000), (critic, 6000), (web_scraper, 3000), (telegram_agent, 2000)):
+        ContextCompactor(output_store, max_tokens=max_tokens).add_to_agent(agent)
+    # the agents that review results can still read a truncated output in full
+    for agent in (manager, critic):
+        output_store.add_fetch_tool(agent)
+
     groupchat = autogen.GroupChat(
         agents=[manager, critic, web_scraper, coder, telegram_agent],
         messages=[],
-        speaker_selection_method="round_robin",
+        speaker_selection_method=WorkflowSpeakerSelector(), # follows the manager_instructions flow, no LLM call per turn
         allow_repeat_speaker=False,
         max_round=15,
     )
@@ -159,9 +159,9 @@ def create_group_chat(manager_instructions): # MODIFIED - Accept manager_instruc
 
     return group_manager
 
-def create_society_of_mind_agent(manager_instructions): # MODIFIED - Accept manager_instructions - Step 4.3
+def create_society_of_mind_agent(manager_instructions, work_dir="coding"): # MODIFIED - Accept manager_instructions - Step 4.3
     """Creates Society of Mind with manager orchestrating everything"""
-    group_manager = create_group_chat(manager_instructions) # MODIFIED - Pass manager_instructions
+    group_manager = create_group_chat(manager_instructions, work_dir=work_dir) # MODIFIED - Pass manager_instructions
 
     society_of_mind_agent = SocietyOfMindAgent(
         name="society_of_mind",
@@ -190,36 +190,33 @@ def create_society_of_mind_agent(manager_instructions): # MODIFIED - Accept mana
 
     return society_of_mind_agent
 
+# the aggregator service creates AVS tasks for us: it owns the aggregator key and collects the operators' signatures
+aggregator_url = f"http://{os.getenv('AGGREGATOR_SERVER_IP_PORT_ADDRESS', 'localhost:8090')}"
+
+def verify_manager_instructions(instructions, timeout=60):
+    """Submits the instructions to the AVS and waits for the verdict: True/False, or None if the task could not be created or timed out"""
+    response = requests.post(f"{aggregator_url}/tasks", json={"prompts": [instructions]}, timeout=timeout)
+    response.raise_for_status()
+    [task_index] = response.json()["task_indexes"] # Submit prompt for verification
+    if task_index is None:
+        print(colored("\\nThe AVS verification task could not be created; see the aggregator log.", "red"))
+        return None
+    print(colored(f"\\nSubmitted Manager Instructions for AVS Verification. Task Index: {task_index}. Waiting for operator verdicts...", "light_cyan"))
+    # Wait for the aggregated verdict to land on chain instead of assuming success after a fixed sleep
+    response = requests.get(f"{aggregator_url}/tasks/{task_index}/response", params={"timeout": timeout}, timeout=timeout + 10)
+    response.raise_for_status()
+    return response.json()["verdict"]
+
 def interact_freely_with_user(mode="society"): # MODIFIED - Step 4.4
     """Starts a chat between the user and selected agent type."""
     logger.info("Entering interact_freely_with_user function...") # ADDED LOGGING - CHECK IF THIS APPEARS
     print(colored("\\nInitializing agent system...", "light_cyan"))
 
     if mode == "society":
-        aggregator_config = { # Load your aggregator config - ADJUST PATHS IF NEEDED
-            "eth_rpc_url": "http://localhost:8545", # Or your Anvil RPC URL
-            "aggregator_server_ip_port_address": "localhost:8090", # Or your aggregator server address
-            "ecdsa_private_key_store_path": "tests/keys/aggregator.ecdsa.key.json", # Adjust path
-            "avs_registry_coordinator_address": "0xa82fF9aFd8f496c3d6ac40E2a0F282E47488CFc9", # Adjust address
-            "operator_state_retriever_address": "0x95401dc811bb5740090279Ba06cfA8fcF6113778" # ADDED THIS LINE - Step 4.4 - FIX KeyError
-        }
-        aggregator = Aggregator(aggregator_config) # Initialize Aggregator (ensure you've imported Aggregator class)
-
-        task_index = aggregator.send_new_manager_instructions_verification_task(manager_instructions) # Submit prompt for verification
-        print(colored(f"\\nSubmitted Manager Instructions for AVS Verification. Task Index: {task_index}. Waiting for operator verdicts...", "light_cyan"))
-
-        # Polling for Verification Status (Simple PoC Polling - Replace with event listener for production)
-        verification_status = None
-        start_time = time.time()
-        while time.time() - start_time < 60: # Poll for up to 60 seconds (adjust timeout as needed)
-            # In a real app, you'd query the contract for verification status based on task_index
-            # For this PoC, we'll just wait and assume operators will respond in time.
-            time.sleep(5) # Check every 5 seconds
-            # In a more advanced PoC, you would query the contract's events or state
-            # to determine the verification outcome and aggregated signature.
-            # For now, we'll just assume it's verified if we reach this point after waiting.
-            verification_status = True # Assume verified after waiting (for basic PoC)
-            break
+        verification_status = verify_manager_instructions(manager_instructions)
+        if verification_status is None:
+            print(colored("\\nNo AVS verdict received within 60 seconds. Aborting agent initialization.", "red"))
+            return
 
         if verification_status:
             print(colored("\\nManager Instructions VERIFIED by AVS! Proceeding with agent initialization...", "green"))
@@ -5,19 +5,23 @@ import json
 import time
 import threading
 import asyncio
-from dataclasses import dataclass
-from typing import List
 import yaml
 from web3 import Web3
-import eth_abi
+from eth_utils import event_abi_to_log_topic
 from eth_account import Account
-from flask import Flask, request
 from eigensdk.chainio.clients.builder import BuildAllConfig, build_all
 from eigensdk.services.avsregistry import AvsRegistryService
-from eigensdk.services.operatorsinfo.operatorsinfo_inmemory import OperatorsInfoServiceInMemory
-from eigensdk.services.bls_aggregation.blsagg import BlsAggregationService, BlsAggregationServiceResponse
+from eigensdk.services.bls_aggregation.blsagg import BlsAggregationService
 from eigensdk.chainio.utils import nums_to_bytes
-from eigensdk.crypto.bls.attestation import Signature, G1Point, G2Point, g1_to_tupple, g2_to_tupple
+from eigensdk.crypto.bls.attestation import Signature, g1_to_tupple, g2_to_tupple
+from signature_server import SignatureIngestionServer
+from signature_ingress import SignatureIngress, task_response_digest
+from task_api import TaskApi
+from tx_manager import TxManager
+from response_submitter import ResponseSubmitter
+from chain_events import LogSubscription
+from operator_registry import CheckpointedOperatorsInfoService
+from metrics import AggregatorMetrics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,18 +29,27 @@ logger = logging.getLogger(__name__)
 class Aggregator:
     def __init__(self, config):
         self.config = config
+        self.metrics = AggregatorMetrics()
         self.web3 = Web3(Web3.HTTPProvider(self.config["eth_rpc_url"]))
         self.__load_ecdsa_key()
+        self.__load_tx_manager()
         self.__load_clients()
         self.__load_task_manager()
         self.__load_bls_aggregation_service()
         self.tasks = {}
         self.taskResponses = {}
-        self.app = Flask(__name__)
-        self.app.add_url_rule('/signature', 'signature', self.submit_signature, methods=['POST'])
+        self.initialized_tasks = set()
+        self.open_tasks = {}  # task index -> time initialized, until aggregated or expired
+        self.task_time_to_expiry = int(self.config.get('task_time_to_expiry_seconds', 60))
+        self.task_lock = threading.Lock()  # tasks are initialized from TaskApi threads and closed from the aggregation thread
+        # every task below closed_below is aggregated or expired; tasks from before this process started count as expired
+        self.closed_below = self.task_manager.functions.latestTaskNum().call()
+        self.task_gap = None  # (task index, time.monotonic()): uninitialized tasks below the index existed on chain by then
+        self.chain_task_index = (-1, 0.0)  # (latest task index on chain, time.monotonic() it was read)
+        self.signature_ingress = None
+        self.signature_server = None
 
-    def submit_signature(self):
-        data = request.get_json()
+    def submit_signature(self, data):
         signature = Signature(data['signature']['X'], data['signature']['Y'])
         task_index = data['task_id']
         task_response = {
@@ -44,98 +57,236 @@ class Aggregator:
             'verification_status': data['verification_status'],
             'block_number': data['block_number']
         }
-        print('data', data['operator_id'])
-        try:
-            self.bls_aggregation_service.process_new_signature(
-                task_index, task_response, signature, data['operator_id']
-            )
-            return 'true', 200
-        except Exception as e:
-            logger.error(f"Submitting signature failed: {e}")
-            return 'false', 500
+        logger.debug(f"Signature received from operator {data['operator_id']}")
+        self.bls_aggregation_service.process_new_signature(
+            task_index, task_response, signature, data['operator_id']
+        )
+        self.metrics.signature_received(task_index)
+
+    def start_metrics(self):
+        if self.config.get('enable_metrics') == 'true':
+            self.metrics.start(self.config['eigen_metrics_ip_port_address'])
 
     def start_server(self):
         host, port = self.config['aggregator_server_ip_port_address'].split(':')
-        self.app.run(host=host, port=port)
-
-    def send_new_manager_instructions_verification_task(self, agent_prompt):
-        task_type = 0  # Assuming VerifyManagerInstructions is the first enum value (index 0)
-        tx = self.task_manager.functions.createNewTask(
-            int(task_type),  # 1. TaskType (explicitly cast to int)
-            agent_prompt,    # 2. agentPrompt
-            int(100),        # 3. quorumThresholdPercentage (explicitly cast to int)
-            nums_to_bytes([0])  # 4. quorumNumbers
-        ).build_transaction({
-            "from": self.aggregator_address,
-            "gas": 4000000,
-            "gasPrice": self.web3.to_wei("20", "gwei"),
-            "nonce": self.web3.eth.get_transaction_count(self.aggregator_address),
-            "chainId": self.web3.eth.chain_id,
-        })
-        signed_tx = self.web3.eth.account.sign_transaction(
-            tx, private_key=self.aggregator_ecdsa_private_key
+        self.signature_ingress = SignatureIngress(
+            self, workers=int(self.config.get('signature_verification_workers', os.cpu_count()))
         )
-        tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
-
-        if not receipt['logs']:  # if logs are empty
-            logger.warning("No logs emitted in transaction receipt. Falling back to inferring task index.")
-            task_index = self.task_manager.functions.latestTaskNum().call()  # Fallback: Infer task index
-        else:
-            event = self.task_manager.events.NewTaskCreated().process_log(receipt['logs'][0])
-            task_index = event['args']['taskIndex']
-
-        logger.info(f"Successfully sent Manager Instructions Verification Task {task_index}")
-        self.bls_aggregation_service.initialize_new_task(
-            task_index=task_index,
-            task_created_block=receipt['blockNumber'],
-            quorum_numbers=nums_to_bytes([0]),
-            quorum_threshold_percentages=[100],
-            time_to_expiry=60000
+        self.signature_server = SignatureIngestionServer(
+            self,
+            self.signature_ingress,
+            max_batch_size=int(self.config.get('signature_batch_size', 64)),
+            max_queue_size=int(self.config.get('signature_queue_size', 10000)),
+            early_signature_window=int(self.config.get('early_signature_window_seconds', 10)),
+            retry_after=int(self.config.get('signature_retry_after_seconds', 2)),
         )
+        # other processes (agents.py) create their tasks through this process, see task_api.py
+        TaskApi(self).add_to_app(self.signature_server.app)
+        self.metrics.ingress_queue_depth.set_function(
+            lambda: self.signature_server.queue.qsize() if self.signature_server.queue is not None else 0
+        )
+        self.signature_server.run(host, port)
+
+    def is_task_initialized(self, task_index):
+        return task_index in self.initialized_tasks
+
+    def latest_task_index(self):
+        with self.task_lock:
+            return max(self.initialized_tasks, default=-1)
+
+    def latest_chain_task_index(self, max_age=1):
+        """Latest task index created on chain by any process; latestTaskNum is read at most every `max_age` seconds"""
+        task_index, checked_at = self.chain_task_index
+        if time.monotonic() - checked_at > max_age:
+            task_index = self.task_manager.functions.latestTaskNum().call() - 1
+            self.chain_task_index = (task_index, time.monotonic())
         return task_index
 
+    def oldest_open_task(self):
+        """Lowest task index that may still receive signatures; every task below it is aggregated or expired.
+
+        Only advances over tasks that were initialized here and have since closed or expired.
+        Concurrent createNewTask calls finish out of order, so a lower task may be created on
+        chain but not initialized yet; it holds the watermark until it could have expired.
+        """
+        now = time.monotonic()
+        deadline = now - self.task_time_to_expiry
+        with self.task_lock:
+            for task_index, initialized_at in list(self.open_tasks.items()):
+                if initialized_at < deadline:
+                    self.open_tasks.pop(task_index, None)
+            latest_task_index = max(self.initialized_tasks, default=-1)
+            while self.closed_below <= latest_task_index:
+                task_index = self.closed_below
+                if task_index in self.open_tasks:
+                    break
+                if task_index not in self.initialized_tasks:
+                    # a later task is initialized, so this one was created on chain by now at the latest
+                    if self.task_gap is None or task_index >= self.task_gap[0]:
+                        self.task_gap = (latest_task_index, now)
+                        break
+                    if self.task_gap[1] >= deadline:
+                        break
+                self.closed_below += 1
+            return self.closed_below
+
+    def send_new_manager_instructions_verification_task(self, agent_prompt):
+        return self.send_new_manager_instructions_verification_tasks([agent_prompt])[0]
+
+    def send_new_manager_instructions_verification_tasks(self, agent_prompts):
+        """Creates one verification task per prompt; the createNewTask transactions are pipelined rather than sent one receipt at a time.
+
+        Returns the task index of each prompt, or None for a prompt whose task could not be created.
+        """
+        task_type = 0  # Assuming VerifyManagerInstructions is the first enum value (index 0)
+        futures = [
+            self.tx_manager.send(
+                self.task_manager.functions.createNewTask(
+                    int(task_type),  # 1. TaskType (explicitly cast to int)
+                    agent_prompt,    # 2. agentPrompt
+                    int(100),        # 3. quorumThresholdPercentage (explicitly cast to int)
+                    nums_to_bytes([0])  # 4. quorumNumbers
+                ),
+                gas=4000000,
+            )
+            for agent_prompt in agent_prompts
+        ]
+
+        task_indexes = []
+        for future in futures:
+            created = self.__created_task(future)
+            if created is None:
+                task_indexes.append(None)
+                continue
+            task_index, task = created
+            self.tasks[task_index] = task
+            logger.info(f"Successfully sent Manager Instructions Verification Task {task_index}")
+            self.metrics.task_created(task_index)
+            self.bls_aggregation_service.initialize_new_task(
+                task_index=task_index,
+                task_created_block=task['taskCreatedBlock'],
+                quorum_numbers=nums_to_bytes([0]),
+                quorum_threshold_percentages=[100],
+                # same expiry the signature ingress and oldest_open_task use
+                time_to_expiry=self.task_time_to_expiry,
+            )
+            with self.task_lock:
+                self.initialized_tasks.add(task_index)
+                self.open_tasks[task_index] = time.monotonic()
+            if self.signature_server is not None:
+                self.signature_server.task_initialized(task_index)
+            task_indexes.append(task_index)
+        return task_indexes
+
+    def __created_task(self, future):
+        """(task index, task) from a createNewTask receipt's NewTaskCreated log, or None if the task was not created"""
+        try:
+            receipt = future.result(timeout=self.tx_manager.result_timeout)
+        except Exception as e:
+            logger.error(f"createNewTask transaction failed: {e}")
+            return None
+        self.metrics.gas_used.labels(method="createNewTask").observe(receipt['gasUsed'])
+        if receipt['status'] != 1:
+            logger.error(f"createNewTask reverted in tx {receipt['transactionHash'].hex()}")
+            return None
+        # the log is the only reliable source of the index: with pipelined sends latestTaskNum already reflects later txs
+        events = self.task_manager.events.NewTaskCreated().process_receipt(receipt)
+        if not events:
+            logger.error(f"No NewTaskCreated log in createNewTask tx {receipt['transactionHash'].hex()}")
+            return None
+        return events[0]['args']['taskIndex'], events[0]['args']['task']
+
+    async def await_task_response(self, task_index):
+        """Waits until the response to the task lands on chain and returns its verdict"""
+        topics = [Web3.to_hex(event_abi_to_log_topic(self.task_manager.events.TaskResponded._get_event_abi()))]
+        async with LogSubscription(self.config["eth_ws_url"], self.task_manager.address, topics) as subscription:
+            # the response may have landed before the subscription was in place
+            from_block = self.tasks[task_index]['taskCreatedBlock'] if task_index in self.tasks else 0
+            past_logs = await asyncio.to_thread(self.web3.eth.get_logs, {
+                "fromBlock": from_block,
+                "address": self.task_manager.address,
+                "topics": topics,
+            })
+            for log in past_logs:
+                verdict = self._task_verdict(task_index, log)
+                if verdict is not None:
+                    return verdict
+            async for log in subscription:
+                verdict = self._task_verdict(task_index, log)
+                if verdict is not None:
+                    return verdict
+
+    def _task_verdict(self, task_index, log):
+        event = self.task_manager.events.TaskResponded().process_log(log)
+        task_response = event['args']['taskResponse']
+        if task_response['referenceTaskIndex'] == task_index:
+            return bool(task_response['numberSquared'])
+        return None
+
     def start_submitting_signatures(self):
+        self.response_submitter = ResponseSubmitter(
+            self,
+            workers=int(self.config.get('response_submitter_workers', 4)),
+            max_queue_size=int(self.config.get('response_queue_size', 64)),
+            max_retries=int(self.config.get('response_max_retries', 3)),
+        )
+        self.response_submitter.start()
+        self.metrics.response_queue_depth.set_function(self.response_submitter.queue.qsize)
         while True:
             logger.info('Waiting for response')
             aggregated_response = next(self.bls_aggregation_service.get_aggregated_responses())
             logger.info(f'Aggregated response {aggregated_response}')
-            response = aggregated_response.task_response
-            task = [
-                response['number_to_be_squared'],
-                response['block_number'],
-                nums_to_bytes([0]),
-                100,
-            ]
-            task_response = [
-                response['task_index'],
-                response['number_squared']
-            ]
-            non_signers_stakes_and_signature = [
-                aggregated_response.non_signer_quorum_bitmap_indices,
-                [g1_to_tupple(g1) for g1 in aggregated_response.non_signers_pubkeys_g1],
-                [g1_to_tupple(g1) for g1 in aggregated_response.quorum_apks_g1],
-                g2_to_tupple(aggregated_response.signers_apk_g2),
-                g1_to_tupple(aggregated_response.signers_agg_sig_g1),
-                aggregated_response.quorum_apk_indices,
-                aggregated_response.total_stake_indices,
-                aggregated_response.non_signer_stake_indices,
-            ]
-
-            tx = self.task_manager.functions.respondToTask(
+            self.metrics.quorum_reached(aggregated_response.task_response['task_index'])
+            self.response_submitter.submit(aggregated_response)
+
+    def send_aggregated_response(self, aggregated_response):
+        """Sends respondToTask without waiting for it to be mined; the receipt is tracked in the background"""
+        response = aggregated_response.task_response
+        task_index = response['task_index']
+        created_task = self.tasks[task_index]
+        task = [
+            created_task['taskType'],
+            created_task['agentPrompt'],
+            created_task['taskCreatedBlock'],
+            created_task['quorumNumbers'],
+            created_task['quorumThresholdPercentage'],
+        ]
+        task_response = [
+            task_index,
+            int(response['verification_status'])
+        ]
+        non_signers_stakes_and_signature = [
+            aggregated_response.non_signer_quorum_bitmap_indices,
+            [g1_to_tupple(g1) for g1 in aggregated_response.non_signers_pubkeys_g1],
+            [g1_to_tupple(g1) for g1 in aggregated_response.quorum_apks_g1],
+            g2_to_tupple(aggregated_response.signers_apk_g2),
+            g1_to_tupple(aggregated_response.signers_agg_sig_g1),
+            aggregated_response.quorum_apk_indices,
+            aggregated_response.total_stake_indices,
+            aggregated_response.non_signer_stake_indices,
+        ]
+
+        self.taskResponses[task_index] = response
+        with self.task_lock:
+            self.open_tasks.pop(task_index, None)
+        if self.signature_ingress is not None:
+            self.signature_ingress.close_task(task_index)
+        future = self.tx_manager.send(
+            self.task_manager.functions.respondToTask(
                 task, task_response, non_signers_stakes_and_signature
-            ).build_transaction({
-                "from": self.aggregator_address,
-                "gas": 2000000,
-                "gasPrice": self.web3.to_wei("20", "gwei"),
-                "nonce": self.web3.eth.get_transaction_count(self.aggregator_address),
-                "chainId": self.web3.eth.chain_id,
-            })
-            signed_tx = self.web3.eth.account.sign_transaction(
-                tx, private_key=self.aggregator_ecdsa_private_key
-            )
-            tx_hash = self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
-            receipt = self.web3.eth.wait_for_transaction_receipt(tx_hash)
+            ),
+            gas=2000000,
+        )
+        future.add_done_callback(lambda f: self._on_response_mined(task_index, f))
+        return future
+
+    def _on_response_mined(self, task_index, future):
+        if future.exception() is not None:
+            return
+        receipt = future.result()
+        logger.info(f"Response to task {task_index} mined in block {receipt['blockNumber']}")
+        if receipt['status'] == 1:
+            self.metrics.response_mined(task_index, receipt)
 
     def __load_ecdsa_key(self):
         ecdsa_key_password = os.environ.get("AGGREGATOR_ECDSA_KEY_PASSWORD", "")
@@ -146,6 +297,17 @@ class Aggregator:
         self.aggregator_ecdsa_private_key = Account.decrypt(keystore, ecdsa_key_password).hex()
         self.aggregator_address = Account.from_key(self.aggregator_ecdsa_private_key).address
 
+    def __load_tx_manager(self):
+        self.tx_manager = TxManager(
+            self.web3,
+            self.aggregator_ecdsa_private_key,
+            self.aggregator_address,
+            max_in_flight=int(self.config.get("max_in_flight_txs", 16)),
+            resubmit_after=int(self.config.get("tx_resubmit_after_seconds", 30)),
+            max_age=int(self.config.get("tx_max_age_seconds", 300)),
+            max_resubmits=int(self.config.get("tx_max_resubmits", 5)),
+        )
+
     def __load_clients(self):
         cfg = BuildAllConfig(
             eth_http_url=self.config["eth_rpc_url"],
@@ -177,21 +339,22 @@ class Aggregator:
         self.task_manager = self.web3.eth.contract(address=task_manager_address, abi=task_manager_abi)
 
     def __load_bls_aggregation_service(self):
-        operator_info_service = OperatorsInfoServiceInMemory(
+        # pubkeys and sockets are restored from the last snapshot; only blocks indexed since then are replayed
+        self.operator_info_service = CheckpointedOperatorsInfoService(
             avs_registry_reader=self.clients.avs_registry_reader,
-            start_block_pub=0,
-            start_block_socket=0,
+            web3=self.web3,
+            snapshot_path=self.config.get("operator_registry_snapshot_path", "data/operator_registry_snapshot.json"),
             logger=logger,
         )
-        avs_registry_service = AvsRegistryService(self.clients.avs_registry_reader, operator_info_service, logger)
+        avs_registry_service = AvsRegistryService(self.clients.avs_registry_reader, self.operator_info_service, logger)
         def hasher(task):
-            encoded = eth_abi.encode(["uint32", "bool"], [task["task_index"], task["verification_status"]])
-            return Web3.keccak(encoded)
+            return task_response_digest(task["task_index"], task["verification_status"])
         self.bls_aggregation_service = BlsAggregationService(avs_registry_service, hasher)
 
 if __name__ == '__main__':
     with open("config-files/aggregator.yaml", "r") as f:
         config = yaml.load(f, Loader=yaml.BaseLoader)
     aggregator = Aggregator(config)
+    aggregator.start_metrics()
     threading.Thread(target=aggregator.start_submitting_signatures, args=[]).start()
     aggregator.start_server()
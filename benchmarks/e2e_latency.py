@@ -0,0 +1,259 @@
+# benchmarks/e2e_latency.py
+"""End-to-end verification latency and throughput against the in-process stand-in chain.
+
+For every (task rate, operator count) combination a fresh stand-in chain, Aggregator and
+operator set run in a subprocess: prompts are submitted through the Aggregator at the given
+rate, M operators (real policy engine and OperatorPipeline, one BLS key each) verify and
+sign, and the aggregator responds on chain. Per-stage p50/p95/p99 latency and sustained
+tasks/sec are written as JSON, tagged with the current commit, so runs can be compared.
+
+    python benchmarks/e2e_latency.py --rates 1,5,10 --operators 1,4,16 --tasks 50 --json results.json
+
+Stages: create (submit -> createNewTask mined), operators (-> first signature),
+aggregation (-> quorum), respond (-> respondToTask mined), total (submit -> respondToTask mined).
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+CHAIN_PORT = 18545
+AGGREGATOR_PORT = 18090
+STAGES = ("create", "operators", "aggregation", "respond", "total")
+PROMPT = "Summarize this week's ethereum L2 and defi news for the newsletter."
+
+def percentiles(samples):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+    return {
+        "p50": round(pick(0.50), 4),
+        "p95": round(pick(0.95), 4),
+        "p99": round(pick(0.99), 4),
+        "mean": round(statistics.fmean(ordered), 4),
+    }
+
+def bench_private_key(index):
+    from eth_utils import keccak
+    # deterministic test keys; well below the BN254 scalar field order
+    return format(int.from_bytes(keccak(text=f"bench-operator-{index}"), "big") >> 8, "x")
+
+def bench_key_pair(index):
+    from eigensdk.crypto.bls.attestation import KeyPair
+    return KeyPair.from_string(bench_private_key(index))
+
+class BenchIdentity:
+    """Just what OperatorPipeline needs from an operator identity"""
+    def __init__(self, key_pair):
+        from operator_registry import operator_id_from_g1_pubkey
+        self.bls_key_pair = key_pair
+        self.operator_id = operator_id_from_g1_pubkey(key_pair.pub_g1)
+
+    def build_submission(self, task, verification_status, signature):
+        return {
+            "task_id": task["task_id"],
+            "verification_status": verification_status,
+            "signature": signature,
+            "block_number": task["block_number"],
+            "operator_id": "0x" + self.operator_id.hex(),
+        }
+
+def bench_aggregator_config(chain_port, aggregator_port, workdir):
+    """Aggregator config (all strings, as yaml.BaseLoader would give) for a stand-in chain on `chain_port`"""
+    from standin_chain import REGISTRY_COORDINATOR_ADDRESS, OPERATOR_STATE_RETRIEVER_ADDRESS, TASK_MANAGER_ADDRESS
+    return {
+        "eth_rpc_url": f"http://127.0.0.1:{chain_port}",
+        "eth_ws_url": f"ws://127.0.0.1:{chain_port}",
+        "aggregator_server_ip_port_address": f"127.0.0.1:{aggregator_port}",
+        "ecdsa_private_key_store_path": os.path.join(REPO_ROOT, "tests/keys/aggregator.ecdsa.key.json"),
+        "avs_registry_coordinator_address": REGISTRY_COORDINATOR_ADDRESS,
+        "operator_state_retriever_address": OPERATOR_STATE_RETRIEVER_ADDRESS,
+        "newsletter_prompt_task_manager_address": TASK_MANAGER_ADDRESS,
+        "operator_registry_snapshot_path": os.path.join(workdir, "operator_registry_snapshot.json"),
+    }
+
+def register_bench_operators(chain, count):
+    """Seeds `count` deterministic operators straight into the stand-in registry"""
+    from web3 import Web3
+    from eigensdk.crypto.bls.attestation import g1_to_tupple, g2_to_tupple
+    identities = [BenchIdentity(bench_key_pair(i)) for i in range(count)]
+    for i, identity in enumerate(identities):
+        address = Web3.to_checksum_address(Web3.keccak(text=f"bench-operator-address-{i}")[:20])
+        chain.register_operator(address, g1_to_tupple(identity.bls_key_pair.pub_g1), g2_to_tupple(identity.bls_key_pair.pub_g2))
+    return identities
+
+class BenchOperator:
+    """Runs the operator side for all identities: one event stream, the rule policy, one pipeline"""
+    def __init__(self, identities, aggregator_address):
+        from policy_engine import PolicyEngine
+        self.config = {"aggregator_server_ip_port_address": aggregator_address}
+        self.policy_engine = PolicyEngine()
+        self.identities = identities
+
+    def evaluate_policies(self, tasks):
+        return [result.approved for result in self.policy_engine.evaluate_batch([task["agent_prompt"] for task in tasks])]
+
+    def start(self, web3, task_manager, ws_url, checkpoint_path):
+        from operator_pipeline import OperatorPipeline
+        from task_event_stream import TaskEventStream
+        self.pipeline = OperatorPipeline(self, identities=self.identities, submission_workers=16)
+        stream = TaskEventStream(web3, task_manager, ws_url, checkpoint_path)
+        threading.Thread(target=stream.run, args=(self.pipeline.submit,), daemon=True).start()
+
+def timeline_metrics():
+    from metrics import AggregatorMetrics
+
+    class TimelineMetrics(AggregatorMetrics):
+        """Keeps every task's phase timestamps instead of only feeding histograms"""
+        def __init__(self):
+            super().__init__()
+            self.timeline = {}
+
+        def task_created(self, task_index):
+            super().task_created(task_index)
+            self.timeline[task_index] = dict(self.tasks[task_index])
+
+        def _record(self, task_index, event, previous, phase):
+            super()._record(task_index, event, previous, phase)
+            events = self.tasks.get(task_index)
+            if events is not None and event in events:
+                self.timeline[task_index][event] = events[event]
+
+    return TimelineMetrics()
+
+def run_one(task_rate, operator_count, task_count, block_time, timeout):
+    """Runs a single combination in this process and returns its result"""
+    from web3 import Web3
+    from standin_chain import StandInChain, StandInRpcServer
+    from aggregator import Aggregator
+
+    workdir = tempfile.mkdtemp(prefix="e2e-bench-")
+    chain = StandInChain(block_time=block_time)
+    StandInRpcServer(chain).start_in_background("127.0.0.1", CHAIN_PORT)
+    rpc_url, ws_url = f"http://127.0.0.1:{CHAIN_PORT}", f"ws://127.0.0.1:{CHAIN_PORT}"
+
+    identities = register_bench_operators(chain, operator_count)
+
+    aggregator = Aggregator(bench_aggregator_config(CHAIN_PORT, AGGREGATOR_PORT, workdir))
+    aggregator.metrics = timeline_metrics()
+    threading.Thread(target=aggregator.start_submitting_signatures, daemon=True).start()
+    threading.Thread(target=aggregator.start_server, daemon=True).start()
+
+    operator = BenchOperator(identities, f"127.0.0.1:{AGGREGATOR_PORT}")
+    operator.start(Web3(Web3.HTTPProvider(rpc_url)), aggregator.task_manager, ws_url, os.path.join(workdir, "operator.checkpoint.json"))
+    time.sleep(1)  # let the subscriptions and the signature server come up
+
+    submitted_at = {}
+    submitted_lock = threading.Lock()
+
+    def submit(i):
+        started = time.time()
+        task_index = aggregator.send_new_manager_instructions_verification_task(f"{PROMPT} #{i}")
+        if task_index is None:
+            return
+        with submitted_lock:
+            submitted_at[task_index] = started
+
+    started = time.time()
+    with ThreadPoolExecutor(max_workers=32) as submitters:
+        for i in range(task_count):
+            # open loop: submissions keep to the schedule however long earlier tasks take
+            time.sleep(max(0, started + i / task_rate - time.time()))
+            submitters.submit(submit, i)
+
+    deadline = time.time() + timeout
+    timeline = aggregator.metrics.timeline
+    while time.time() < deadline and sum("mined" in timeline.get(t, {}) for t in submitted_at) < task_count:
+        time.sleep(0.1)
+    finished = time.time()
+
+    stages = {stage: [] for stage in STAGES}
+    mined_at = []
+    for task_index, submitted in submitted_at.items():
+        events = timeline.get(task_index, {})
+        if "mined" not in events:
+            continue
+        mined_at.append(events["mined"])
+        stages["create"].append(events["created"] - submitted)
+        stages["operators"].append(events["first_signature"] - events["created"])
+        stages["aggregation"].append(events["quorum"] - events["first_signature"])
+        stages["respond"].append(events["mined"] - events["quorum"])
+        stages["total"].append(events["mined"] - submitted)
+    completed = len(mined_at)
+    duration = (max(mined_at) - started) if mined_at else finished - started
+    return {
+        "task_rate": task_rate,
+        "operators": operator_count,
+        "tasks": task_count,
+        "completed": completed,
+        "block_time": block_time,
+        "duration_s": round(duration, 3),
+        "tasks_per_second": round(completed / duration, 3) if duration > 0 else 0,
+        "stages": {stage: percentiles(samples) for stage, samples in stages.items()},
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end verification latency and throughput")
+    parser.add_argument("--rates", default="1,5,10", help="comma separated task submission rates (tasks/sec)")
+    parser.add_argument("--operators", default="1,4,16", help="comma separated operator counts")
+    parser.add_argument("--tasks", type=int, default=50, help="tasks per combination")
+    parser.add_argument("--block-time", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=120, help="seconds to wait for outstanding tasks")
+    parser.add_argument("--json", default="benchmarks/results/e2e_latency.json")
+    parser.add_argument("--run-one", nargs=2, metavar=("RATE", "OPERATORS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        result = run_one(float(args.run_one[0]), int(args.run_one[1]), args.tasks, args.block_time, args.timeout)
+        print(json.dumps(result))
+        return
+
+    results = []
+    for rate in [float(rate) for rate in args.rates.split(",")]:
+        for operator_count in [int(count) for count in args.operators.split(",")]:
+            # a fresh process per combination: clean chain, ports and aggregator state
+            run = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--run-one", str(rate), str(operator_count),
+                 "--tasks", str(args.tasks), "--block-time", str(args.block_time), "--timeout", str(args.timeout)],
+                cwd=REPO_ROOT, capture_output=True, text=True,
+            )
+            if run.returncode != 0:
+                error = run.stderr.strip().splitlines()[-1] if run.stderr.strip() else "failed"
+                print(f"rate {rate:>6} operators {operator_count:>4}: {error}")
+                results.append({"task_rate": rate, "operators": operator_count, "error": error})
+                continue
+            result = json.loads(run.stdout.strip().splitlines()[-1])
+            results.append(result)
+            total = result["stages"]["total"] or {}
+            print(
+                f"rate {rate:>6} operators {operator_count:>4}: {result['completed']}/{result['tasks']} tasks, "
+                f"{result['tasks_per_second']} tasks/s, total p50 {total.get('p50')}s p95 {total.get('p95')}s p99 {total.get('p99')}s"
+            )
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+    with open(args.json, "w") as f:
+        json.dump({
+            "commit": git_commit(),
+            "timestamp": int(time.time()),
+            "params": {"tasks": args.tasks, "block_time": args.block_time},
+            "results": results,
+        }, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,363 @@
+# benchmarks/signature_swarm.py
+"""Synthetic operator swarm: load-tests the aggregator's /signature endpoint.
+
+Instead of running hundreds of PromptOperator processes, this derives N deterministic BLS test
+operators, seeds them into the in-process stand-in chain, starts a real Aggregator in a child
+process (which creates the tasks), pre-signs every (task, operator) response and then posts
+them to /signature at a fixed rate and concurrency. A share of the requests are duplicates
+(a signature re-sent while its task is still open) and late arrivals (re-sent after the task's
+response is on chain).
+
+Reported: client-side throughput and latency per request kind, the aggregator's own view of
+the outcomes (aggregator_signatures by status, scraped from its metrics endpoint) and the
+aggregator process tree's CPU and peak RSS during the run (read from /proc, so Linux only).
+
+    python benchmarks/signature_swarm.py --operators 128 --tasks 50 --rate 2000 --concurrency 128
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from e2e_latency import REPO_ROOT, PROMPT, bench_private_key, bench_aggregator_config, register_bench_operators, \
+    percentiles, git_commit
+
+CHAIN_PORT = 18546
+AGGREGATOR_PORT = 18091
+METRICS_PORT = 19091
+TASK_BATCH = 50
+KINDS = ("unique", "duplicate", "late")
+
+def process_tree_usage(pid):
+    """(cpu seconds, rss bytes) summed over `pid` and its descendants, e.g. the signature verification pool"""
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    ticks = os.sysconf("SC_CLK_TCK")
+    stats = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        # fields[0] is the state; ppid, utime, stime and rss follow at fixed offsets
+        stats[int(entry)] = (int(fields[1]), int(fields[11]) + int(fields[12]), int(fields[21]))
+    tree, frontier = {pid}, [pid]
+    while frontier:
+        parent = frontier.pop()
+        for child, (ppid, _, _) in stats.items():
+            if ppid == parent and child not in tree:
+                tree.add(child)
+                frontier.append(child)
+    cpu = sum(stats[p][1] for p in tree if p in stats) / ticks
+    rss = sum(stats[p][2] for p in tree if p in stats) * page_size
+    return cpu, rss
+
+class ResourceSampler:
+    """Samples the aggregator's process tree in the background while the swarm runs"""
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []  # (time, cpu seconds, rss bytes)
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self.stopped.is_set():
+            self.samples.append((time.time(), *process_tree_usage(self.pid)))
+            self.stopped.wait(self.interval)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+        self.samples.append((time.time(), *process_tree_usage(self.pid)))
+        (start, cpu_start, _), (end, cpu_end, _) = self.samples[0], self.samples[-1]
+        cpu_percent = [
+            100 * (cpu - previous_cpu) / (at - previous_at)
+            for (previous_at, previous_cpu, _), (at, cpu, _) in zip(self.samples, self.samples[1:]) if at > previous_at
+        ]
+        return {
+            "cpu_seconds": round(cpu_end - cpu_start, 3),
+            "cpu_percent_mean": round(100 * (cpu_end - cpu_start) / (end - start), 1) if end > start else None,
+            "cpu_percent_peak": round(max(cpu_percent), 1) if cpu_percent else None,
+            "rss_mb_peak": round(max(rss for _, _, rss in self.samples) / 2 ** 20, 1),
+            "rss_mb_end": round(self.samples[-1][2] / 2 ** 20, 1),
+        }
+
+class TaskWatcher:
+    """Follows NewTaskCreated / TaskResponded on the stand-in chain (as a block listener, no RPC)"""
+    def __init__(self, chain):
+        from eth_utils import keccak
+        self.address = chain.task_manager.address
+        self.created_topic = keccak(text="NewTaskCreated(uint32,(uint256,string,uint32,bytes,uint32))")
+        self.responded_topic = keccak(text="TaskResponded((uint32,uint256),(uint32,bytes32))")
+        self.created = {}  # task index -> block number
+        self.completed = []
+        self.lock = threading.Lock()
+        chain.listeners.append(self.on_block)
+
+    def on_block(self, block, logs):
+        for log in logs:
+            if log["address"] != self.address:
+                continue
+            with self.lock:
+                if log["topics"][0] == self.created_topic:
+                    self.created[int.from_bytes(log["topics"][1], "big")] = log["blockNumber"]
+                elif log["topics"][0] == self.responded_topic:
+                    # taskResponse.referenceTaskIndex is the first word of the data
+                    self.completed.append(int.from_bytes(log["data"][:32], "big"))
+
+class Swarm:
+    """Picks what to post next: mostly each (task, operator) signature once, plus duplicates and late arrivals"""
+    def __init__(self, submissions, watcher, duplicate_ratio, late_ratio, seed=0):
+        self.pending = list(reversed(submissions))  # in task order, like operators reacting to each task
+        self.watcher = watcher
+        self.duplicate_ratio = duplicate_ratio
+        self.late_ratio = late_ratio
+        self.random = random.Random(seed)
+        self.sent = {}  # task index -> submissions sent so far
+
+    def next(self):
+        """Returns (kind, submission), or None once every signature has been sent"""
+        if not self.pending:
+            return None
+        draw = self.random.random()
+        if draw < self.late_ratio:
+            with self.watcher.lock:
+                completed = [task for task in self.watcher.completed[-256:] if task in self.sent]
+            if completed:
+                return "late", self.random.choice(self.sent[self.random.choice(completed)])
+        elif draw < self.late_ratio + self.duplicate_ratio and self.sent:
+            with self.watcher.lock:
+                completed = set(self.watcher.completed)
+            open_tasks = [task for task in list(self.sent)[-16:] if task not in completed]
+            if open_tasks:
+                return "duplicate", self.random.choice(self.sent[self.random.choice(open_tasks)])
+        submission = self.pending.pop()
+        self.sent.setdefault(submission["task_id"], []).append(submission)
+        return "unique", submission
+
+async def post_swarm(url, swarm, rate, concurrency):
+    """Open loop at `rate` requests/sec (0: as fast as `concurrency` allows); returns per-kind results"""
+    import aiohttp
+    results = {kind: {"sent": 0, "status": {}, "latency": []} for kind in KINDS}
+    slots = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=60)) as session:
+
+        async def post(kind, submission):
+            started = time.perf_counter()
+            try:
+                async with session.post(url, json=submission) as response:
+                    await response.read()
+                    status = str(response.status)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                status = type(e).__name__
+            finally:
+                slots.release()
+            result = results[kind]
+            result["status"][status] = result["status"].get(status, 0) + 1
+            result["latency"].append(time.perf_counter() - started)
+
+        requests = []
+        started = time.perf_counter()
+        while (picked := swarm.next()) is not None:
+            if rate:
+                await asyncio.sleep(max(0, started + len(requests) / rate - time.perf_counter()))
+            await slots.acquire()
+            results[picked[0]]["sent"] += 1
+            requests.append(asyncio.create_task(post(*picked)))
+        await asyncio.gather(*requests)
+        duration = time.perf_counter() - started
+    return results, duration
+
+def scrape_signature_outcomes(metrics_url):
+    """aggregator_signatures counter by status, from the aggregator's prometheus endpoint"""
+    import requests
+    from prometheus_client.parser import text_string_to_metric_families
+    outcomes = {}
+    for family in text_string_to_metric_families(requests.get(metrics_url, timeout=5).text):
+        if family.name == "aggregator_signatures":
+            for sample in family.samples:
+                if sample.name.endswith("_total"):
+                    outcomes[sample.labels["status"]] = int(sample.value)
+    return outcomes
+
+def wait_for(condition, timeout, what):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            raise TimeoutError(f"Timed out waiting for {what}")
+        time.sleep(0.1)
+
+def port_open(port):
+    import socket
+    try:
+        socket.create_connection(("127.0.0.1", port), timeout=1).close()
+        return True
+    except OSError:
+        return False
+
+def serve_aggregator(config_path, task_count):
+    """Child process: a real Aggregator that creates `task_count` tasks and serves /signature"""
+    from aggregator import Aggregator
+    with open(config_path) as f:
+        config = json.load(f)
+    aggregator = Aggregator(config)
+    aggregator.start_metrics()
+    threading.Thread(target=aggregator.start_submitting_signatures, daemon=True).start()
+
+    def create_tasks():
+        for start in range(0, task_count, TASK_BATCH):
+            prompts = [f"{PROMPT} #{i}" for i in range(start, min(start + TASK_BATCH, task_count))]
+            aggregator.send_new_manager_instructions_verification_tasks(prompts)
+
+    threading.Thread(target=create_tasks, daemon=True).start()
+    aggregator.start_server()
+
+def sign_all(tasks, operator_count, workers):
+    """Pre-signs every (task, operator) response so signing doesn't throttle the swarm"""
+    from operator_pipeline import _init_signers, sign_verdict
+    from e2e_latency import BenchIdentity, bench_key_pair
+    operator_ids = ["0x" + BenchIdentity(bench_key_pair(i)).operator_id.hex() for i in range(operator_count)]
+    jobs = [(task_index, operator) for task_index in sorted(tasks) for operator in range(operator_count)]
+    private_keys = [bench_private_key(i) for i in range(operator_count)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_signers, initargs=(private_keys,)) as pool:
+        signatures = pool.map(
+            sign_verdict, [task for task, _ in jobs], [True] * len(jobs), [operator for _, operator in jobs],
+            chunksize=64,
+        )
+        return [
+            {
+                "task_id": task_index,
+                "verification_status": True,
+                "signature": signature,
+                "block_number": tasks[task_index],
+                "operator_id": operator_ids[operator],
+            }
+            for (task_index, operator), (signature, _) in zip(jobs, signatures)
+        ]
+
+def run(args):
+    from standin_chain import StandInChain, StandInRpcServer
+
+    workdir = tempfile.mkdtemp(prefix="signature-swarm-")
+    chain = StandInChain(block_time=args.block_time)
+    StandInRpcServer(chain).start_in_background("127.0.0.1", CHAIN_PORT)
+    watcher = TaskWatcher(chain)
+    print(f"Registering {args.operators} operators")
+    register_bench_operators(chain, args.operators)
+
+    config = bench_aggregator_config(CHAIN_PORT, AGGREGATOR_PORT, workdir)
+    config.update({
+        "enable_metrics": "true",
+        "eigen_metrics_ip_port_address": f"127.0.0.1:{METRICS_PORT}",
+        "signature_verification_workers": str(args.verification_workers),
+    })
+    config_path = os.path.join(workdir, "aggregator.json")
+    with open(config_path, "w") as f:
+        json.dump(config, f)
+    log_path = os.path.join(workdir, "aggregator.log")
+    with open(log_path, "w") as log:
+        child = subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--serve-aggregator", config_path, "--tasks", str(args.tasks)],
+            cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT,
+        )
+    try:
+        wait_for(lambda: port_open(AGGREGATOR_PORT) or child.poll() is not None, 120, "the aggregator to start")
+        wait_for(lambda: len(watcher.created) >= args.tasks or child.poll() is not None, args.timeout, "tasks to be created")
+        if child.poll() is not None:
+            raise RuntimeError(f"Aggregator exited with {child.returncode}, see {log_path}")
+
+        print(f"Pre-signing {args.tasks * args.operators} responses")
+        with watcher.lock:
+            tasks = dict(watcher.created)
+        submissions = sign_all(tasks, args.operators, args.signing_workers)
+        swarm = Swarm(submissions, watcher, args.duplicate_ratio, args.late_ratio, seed=args.seed)
+
+        metrics_url = f"http://127.0.0.1:{METRICS_PORT}/metrics"
+        outcomes_before = scrape_signature_outcomes(metrics_url)
+        sampler = ResourceSampler(child.pid)
+        sampler.start()
+        print(f"Posting at {args.rate or 'unlimited'} req/s with concurrency {args.concurrency}")
+        results, duration = asyncio.run(post_swarm(
+            f"http://127.0.0.1:{AGGREGATOR_PORT}/signature", swarm, args.rate, args.concurrency,
+        ))
+        resources = sampler.stop()
+        outcomes_after = scrape_signature_outcomes(metrics_url)
+        if args.wait_for_responses:
+            wait_for(lambda: len(watcher.completed) >= len(tasks), args.timeout, "task responses")
+    finally:
+        child.terminate()
+        child.wait()
+
+    total = sum(result["sent"] for result in results.values())
+    return {
+        "commit": git_commit(),
+        "timestamp": int(time.time()),
+        "params": {key: value for key, value in vars(args).items() if key not in ("json", "serve_aggregator")},
+        "requests": total,
+        "duration_s": round(duration, 3),
+        "requests_per_second": round(total / duration, 1) if duration > 0 else None,
+        "by_kind": {
+            kind: {
+                "sent": result["sent"],
+                "http_status": result["status"],
+                "latency": percentiles(result["latency"]),
+            }
+            for kind, result in results.items()
+        },
+        "aggregator_outcomes": {
+            status: count - outcomes_before.get(status, 0) for status, count in outcomes_after.items()
+        },
+        "tasks_completed": len(watcher.completed),
+        "aggregator_resources": resources,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthetic operator swarm against the aggregator's /signature endpoint")
+    parser.add_argument("--operators", type=int, default=64)
+    parser.add_argument("--tasks", type=int, default=20)
+    parser.add_argument("--rate", type=float, default=1000, help="requests per second; 0 for unthrottled")
+    parser.add_argument("--concurrency", type=int, default=64, help="maximum requests in flight")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--late-ratio", type=float, default=0.05)
+    parser.add_argument("--verification-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--signing-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--block-time", type=float, default=0.5)
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--wait-for-responses", action="store_true", help="also wait for every task's response to be mined")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default="benchmarks/results/signature_swarm.json")
+    parser.add_argument("--serve-aggregator", metavar="CONFIG", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_aggregator:
+        serve_aggregator(args.serve_aggregator, args.tasks)
+        return
+
+    report = run(args)
+    print(f"{report['requests']} requests in {report['duration_s']}s: {report['requests_per_second']} req/s")
+    for kind, result in report["by_kind"].items():
+        latency = result["latency"] or {}
+        print(f"  {kind:<9} sent {result['sent']:>7}  status {result['http_status']}  p50 {latency.get('p50')}s p99 {latency.get('p99')}s")
+    print(f"  aggregator outcomes {report['aggregator_outcomes']}")
+    print(f"  aggregator resources {report['aggregator_resources']}")
+    os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
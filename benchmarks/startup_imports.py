@@ -0,0 +1,78 @@
+# benchmarks/startup_imports.py
+"""Measures how long each entry point takes to import.
+
+Every module is imported in a fresh interpreter several times; the median wall time is
+reported together with the slowest imports from `python -X importtime`.
+
+    python benchmarks/startup_imports.py [--runs 5] [--top 10] [--json results.json] [module ...]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+
+ENTRY_POINTS = ["prompt_operator", "aggregator", "agents", "mytools", "routellm", "openai_agent"]
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def time_import(module):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    return elapsed, result
+
+def slowest_imports(importtime_output, top):
+    """Parses `-X importtime` lines ("import time: self | cumulative | name") into the top cumulative entries"""
+    entries = []
+    for line in importtime_output.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # nested imports are indented; keeping only top-level ones stops one heavy package filling the list
+        if not name[1:].startswith(" "):
+            entries.append((int(cumulative), name.strip()))
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for us, name in sorted(entries, reverse=True)[:top]]
+
+def benchmark(module, runs, top):
+    timings = []
+    for _ in range(runs):
+        elapsed, result = time_import(module)
+        if result.returncode != 0:
+            error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed"
+            return {"module": module, "error": error}
+        timings.append(elapsed)
+    return {
+        "module": module,
+        "runs": runs,
+        "median_s": round(statistics.median(timings), 3),
+        "min_s": round(min(timings), 3),
+        "slowest_imports": slowest_imports(result.stderr, top),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Import time per entry point")
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = [benchmark(module, args.runs, args.top) for module in args.modules]
+    for result in results:
+        if "error" in result:
+            print(f"{result['module']:<20} failed: {result['error']}")
+            continue
+        print(f"{result['module']:<20} median {result['median_s']:.3f}s  min {result['min_s']:.3f}s")
+        for entry in result["slowest_imports"]:
+            print(f"    {entry['cumulative_ms']:>9.1f} ms  {entry['module']}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# chain_events.py
+import json
+import logging
+import websockets
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+
+logger = logging.getLogger(__name__)
+
+def format_log(raw_log):
+    """Converts a JSON-RPC log object into the shape web3's process_log expects"""
+    return AttributeDict({
+        "address": Web3.to_checksum_address(raw_log["address"]),
+        "topics": [HexBytes(topic) for topic in raw_log["topics"]],
+        "data": HexBytes(raw_log["data"]),
+        "blockNumber": int(raw_log["blockNumber"], 16),
+        "blockHash": HexBytes(raw_log["blockHash"]),
+        "transactionHash": HexBytes(raw_log["transactionHash"]),
+        "transactionIndex": int(raw_log["transactionIndex"], 16),
+        "logIndex": int(raw_log["logIndex"], 16),
+        "removed": raw_log.get("removed", False),
+    })
+
+class LogSubscription:
+    """eth_subscribe("logs") over a websocket endpoint.
+
+    The subscription is active once the `async with` block is entered, so callers can
+    backfill over HTTP afterwards without missing anything emitted in between.
+    """
+    def __init__(self, ws_url, address, topics):
+        self.ws_url = ws_url
+        self.address = address
+        self.topics = topics
+        self.websocket = None
+        self.subscription_id = None
+
+    async def __aenter__(self):
+        self.websocket = await websockets.connect(self.ws_url)
+        await self.websocket.send(json.dumps({
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "eth_subscribe",
+            "params": ["logs", {"address": self.address, "topics": self.topics}],
+        }))
+        reply = json.loads(await self.websocket.recv())
+        if "error" in reply:
+            await self.websocket.close()
+            raise RuntimeError(f"eth_subscribe failed: {reply['error']}")
+        self.subscription_id = reply["result"]
+        logger.debug(f"Subscribed to logs of {self.address} ({self.subscription_id})")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.websocket.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            message = json.loads(await self.websocket.recv())
+            params = message.get("params") or {}
+            if params.get("subscription") == self.subscription_id:
+                return format_log(params["result"])
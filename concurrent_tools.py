@@ -0,0 +1,69 @@
+# concurrent_tools.py
+import os
+import time
+import asyncio
+import inspect
+import logging
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from autogen import ConversableAgent
+
+logger = logging.getLogger(__name__)
+
+# tools (scrapes, posts) block on the network, so a thread pool shared by all agents runs them
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TOOL_WORKERS", 8)), thread_name_prefix="tool")
+
+# process-wide limits, shared by every agent and every session (see agent_server.py)
+llm_slots = threading.BoundedSemaphore(int(os.getenv("MAX_CONCURRENT_LLM_REQUESTS", 8)))
+scrape_slots = threading.BoundedSemaphore(int(os.getenv("MAX_CONCURRENT_SCRAPES", 4)))
+
+def limited(slots, func):
+    """`func`, but holding one of `slots` while it runs"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with slots:
+            return func(*args, **kwargs)
+    return wrapper
+
+def _execute(agent, tool_call):
+    function_call = tool_call.get("function", {})
+    tool_call_id = tool_call.get("id")
+    func = agent._function_map.get(function_call.get("name"))
+    if inspect.iscoroutinefunction(func):
+        _, func_return = asyncio.run(agent.a_execute_function(function_call, call_id=tool_call_id))
+    else:
+        _, func_return = agent.execute_function(function_call, call_id=tool_call_id)
+    response = {"role": "tool", "content": func_return.get("content") or ""}
+    if tool_call_id is not None:
+        response["tool_call_id"] = tool_call_id
+    return response
+
+def concurrent_tool_calls_reply(agent, messages=None, sender=None, config=None):
+    """Drop-in for ConversableAgent.generate_tool_calls_reply that runs all tool calls of a message at once.
+
+    Results are merged into one tool message in call order, so a round with several sources
+    takes about as long as the slowest one instead of their sum.
+    """
+    if messages is None:
+        messages = agent._oai_messages[sender]
+    tool_calls = messages[-1].get("tool_calls", [])
+    if not tool_calls:
+        return False, None
+    started = time.monotonic()
+    futures = [_executor.submit(_execute, agent, tool_call) for tool_call in tool_calls]
+    tool_returns = [future.result() for future in futures]
+    logger.info(f"{agent.name} ran {len(tool_calls)} tool calls concurrently in {time.monotonic() - started:.1f}s")
+    return True, {
+        "role": "tool",
+        "tool_responses": tool_returns,
+        "content": "\n\n".join(agent._str_for_tool_response(tool_return) for tool_return in tool_returns),
+    }
+
+def enable_concurrent_tools(agent):
+    """Only for agents whose tools are independent reads (e.g. scrapes); the order of their side effects is not kept"""
+    agent.replace_reply_func(ConversableAgent.generate_tool_calls_reply, concurrent_tool_calls_reply)
+
+def limit_llm_requests(agent):
+    """Makes the agent's model calls wait for one of the global llm_slots"""
+    agent.replace_reply_func(ConversableAgent.generate_oai_reply, limited(llm_slots, ConversableAgent.generate_oai_reply))
@@ -0,0 +1,232 @@
+# context_compaction.py
+import json
+import hashlib
+import logging
+import threading
+from autogen import register_function
+from autogen.agentchat.contrib.capabilities.transform_messages import TransformMessages
+from autogen.agentchat.contrib.capabilities.transforms_util import count_text_tokens
+
+logger = logging.getLogger(__name__)
+
+def message_tokens(message):
+    """Tokens the message costs in a prompt, counted the way ag2 sends it"""
+    tool_responses = message.get("tool_responses") or []
+    # tool_responses are unrolled into messages of their own; a "tool" parent's content is not sent at all
+    tokens = sum(count_text_tokens(response.get("content") or "") for response in tool_responses)
+    if not (tool_responses and message.get("role") == "tool"):
+        tokens += count_text_tokens(message.get("content") or "")
+    if message.get("tool_calls"):
+        tokens += count_text_tokens(json.dumps(message["tool_calls"]))
+    return tokens
+
+def is_tool_result(message):
+    return message.get("role") in ("tool", "function") or bool(message.get("tool_responses"))
+
+def _excerpt(text, max_tokens):
+    """First `max_tokens` tokens worth of `text`, cut on a line or word boundary"""
+    kept = []
+    tokens = 0
+    for line in text.splitlines():
+        line_tokens = count_text_tokens(line)
+        if tokens + line_tokens > max_tokens:
+            words = line.split()
+            while words and tokens + count_text_tokens(" ".join(words)) > max_tokens:
+                words = words[: len(words) // 2]
+            if words:
+                kept.append(" ".join(words))
+            break
+        kept.append(line)
+        tokens += line_tokens
+    return "\n".join(kept)
+
+class OutputStore:
+    """Large tool outputs by handle, so compacted transcripts can point at them instead of repeating them.
+
+    Agents that should be able to read a referenced output in full get the fetch_output tool
+    with `add_fetch_tool`.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.outputs = {}
+
+    def put(self, text):
+        handle = "out-" + hashlib.sha256(text.encode()).hexdigest()[:10]
+        with self.lock:
+            self.outputs[handle] = text
+        return handle
+
+    def get(self, handle):
+        with self.lock:
+            return self.outputs.get(handle)
+
+    def add_fetch_tool(self, agent):
+        def fetch_output(handle: str) -> str:
+            output = self.get(handle.strip())
+            return output if output is not None else f"No stored output {handle}"
+
+        register_function(
+            fetch_output,
+            caller=agent,
+            executor=agent,
+            name="fetch_output",
+            description="Returns the full text of a truncated output by its handle, e.g. out-1a2b3c4d5e",
+        )
+
+class LargeOutputReferencer:
+    """Replaces large tool results and code/scraper output in earlier turns with an excerpt and a handle.
+
+    The newest message is left intact: the agent replying to it needs the full output once.
+    """
+    def __init__(self, store, max_tokens=400, excerpt_tokens=120, names=("web-scraper", "coder")):
+        self.store = store
+        self.max_tokens = max_tokens
+        self.excerpt_tokens = excerpt_tokens
+        self.names = set(names)
+
+    def apply_transform(self, messages):
+        for message in messages[:-1]:
+            if not (is_tool_result(message) or message.get("name") in self.names):
+                continue
+            # the model sees each tool response rather than the parent's content, so both are referenced
+            for response in message.get("tool_responses") or []:
+                response["content"] = self._reference(response.get("content"))
+            message["content"] = self._reference(message.get("content"))
+        return messages
+
+    def _reference(self, content):
+        if not isinstance(content, str):
+            return content
+        tokens = count_text_tokens(content)
+        if tokens <= self.max_tokens:
+            return content
+        handle = self.store.put(content)
+        return (
+            f"{_excerpt(content, self.excerpt_tokens)}\n"
+            f"[... output truncated: {tokens} tokens; fetch_output(\"{handle}\") returns all of it]"
+        )
+
+    def get_logs(self, pre_transform_messages, post_transform_messages):
+        return _token_logs("LargeOutputReferencer", pre_transform_messages, post_transform_messages)
+
+class RollingSummary:
+    """Folds everything but the last `keep_recent` messages into one running summary message.
+
+    The summary is extended incrementally as messages age out, so each round only summarizes
+    the newly aged messages. `summarize(previous summary, messages)` defaults to a local
+    extractive digest (speaker and the opening of each message) that costs no model call.
+    """
+    def __init__(self, keep_recent=6, summarize=None, line_tokens=60, max_summary_tokens=1500):
+        self.keep_recent = keep_recent
+        self.summarize = summarize or self._digest
+        self.line_tokens = line_tokens
+        self.max_summary_tokens = max_summary_tokens
+        self.summary = ""
+        self.summarized = []  # fingerprints of the messages folded into `summary`, in order
+
+    def apply_transform(self, messages):
+        split = max(0, len(messages) - self.keep_recent)
+        # never separate a tool result from the call it answers
+        while 0 < split < len(messages) and is_tool_result(messages[split]):
+            split -= 1
+        aged, recent = messages[:split], messages[split:]
+        if not aged:
+            return messages
+        fingerprints = [self._fingerprint(message) for message in aged]
+        if fingerprints[: len(self.summarized)] != self.summarized:
+            # a different or rewritten transcript (e.g. a new chat): start over
+            self.summary, self.summarized = "", []
+        new = aged[len(self.summarized):]
+        if new:
+            self.summary = self.summarize(self.summary, new)
+            self.summarized = fingerprints
+        return [{"role": "user", "name": "context_summary", "content": f"Summary of the earlier conversation:\n{self.summary}"}] + recent
+
+    def _digest(self, summary, messages):
+        lines = summary.splitlines()
+        for message in messages:
+            if message.get("tool_calls"):
+                calls = ", ".join(call.get("function", {}).get("name", "?") for call in message["tool_calls"])
+                text = f"called {calls}"
+            else:
+                text = _excerpt(" ".join(str(message.get("content") or "").split()), self.line_tokens)
+            if text:
+                lines.append(f"- {message.get('name', message.get('role'))}: {text}")
+        # the oldest lines go first once the digest outgrows its budget
+        while len(lines) > 1 and count_text_tokens("\n".join(lines)) > self.max_summary_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _fingerprint(message):
+        return hashlib.sha256(json.dumps(message, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get_logs(self, pre_transform_messages, post_transform_messages):
+        return _token_logs("RollingSummary", pre_transform_messages, post_transform_messages)
+
+class TokenBudget:
+    """Drops the oldest messages after the summary until the history fits `max_tokens`.
+
+    A tool call and its results are kept or dropped as one, so no result is left without the
+    call it answers. The newest message (with its tool call, if it is a result) is always kept.
+    """
+    def __init__(self, max_tokens):
+        self.max_tokens = max_tokens
+
+    def apply_transform(self, messages):
+        head = messages[:1] if messages and messages[0].get("name") == "context_summary" else []
+        groups = []  # [message] or [tool call message, its results...]
+        for message in messages[len(head):]:
+            if is_tool_result(message) and groups:
+                groups[-1].append(message)
+            else:
+                groups.append([message])
+        total = sum(message_tokens(message) for message in messages)
+        while total > self.max_tokens and len(groups) > 1:
+            total -= sum(message_tokens(message) for message in groups.pop(0))
+        return head + [message for group in groups for message in group]
+
+    def get_logs(self, pre_transform_messages, post_transform_messages):
+        return _token_logs("TokenBudget", pre_transform_messages, post_transform_messages)
+
+def _token_logs(name, pre_transform_messages, post_transform_messages):
+    before = sum(message_tokens(message) for message in pre_transform_messages)
+    after = sum(message_tokens(message) for message in post_transform_messages)
+    return f"{name}: {before} -> {after} tokens", before != after
+
+class ContextCompactor(TransformMessages):
+    """Keeps an agent's group chat context bounded: large outputs by handle, a rolling summary of
+    earlier rounds and a hard token budget. Logs the tokens saved on every reply.
+
+        ContextCompactor(store, max_tokens=6000).add_to_agent(agent)
+    """
+    def __init__(self, store, max_tokens=6000, keep_recent=6, summarize=None):
+        super().__init__(
+            transforms=[
+                LargeOutputReferencer(store),
+                RollingSummary(keep_recent=keep_recent, summarize=summarize),
+                TokenBudget(max_tokens),
+            ],
+            verbose=False,
+        )
+        self.agent_name = None
+        self.rounds = 0
+        self.tokens_saved = 0
+
+    def add_to_agent(self, agent):
+        self.agent_name = agent.name
+        super().add_to_agent(agent)
+
+    def _transform_messages(self, messages):
+        if not messages:
+            return messages
+        compacted = super()._transform_messages(messages)
+        before = sum(message_tokens(message) for message in messages)
+        after = sum(message_tokens(message) for message in compacted)
+        self.rounds += 1
+        self.tokens_saved += before - after
+        logger.info(
+            f"{self.agent_name} round {self.rounds}: context {before} -> {after} tokens "
+            f"(saved {before - after}, {self.tokens_saved} in total)"
+        )
+        return compacted
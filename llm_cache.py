@@ -0,0 +1,95 @@
+# llm_cache.py
+import os
+import atexit
+import hashlib
+import logging
+import threading
+from functools import lru_cache
+import diskcache
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+class LLMResponseCache:
+    """Disk-backed response cache shared by every agent, implementing autogen's AbstractCache.
+
+    autogen keys responses on the full create params (model, temperature, max_tokens, tools and
+    messages), so a re-run pipeline or a retried turn is answered from disk. Entries expire
+    after `ttl` seconds and the least recently used are evicted beyond `size_limit` bytes.
+    Several processes can share one directory.
+    """
+    def __init__(self, directory, ttl=7 * 24 * 3600, size_limit=2 ** 30):
+        self.directory = directory
+        self.ttl = ttl
+        self.cache = diskcache.Cache(directory, size_limit=size_limit, eviction_policy="least-recently-used")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+
+    @staticmethod
+    def _key(key):
+        # autogen's keys are the JSON-dumped request, messages included
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    def get(self, key, default=None):
+        value = self.cache.get(self._key(key), default=_MISSING)
+        with self.lock:
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self.hits += 1
+        return value
+
+    def set(self, key, value):
+        self.cache.set(self._key(key), value, expire=self.ttl)
+        with self.lock:
+            self.writes += 1
+
+    def stats(self):
+        with self.lock:
+            hits, misses, writes = self.hits, self.misses, self.writes
+        return {
+            "hits": hits,
+            "misses": misses,
+            "writes": writes,
+            "hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+            "entries": len(self.cache),
+            "size_bytes": self.cache.volume(),
+        }
+
+    def close(self):
+        # autogen opens and closes the cache around every request; the shared cache stays open
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+    def __deepcopy__(self, memo):
+        # agents deep-copy their llm_config; all copies must share this cache
+        return self
+
+@lru_cache(maxsize=None)
+def shared_cache():
+    """The process-wide cache, configured from the environment; None when LLM_CACHE_DISABLED is set"""
+    if os.getenv("LLM_CACHE_DISABLED", "false").lower() == "true":
+        return None
+    cache = LLMResponseCache(
+        os.getenv("LLM_CACHE_DIR", "data/llm_cache"),
+        ttl=int(os.getenv("LLM_CACHE_TTL_SECONDS", 7 * 24 * 3600)),
+        size_limit=int(os.getenv("LLM_CACHE_SIZE_LIMIT_MB", 1024)) * 2 ** 20,
+    )
+    atexit.register(lambda: logger.info(f"LLM response cache: {cache.stats()}"))
+    return cache
+
+def cached_llm_config(llm_config):
+    """`llm_config` answered from the shared cache (autogen passes an llm_config "cache" to every request)"""
+    return {**llm_config, "cache": shared_cache()}
+
+def uncached_llm_config(llm_config):
+    """`llm_config` for roles whose replies must not be replayed, e.g. ones that post or sample freely"""
+    return {**llm_config, "cache": None, "cache_seed": None}
@@ -0,0 +1,90 @@
+# llm_policy.py
+import re
+import json
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CLASSIFY_PROMPT = """You review instructions given to an AI newsletter manager agent.
+For each numbered prompt below decide whether it is relevant (about Ethereum, DeFi or L2s)
+and safe (no harmful, deceptive or manipulative instructions).
+Answer with only a JSON list holding one object per prompt, in order, like
+[{{"relevant": true, "safe": true}}].
+
+{prompts}"""
+
+class LLMPolicy:
+    """Optional LLM relevance and safety check that runs after the rule-based policy.
+
+    Prompts from concurrent tasks are micro-batched into one model call (waiting at most
+    `batch_wait` seconds for a batch to fill) and at most `max_in_flight` calls run at once.
+    `classify` returns a future; callers wait on it only until their task's deadline.
+    """
+    def __init__(self, inference, max_batch_size=8, max_in_flight=4, batch_wait=0.05):
+        self.inference = inference
+        self.max_batch_size = max_batch_size
+        self.batch_wait = batch_wait
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="llm-policy")
+        self.pending = queue.Queue()
+        threading.Thread(target=self._batcher, name="llm-policy-batcher", daemon=True).start()
+
+    def classify(self, prompt, deadline):
+        """Resolves to {"llm_relevance": bool, "llm_safety": bool}; deadline is a time.monotonic() value"""
+        future = Future()
+        self.pending.put((prompt, deadline, future))
+        return future
+
+    def _batcher(self):
+        while True:
+            batch = [self.pending.get()]
+            flush_at = time.monotonic() + self.batch_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    batch.append(self.pending.get(timeout=max(0, flush_at - time.monotonic())))
+                except queue.Empty:
+                    break
+            self.in_flight.acquire()
+            # callers stop waiting at their deadline, so anything already past it is not worth a call
+            now = time.monotonic()
+            live = []
+            for prompt, deadline, future in batch:
+                if deadline <= now:
+                    future.set_exception(TimeoutError("deadline passed before the model was called"))
+                else:
+                    live.append((prompt, future))
+            if live:
+                self.executor.submit(self._classify_batch, live)
+            else:
+                self.in_flight.release()
+
+    def _classify_batch(self, batch):
+        try:
+            prompts = "\n".join(f"{i + 1}. {json.dumps(prompt)}" for i, (prompt, _) in enumerate(batch))
+            answer = self.inference(CLASSIFY_PROMPT.format(prompts=prompts))
+            verdicts = self._parse(answer, len(batch))
+            for (_, future), verdict in zip(batch, verdicts):
+                future.set_result({
+                    "llm_relevance": bool(verdict.get("relevant")),
+                    "llm_safety": bool(verdict.get("safe")),
+                })
+        except Exception as e:
+            logger.error(f"LLM policy check of {len(batch)} prompts failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finally:
+            self.in_flight.release()
+
+    def _parse(self, answer, expected):
+        match = re.search(r"\[.*\]", answer, re.DOTALL)
+        if match is None:
+            raise ValueError(f"no JSON list in model answer: {answer!r}")
+        verdicts = json.loads(match.group(0))
+        if len(verdicts) != expected:
+            raise ValueError(f"model returned {len(verdicts)} verdicts for {expected} prompts")
+        return verdicts
@@ -0,0 +1,143 @@
+# metrics.py
+import time
+import logging
+import threading
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, start_http_server
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+class OperatorMetrics:
+    """Prometheus metrics for the operator's per-task path: event lag, policy, signing and submission.
+
+    Metrics are always recorded; they are only served when `enable_metrics` is set.
+    """
+    def __init__(self, avs_name="newsletter-prompt"):
+        self.registry = CollectorRegistry()
+        labels = {"avs_name": avs_name}
+        self.event_lag_blocks = Histogram(
+            "operator_task_event_lag_blocks", "Chain head minus the block of a NewTaskCreated event when it is handled",
+            buckets=(0, 1, 2, 5, 10, 50, 100, 1000), registry=self.registry,
+        )
+        self.event_lag_seconds = Histogram(
+            "operator_task_event_lag_seconds", "Time between a task's block timestamp and the operator handling it",
+            buckets=(1, 2, 5, 10, 30, 60, 300, 3600), registry=self.registry,
+        )
+        self.policy_seconds = Histogram(
+            "operator_policy_evaluation_seconds", "Time to evaluate the policy for one batch of tasks",
+            buckets=LATENCY_BUCKETS, registry=self.registry,
+        )
+        self.signing_seconds = Histogram(
+            "operator_bls_signing_seconds", "Time to BLS-sign one verdict in a signing worker",
+            buckets=LATENCY_BUCKETS, registry=self.registry,
+        )
+        self.submission_seconds = Histogram(
+            "operator_aggregator_post_seconds", "Latency of one POST of a signed verdict to the aggregator",
+            buckets=LATENCY_BUCKETS, registry=self.registry,
+        )
+        self.submission_errors = Counter(
+            "operator_aggregator_post_errors", "Failed verdict submissions to the aggregator",
+            ["reason"], registry=self.registry,
+        )
+        self.tasks_processed = Counter(
+            "operator_tasks_processed", "Tasks whose verdict was submitted, by verdict",
+            ["verdict"], registry=self.registry,
+        )
+        self.last_processed_block = Gauge(
+            "operator_last_processed_block", "Last block whose task events were fully processed",
+            registry=self.registry,
+        )
+        self.tasks_in_flight = Gauge(
+            "operator_tasks_in_flight", "Tasks currently in the operator pipeline",
+            registry=self.registry,
+        )
+        self.info = Gauge("operator_info", "Static operator information", list(labels), registry=self.registry)
+        self.info.labels(**labels).set(1)
+
+    def start(self, ip_port_address):
+        serve(self.registry, ip_port_address)
+
+def serve(registry, ip_port_address):
+    host, port = ip_port_address.rsplit(":", 1)
+    start_http_server(int(port), addr=host, registry=registry)
+    logger.info(f"Serving metrics on {ip_port_address}")
+
+class AggregatorMetrics:
+    """Prometheus metrics for the aggregator, with a per-task latency breakdown.
+
+    A task's latency is split into consecutive phases: operators (task created -> first
+    signature), aggregation (-> quorum reached) and chain_inclusion (-> respondToTask mined),
+    showing whether verification latency is spent on operators, aggregation or the chain.
+    """
+    def __init__(self, avs_name="newsletter-prompt", task_ttl=3600):
+        self.registry = CollectorRegistry()
+        self.task_ttl = task_ttl
+        self.lock = threading.Lock()
+        self.tasks = {}  # task index -> {event: time.time()}
+        self.phase_seconds = Histogram(
+            "aggregator_task_phase_seconds", "Duration of each phase of a task",
+            ["phase"], buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120), registry=self.registry,
+        )
+        self.task_seconds = Histogram(
+            "aggregator_task_seconds", "Time from task creation until its response is mined",
+            buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300), registry=self.registry,
+        )
+        self.signatures = Counter(
+            "aggregator_signatures", "Operator signatures handled by the ingestion server, by outcome",
+            ["status"], registry=self.registry,
+        )
+        self.gas_used = Histogram(
+            "aggregator_tx_gas_used", "Gas used per mined transaction",
+            ["method"], buckets=(50_000, 100_000, 200_000, 300_000, 500_000, 1_000_000, 2_000_000, 4_000_000),
+            registry=self.registry,
+        )
+        self.ingress_queue_depth = Gauge(
+            "aggregator_ingress_queue_depth", "Signatures waiting in the ingestion server queue", registry=self.registry,
+        )
+        self.response_queue_depth = Gauge(
+            "aggregator_response_queue_depth", "Aggregated responses waiting to be posted on chain", registry=self.registry,
+        )
+        self.aggregation_backlog = Gauge(
+            "aggregator_aggregation_backlog", "Initialized tasks that have not reached quorum yet", registry=self.registry,
+        )
+        self.aggregation_backlog.set_function(self._backlog)
+        self.info = Gauge("aggregator_info", "Static aggregator information", ["avs_name"], registry=self.registry)
+        self.info.labels(avs_name=avs_name).set(1)
+
+    def start(self, ip_port_address):
+        serve(self.registry, ip_port_address)
+
+    def task_created(self, task_index):
+        now = time.time()
+        with self.lock:
+            self.tasks[task_index] = {"created": now}
+            # tasks that never reach quorum would otherwise stay forever
+            for stale in [index for index, events in self.tasks.items() if now - events["created"] > self.task_ttl]:
+                del self.tasks[stale]
+
+    def signature_received(self, task_index):
+        self._record(task_index, "first_signature", "created", "operators")
+
+    def quorum_reached(self, task_index):
+        self._record(task_index, "quorum", "first_signature", "aggregation")
+
+    def response_mined(self, task_index, receipt):
+        self.gas_used.labels(method="respondToTask").observe(receipt["gasUsed"])
+        self._record(task_index, "mined", "quorum", "chain_inclusion")
+        with self.lock:
+            events = self.tasks.pop(task_index, None)
+        if events is not None and "mined" in events:
+            self.task_seconds.observe(events["mined"] - events["created"])
+
+    def _record(self, task_index, event, previous, phase):
+        with self.lock:
+            events = self.tasks.get(task_index)
+            if events is None or event in events or previous not in events:
+                return
+            events[event] = time.time()
+        self.phase_seconds.labels(phase=phase).observe(events[event] - events[previous])
+
+    def _backlog(self):
+        with self.lock:
+            return sum(1 for events in self.tasks.values() if "quorum" not in events)
@@ -2,39 +2,14 @@
 
 import os
 import json
-from dotenv import load_dotenv
-import autogen
-from autogen import ConversableAgent, UserProxyAgent
-from autogen.agentchat.contrib.capabilities.teachability import Teachability
-from autogen.formatting_utils import colored
-from autogen.agentchat.contrib.society_of_mind_agent import SocietyOfMindAgent
-from qdrant_client import QdrantClient, models
-from sentence_transformers import SentenceTransformer
-from autogen.agentchat.contrib.retrieve_user_proxy_agent import RetrieveUserProxyAgent
-from autogen.retrieve_utils import TEXT_FORMATS
 import requests
-import pandas as pd
-from typing import Dict, Any
-from dotenv import load_dotenv
-from scrapegraphai.graphs import SmartScraperGraph
-from autogen import ConversableAgent, UserProxyAgent, register_function
-import asyncio
 import nest_asyncio
-from typing import Dict, Any, Optional, List
-import google.generativeai as genai
-from autogen import ConversableAgent
-import pypdf
-import rapidocr_onnxruntime
-import os
-import tweepy
-from autogen import ConversableAgent, register_function
-
-import asyncio
-from typing import Optional, Dict, Any, Callable
-from twikit import Client
-import os
-import requests
+from dotenv import load_dotenv
+from typing import Optional
 from autogen import ConversableAgent, register_function
+from llm_cache import cached_llm_config
+from concurrent_tools import enable_concurrent_tools, scrape_slots
+# tweepy and scrapegraphai are imported by the tools that use them; both take seconds to load
 
 nest_asyncio.apply()
 
@@ -59,11 +34,12 @@ config_list = [
     }
 ]
 
-llm_config = {
+# responses come from the shared disk cache (llm_cache.py); cache_seed=None keeps autogen's per-seed cache off
+llm_config = cached_llm_config({
     "config_list": config_list,
     "cache_seed": None,
     "timeout": 600
-}
+})
 
 def save_config():
     """Save configuration to JSON file"""
@@ -89,6 +65,7 @@ class TelegramPostAgent(ConversableAgent):
             name="post_message",
             description="Posts content to a Telegram group and returns the result"
         )
+        # posts are side effects: ag2's default sequential execution keeps them in call order (and reply chains intact)
 
     def post_message(self, content: str, reply_to_message_id: Optional[int] = None) -> dict:
         """Posts a message to the Telegram group (optionally replies to another message)."""
@@ -149,6 +126,7 @@ class TwitterPostAgent(ConversableAgent):
 
         # Initialize Twitter client
         try:
+            import tweepy
             self.twitter_client = tweepy.Client(
                 consumer_key=os.getenv('TWITTER_API_KEY'),
                 consumer_secret=os.getenv('TWITTER_API_SECRET_KEY'),
@@ -169,6 +147,7 @@ class TwitterPostAgent(ConversableAgent):
             name="post_tweet",
             description="Posts content to Twitter and returns the result"
         )
+        # posts are side effects: ag2's default sequential execution keeps them in call order
 
     def post_tweet(self, content: str) -> dict:
         """Posts a tweet and returns the result with proper error handling"""
@@ -207,7 +186,8 @@ class WebScraperAgent(ConversableAgent):
         When scraping fails:
         1. Try alternative sources
         2. Return any partial successes
-        3. Report what was found and what failed"""
+        3. Report what was found and what failed
+        When several sources are needed, call web_scraper for all of them in one reply so they are scraped in parallel"""
         super().__init__(
             name=name,
             system_message=system_message or default_system_message,
@@ -222,6 +202,7 @@ class WebScraperAgent(ConversableAgent):
             name="web_scraper",
             description="A tool that scrapes web content using AI to extract specific information based on prompts"
         )
+        enable_concurrent_tools(self)  # several calls in one reply run in parallel
 
     def web_scraper(self, prompt: str, url: str) -> dict:
         """Scrapes web content with improved error handling"""
@@ -234,12 +215,14 @@ class WebScraperAgent(ConversableAgent):
         }
 
         try:
+            from scrapegraphai.graphs import SmartScraperGraph
             scraper = SmartScraperGraph(
                 prompt=prompt,
                 source=url,
                 config={"llm": {"api_key": openai_api_key, "model": "openai/gpt-4o-mini"}}
             )
-            result = scraper.run()
+            with scrape_slots:  # a global cap, however many scrapes the sessions issue at once
+                result = scraper.run()
 
             if result:
                 results["success"] = True
@@ -0,0 +1,88 @@
+# node_api.py
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+SPEC_VERSION = "v0.0.1"
+NODE_VERSION = "v0.0.1"
+
+HEALTHY = 200
+PARTIALLY_HEALTHY = 206
+UNHEALTHY = 503
+
+class NodeApi:
+    """EigenLayer AVS node API (https://eigen.nethermind.io/docs/spec/api/) for the operator.
+
+    Health is unhealthy while the task event stream is disconnected and partially healthy
+    while the last verdict submission to the aggregator failed.
+    """
+    def __init__(self, operator, node_name="newsletter-prompt-operator"):
+        self.operator = operator
+        self.node_name = node_name
+
+    def node(self):
+        stream = self.operator.event_stream
+        return HEALTHY, {
+            "node_name": self.node_name,
+            "spec_version": SPEC_VERSION,
+            "node_version": NODE_VERSION,
+            "last_processed_block": stream.last_block if stream is not None else None,
+        }
+
+    def health(self):
+        stream = self.operator.event_stream
+        if stream is None or not stream.connected:
+            return UNHEALTHY, None
+        if not self.operator.pipeline.last_submission_ok:
+            return PARTIALLY_HEALTHY, None
+        return HEALTHY, None
+
+    def services(self):
+        stream = self.operator.event_stream
+        return HEALTHY, {"services": [{
+            "id": "task-event-stream",
+            "name": "NewTaskCreated subscription",
+            "description": "Websocket subscription with checkpointed backfill",
+            "status": "Up" if stream is not None and stream.connected else "Down",
+            "last_processed_block": stream.last_block if stream is not None else None,
+        }]}
+
+    def service_health(self, service_id):
+        if service_id != "task-event-stream":
+            return 404, None
+        stream = self.operator.event_stream
+        return (HEALTHY if stream is not None and stream.connected else UNHEALTHY), None
+
+    def start(self, ip_port_address):
+        host, port = ip_port_address.rsplit(":", 1)
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.rstrip("/")
+                if path == "/eigen/node":
+                    status, body = api.node()
+                elif path == "/eigen/node/health":
+                    status, body = api.health()
+                elif path == "/eigen/node/services":
+                    status, body = api.services()
+                elif path.startswith("/eigen/node/services/") and path.endswith("/health"):
+                    status, body = api.service_health(path[len("/eigen/node/services/"):-len("/health")])
+                else:
+                    status, body = 404, None
+                payload = json.dumps(body).encode() if body is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+        server = ThreadingHTTPServer((host, int(port)), Handler)
+        threading.Thread(target=server.serve_forever, name="node-api", daemon=True).start()
+        logger.info(f"Serving node API on {ip_port_address}")
@@ -1,15 +1,19 @@
 import os
+from functools import lru_cache
 
-from autogen import ConversableAgent
+@lru_cache(maxsize=None)
+def get_agent():
+    # built on first use; importing autogen takes seconds
+    from autogen import ConversableAgent
 
-agent = ConversableAgent(
-    "chatbot",
-    llm_config={"config_list": [{"model": "gpt-4", "api_key": os.environ.get("OPENAI_API_KEY")}]},
-    code_execution_config=False,
-    function_map=None, 
-    human_input_mode="NEVER", 
-)
+    return ConversableAgent(
+        "chatbot",
+        llm_config={"config_list": [{"model": "gpt-4", "api_key": os.environ.get("OPENAI_API_KEY")}]},
+        code_execution_config=False,
+        function_map=None, 
+        human_input_mode="NEVER", 
+    )
 
 
 def inference(prompt):
-    return agent.generate_reply(messages=[{"content": prompt, "role": "user"}])
\ No newline at end of file
+    return get_agent().generate_reply(messages=[{"content": prompt, "role": "user"}])
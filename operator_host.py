@@ -0,0 +1,34 @@
+# operator_host.py
+import logging
+import yaml
+from prompt_operator import PromptOperator
+
+logger = logging.getLogger(__name__)
+
+class OperatorHost:
+    """Runs several operator identities in one process.
+
+    Settings shared by all identities live at the top level of the config; each entry of
+    `operators` adds that identity's address and key paths. Tasks come from a single event
+    stream, the policy is evaluated once per task, and every identity signs it in parallel.
+    All identities read the chain through the first one's clients and RPC connection.
+    """
+    def __init__(self, config):
+        shared = {key: value for key, value in config.items() if key != "operators"}
+        lead, *others = config["operators"]
+        # the first identity owns the clients, event stream, policy and pipeline for all of them
+        self.lead = PromptOperator({**shared, **lead}, standalone=False)
+        self.identities = [self.lead] + [
+            PromptOperator({**shared, **identity}, standalone=False, lead=self.lead) for identity in others
+        ]
+        self.lead.load_task_processing(self.identities)
+        logger.info(f"Hosting {len(self.identities)} operators: {[identity.config['operator_address'] for identity in self.identities]}")
+
+    def start(self):
+        self.lead.start()
+
+if __name__ == "__main__":
+    with open("config-files/operator-host.yaml", "r") as f:
+        config = yaml.load(f, Loader=yaml.BaseLoader)
+
+    OperatorHost(config=config).start()
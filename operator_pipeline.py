@@ -0,0 +1,193 @@
+# operator_pipeline.py
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+import eth_abi
+from web3 import Web3
+from eigensdk.crypto.bls.attestation import KeyPair
+from metrics import OperatorMetrics
+
+logger = logging.getLogger(__name__)
+
+VERIFY_MANAGER_INSTRUCTIONS = 0  # TaskType.VerifyManagerInstructions
+
+_signers = []
+
+def _init_signers(private_keys):
+    global _signers
+    _signers = [KeyPair.from_string(private_key) for private_key in private_keys]
+
+def sign_verdict(task_id, verification_status, signer=0):
+    """Runs in a signing worker process initialized with the BLS keys of every identity; returns (signature, seconds)"""
+    started = time.perf_counter()
+    encoded = eth_abi.encode(["uint32", "bool"], [task_id, verification_status])
+    signature = _signers[signer].sign_message(msg_bytes=Web3.keccak(encoded)).to_json()
+    return signature, time.perf_counter() - started
+
+def decode_task_event(event):
+    task = event["args"]["task"]
+    return {
+        "task_id": event["args"]["taskIndex"],
+        "task_type": task["taskType"],
+        "agent_prompt": task["agentPrompt"],
+        "block_number": event["blockNumber"],
+        "received_at": time.monotonic(),
+    }
+
+class _Countdown:
+    """Calls `callback` once `done` has been called `count` times"""
+    def __init__(self, count, callback):
+        self.count = count
+        self.callback = callback
+        self.lock = threading.Lock()
+
+    def done(self):
+        with self.lock:
+            self.count -= 1
+            finished = self.count == 0
+        if finished:
+            self.callback()
+
+class OperatorPipeline:
+    """Processes tasks in stages: decode -> policy evaluation -> BLS signing -> submission to the aggregator.
+
+    Each stage has its own bounded worker pool (signing uses processes so it scales with
+    cores), and at most `max_in_flight` tasks are in the pipeline at once; `submit` blocks
+    beyond that, which pushes back on the event stream. The policy is evaluated once per task
+    by `operator`; each of `identities` (default: just `operator`) then signs and submits it.
+    `done`, if given to `submit`, is called once the task has left the pipeline.
+    """
+    def __init__(self, operator, identities=None, policy_workers=4, policy_batch_size=32, signing_workers=None,
+                 submission_workers=8, max_in_flight=64, max_retries=5, retry_backoff=0.5, task_expiry=60, metrics=None):
+        self.operator = operator
+        self.metrics = metrics or OperatorMetrics()
+        self.last_submission_ok = True
+        self.identities = identities or [operator]
+        self.policy_batch_size = policy_batch_size
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.task_expiry = task_expiry
+        self.in_flight = threading.BoundedSemaphore(max_in_flight)
+        # policy workers drain whatever tasks are waiting and evaluate them as one batch
+        self.policy_queue = queue.Queue()
+        for i in range(policy_workers):
+            threading.Thread(target=self._policy_worker, name=f"policy-{i}", daemon=True).start()
+        self.signing_pool = ProcessPoolExecutor(
+            max_workers=signing_workers or os.cpu_count(),
+            initializer=_init_signers,
+            initargs=([identity.bls_key_pair.priv_key.get_str() for identity in self.identities],),
+        )
+        self.submission_pool = ThreadPoolExecutor(max_workers=submission_workers, thread_name_prefix="submission")
+        # one pooled keep-alive session shared by all submission workers
+        self.session = requests.Session()
+        self.session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=submission_workers))
+        self.url = f'http://{operator.config["aggregator_server_ip_port_address"]}/signature'
+
+    def submit(self, event, done=None):
+        task = decode_task_event(event)
+        task["done"] = done
+        if task["task_type"] != VERIFY_MANAGER_INSTRUCTIONS:
+            logger.warning(f"Unknown Task Type ({task['task_type']}) received for Task Index {task['task_id']}. Ignoring.")
+            if done is not None:
+                done()
+            return
+        self.in_flight.acquire()
+        self.metrics.tasks_in_flight.inc()
+        self.policy_queue.put(task)
+
+    def _task_done(self, task):
+        self.metrics.tasks_in_flight.dec()
+        self.in_flight.release()
+        if task["done"] is not None:
+            task["done"]()
+
+    def _policy_worker(self):
+        while True:
+            tasks = [self.policy_queue.get()]
+            while len(tasks) < self.policy_batch_size:
+                try:
+                    tasks.append(self.policy_queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                with self.metrics.policy_seconds.time():
+                    verdicts = self.operator.evaluate_policies(tasks)
+            except Exception as e:
+                logger.error(f"Evaluating policy for {len(tasks)} tasks failed: {e}")
+                for task in tasks:
+                    self._task_done(task)
+                continue
+            for task, verification_status in zip(tasks, verdicts):
+                # the task leaves the pipeline once every identity has submitted (or given up on) its signature
+                task["remaining"] = _Countdown(len(self.identities), lambda task=task: self._task_done(task))
+                for signer, identity in enumerate(self.identities):
+                    signing = self.signing_pool.submit(sign_verdict, task["task_id"], verification_status, signer)
+                    signing.add_done_callback(
+                        lambda future, task=task, verification_status=verification_status, identity=identity:
+                            self._on_signed(task, verification_status, identity, future)
+                    )
+
+    def _on_signed(self, task, verification_status, identity, future):
+        try:
+            signature, signing_seconds = future.result()
+            self.metrics.signing_seconds.observe(signing_seconds)
+            data = identity.build_submission(task, verification_status, signature)
+        except Exception as e:
+            logger.error(f"Signing verdict for task {task['task_id']} failed: {e}")
+            task["remaining"].done()
+            return
+        self.submission_pool.submit(self._post, task, data)
+
+    def _post(self, task, data):
+        task_id = data["task_id"]
+        logger.info(f"Submitting Operator Verdict for Task {task_id} to aggregator: {data}")
+        # 503 + Retry-After means the aggregator has not initialized the task yet; that is retried until the task expires
+        expires_at = task["received_at"] + self.task_expiry
+        failures = 0
+        try:
+            while True:
+                retry_after = None
+                try:
+                    with self.metrics.submission_seconds.time():
+                        response = self.session.post(self.url, json=data, timeout=10)
+                    if response.status_code == 503 and "Retry-After" in response.headers:
+                        retry_after = float(response.headers["Retry-After"])
+                        self.metrics.submission_errors.labels(reason="not_ready").inc()
+                    elif response.status_code < 500:
+                        if response.status_code != 200:
+                            self.metrics.submission_errors.labels(reason="rejected").inc()
+                            logger.warning(f"Aggregator rejected verdict for task {task_id}: {response.status_code}")
+                        else:
+                            self.metrics.tasks_processed.labels(verdict="approved" if data["verification_status"] else "rejected").inc()
+                        self.last_submission_ok = True
+                        break
+                    else:
+                        error = f"HTTP {response.status_code}"
+                        self.metrics.submission_errors.labels(reason="server_error").inc()
+                except requests.RequestException as e:
+                    error = str(e)
+                    self.metrics.submission_errors.labels(reason="connection").inc()
+                if retry_after is not None:
+                    if time.monotonic() + retry_after > expires_at:
+                        self.metrics.submission_errors.labels(reason="expired").inc()
+                        logger.error(f"Giving up submitting verdict for task {task_id}: the aggregator did not take it before the task expired")
+                        break
+                    logger.info(f"Aggregator is not ready for task {task_id} yet, retrying in {retry_after}s")
+                    time.sleep(retry_after)
+                    continue
+                failures += 1
+                if failures == self.max_retries:
+                    self.last_submission_ok = False
+                    self.metrics.submission_errors.labels(reason="gave_up").inc()
+                    logger.error(f"Giving up submitting verdict for task {task_id} after {failures} attempts: {error}")
+                    break
+                delay = self.retry_backoff * 2 ** (failures - 1)
+                logger.warning(f"Submitting verdict for task {task_id} failed ({error}), retrying in {delay}s")
+                time.sleep(delay)
+        finally:
+            task["remaining"].done()
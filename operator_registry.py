@@ -0,0 +1,132 @@
+# operator_registry.py
+import os
+import json
+import logging
+import threading
+import time
+import eth_abi
+from web3 import Web3
+from eigensdk._types import OperatorInfo, OperatorPubkeys
+from eigensdk.crypto.bls.attestation import G1Point, G2Point, g1_to_tupple, g2_to_tupple
+
+logger = logging.getLogger(__name__)
+
+def operator_id_from_g1_pubkey(g1_pub_key):
+    """Operator ids are keccak256(abi.encodePacked(X, Y)) of the operator's G1 pubkey (BN254.hashG1Point)"""
+    x, y = g1_to_tupple(g1_pub_key)
+    return bytes(Web3.keccak(eth_abi.encode(["uint256", "uint256"], [x, y])))
+
+class CheckpointedOperatorsInfoService:
+    """Drop-in replacement for OperatorsInfoServiceInMemory that persists the operator registry.
+
+    Pubkeys and sockets are written to `snapshot_path` together with the last indexed
+    block, so a restart only replays registry events since that block (minus `reorg_depth`
+    blocks, which are replayed to pick up anything a reorg may have changed).
+    """
+    def __init__(self, avs_registry_reader, web3, snapshot_path, check_interval=10,
+                 block_range=10000, reorg_depth=12, logger=logger):
+        self.avs_registry_reader = avs_registry_reader
+        self.web3 = web3
+        self.snapshot_path = snapshot_path
+        self.check_interval = check_interval
+        self.block_range = block_range
+        self.reorg_depth = reorg_depth
+        self.logger = logger
+        self.lock = threading.Lock()
+        self.pub_keys = {}      # operator address -> OperatorPubkeys
+        self.operator_ids = {}  # operator address -> operator id
+        self.operator_addrs = {}  # operator id -> operator address
+        self.sockets = {}       # operator id -> socket
+        self.last_block = -1
+        self._load_snapshot()
+        self.sync()
+        threading.Thread(target=self._sync_loop, daemon=True).start()
+
+    def get_operator_info(self, operator_addr):
+        operator_addr = Web3.to_checksum_address(operator_addr)
+        with self.lock:
+            pub_keys = self.pub_keys.get(operator_addr)
+            if pub_keys is None:
+                return None
+            socket = self.sockets.get(self.operator_ids[operator_addr], "")
+        return OperatorInfo(socket=socket, pub_keys=pub_keys)
+
+    def get_operator_pubkeys_by_id(self, operator_id):
+        if isinstance(operator_id, str):
+            operator_id = bytes.fromhex(operator_id.removeprefix("0x"))
+        with self.lock:
+            operator_addr = self.operator_addrs.get(bytes(operator_id))
+            return self.pub_keys.get(operator_addr)
+
+    def sync(self):
+        """Indexes registry events from the last snapshot block up to the current head and saves a new snapshot"""
+        start_block = max(self.last_block + 1 - self.reorg_depth, 0)
+        stop_block = self.web3.eth.block_number
+        if stop_block < start_block:
+            return
+        operator_addrs, operator_pubkeys = self.avs_registry_reader.query_existing_registered_operator_pub_keys(
+            start_block=start_block, stop_block=stop_block, block_range=self.block_range
+        )
+        sockets = self.avs_registry_reader.query_existing_registered_operator_sockets(
+            start_block=start_block, stop_block=stop_block, block_range=self.block_range
+        )
+        with self.lock:
+            for operator_addr, pub_keys in zip(operator_addrs, operator_pubkeys):
+                operator_addr = Web3.to_checksum_address(operator_addr)
+                self.pub_keys[operator_addr] = pub_keys
+                self.operator_ids[operator_addr] = operator_id_from_g1_pubkey(pub_keys.g1_pub_key)
+                self.operator_addrs[self.operator_ids[operator_addr]] = operator_addr
+            self.sockets.update(sockets)
+            self.last_block = stop_block
+        self.logger.info(
+            f"Indexed operator registry blocks {start_block}-{stop_block}: "
+            f"{len(operator_addrs)} pubkey registrations, {len(sockets)} socket updates"
+        )
+        self._save_snapshot()
+
+    def _sync_loop(self):
+        while True:
+            time.sleep(self.check_interval)
+            try:
+                self.sync()
+            except Exception as e:
+                self.logger.error(f"Operator registry sync failed: {e}")
+
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            self.logger.info(f"No operator registry snapshot at {self.snapshot_path}, indexing from genesis")
+            return
+        with open(self.snapshot_path, "r") as f:
+            snapshot = json.load(f)
+        for operator_addr, operator in snapshot["operators"].items():
+            (xa, xb), (ya, yb) = operator["g2"]
+            self.pub_keys[operator_addr] = OperatorPubkeys(
+                g1_pub_key=G1Point(*operator["g1"]),
+                g2_pub_key=G2Point(xa, xb, ya, yb),
+            )
+            self.operator_ids[operator_addr] = bytes.fromhex(operator["operator_id"])
+            self.operator_addrs[self.operator_ids[operator_addr]] = operator_addr
+        self.sockets = {bytes.fromhex(operator_id): socket for operator_id, socket in snapshot["sockets"].items()}
+        self.last_block = snapshot["last_block"]
+        self.logger.info(f"Loaded {len(self.pub_keys)} operators from snapshot at block {self.last_block}")
+
+    def _save_snapshot(self):
+        with self.lock:
+            snapshot = {
+                "last_block": self.last_block,
+                "operators": {
+                    operator_addr: {
+                        "operator_id": self.operator_ids[operator_addr].hex(),
+                        "g1": list(g1_to_tupple(pub_keys.g1_pub_key)),
+                        "g2": [list(coordinate) for coordinate in g2_to_tupple(pub_keys.g2_pub_key)],
+                    }
+                    for operator_addr, pub_keys in self.pub_keys.items()
+                },
+                "sockets": {bytes(operator_id).hex(): socket for operator_id, socket in self.sockets.items()},
+            }
+        os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+        # write to a temporary file first so a crash never leaves a truncated snapshot behind
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_path, self.snapshot_path)
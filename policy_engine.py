@@ -0,0 +1,150 @@
+# policy_engine.py
+import re
+import json
+import hashlib
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+
+logger = logging.getLogger(__name__)
+
+# the policy the operator shipped with: at most 200 characters and mentions ethereum, defi or l2
+DEFAULT_RULES = [
+    {"name": "length", "type": "max_length", "limit": "200"},
+    {"name": "keyword", "type": "required_any", "keywords": ["ethereum", "defi", "l2"]},
+]
+
+KEYWORD_RULE_TYPES = ("required_any", "required_all", "banned")
+REGEX_RULE_TYPES = ("regex", "banned_regex")
+LENGTH_RULE_TYPES = ("max_length", "min_length")
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; finds every pattern in one pass over the text"""
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [set()]
+        for pattern_id, pattern in enumerate(patterns):
+            self._insert(pattern, pattern_id)
+        self._build_failure_links()
+
+    def _insert(self, pattern, pattern_id):
+        state = 0
+        for char in pattern:
+            next_state = self.goto[state].get(char)
+            if next_state is None:
+                next_state = len(self.goto)
+                self.goto[state][char] = next_state
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append(set())
+            state = next_state
+        self.output[state].add(pattern_id)
+
+    def _build_failure_links(self):
+        pending = deque(self.goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self.goto[state].items():
+                pending.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def search(self, text):
+        """Returns the ids of all patterns occurring in text"""
+        return self.search_many([text])[0]
+
+    def search_many(self, texts):
+        """search() for each of texts in a single pass over all of them; the state resets at each boundary"""
+        goto, fail, output = self.goto, self.fail, self.output
+        results = []
+        for text in texts:
+            matched = set()
+            state = 0
+            for char in text:
+                while state and char not in goto[state]:
+                    state = fail[state]
+                state = goto[state].get(char, 0)
+                if output[state]:
+                    matched |= output[state]
+            results.append(matched)
+        return results
+
+@dataclass
+class PolicyResult:
+    approved: bool
+    rules: dict = field(default_factory=dict)  # rule name -> satisfied
+
+class PolicyEngine:
+    """Evaluates agent prompts against the rules configured under `policy_rules` in the operator YAML.
+
+    Keywords of all keyword rules are compiled into a single case-insensitive Aho-Corasick
+    automaton, so each prompt is scanned once no matter how many keyword rules there are.
+    A prompt is approved only if every rule is satisfied.
+    """
+    def __init__(self, rules=None):
+        self.rules = rules or DEFAULT_RULES
+        self.version = hashlib.sha256(json.dumps(self.rules, sort_keys=True).encode()).hexdigest()
+        self._compile()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(config.get("policy_rules"))
+
+    def _compile(self):
+        patterns = {}
+        self.length_rules = []
+        self.keyword_rules = []
+        self.regex_rules = []
+        self.rule_names = [rule["name"] for rule in self.rules]
+        duplicates = sorted({name for name in self.rule_names if self.rule_names.count(name) > 1})
+        if duplicates:
+            # verdicts report rules by name, so a second rule would silently replace the first
+            raise ValueError(f"Duplicate policy rule names: {duplicates}")
+        for rule in self.rules:
+            name, rule_type = rule["name"], rule["type"]
+            if rule_type in LENGTH_RULE_TYPES:
+                self.length_rules.append((name, rule_type, int(rule["limit"])))
+            elif rule_type in KEYWORD_RULE_TYPES:
+                ids = frozenset(patterns.setdefault(keyword.lower(), len(patterns)) for keyword in rule["keywords"])
+                self.keyword_rules.append((name, rule_type, ids))
+            elif rule_type in REGEX_RULE_TYPES:
+                flags = 0 if rule.get("case_sensitive", "false") == "true" else re.IGNORECASE
+                self.regex_rules.append((name, rule_type, re.compile(rule["pattern"], flags)))
+            else:
+                raise ValueError(f"Unknown policy rule type {rule_type!r} for rule {name!r}")
+        self.automaton = AhoCorasick(patterns)
+        logger.info(f"Compiled {len(self.rules)} policy rules ({len(patterns)} keywords), version {self.version[:12]}")
+
+    def evaluate(self, prompt):
+        return self.evaluate_batch([prompt])[0]
+
+    def evaluate_batch(self, prompts):
+        """Evaluates prompts together: each distinct prompt once, with one automaton pass over all of them"""
+        distinct = list(dict.fromkeys(prompts))
+        if self.keyword_rules:
+            found = self.automaton.search_many([prompt.lower() for prompt in distinct])
+        else:
+            found = [set()] * len(distinct)
+        results = {prompt: self._result(prompt, matched) for prompt, matched in zip(distinct, found)}
+        return [results[prompt] for prompt in prompts]
+
+    def _result(self, prompt, found):
+        rules = {}
+        for name, rule_type, limit in self.length_rules:
+            rules[name] = len(prompt) <= limit if rule_type == "max_length" else len(prompt) >= limit
+        for name, rule_type, ids in self.keyword_rules:
+            if rule_type == "required_any":
+                rules[name] = not ids.isdisjoint(found)
+            elif rule_type == "required_all":
+                rules[name] = ids <= found
+            else:
+                rules[name] = ids.isdisjoint(found)
+        for name, rule_type, pattern in self.regex_rules:
+            matched = pattern.search(prompt) is not None
+            rules[name] = matched if rule_type == "regex" else not matched
+        rules = {name: rules[name] for name in self.rule_names}  # report in configured order
+        return PolicyResult(approved=all(rules.values()), rules=rules)
@@ -1,34 +1,55 @@
 import os
 import time
 import json
+import hashlib
 import logging
 from random import randbytes
-import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 from web3 import Web3
-import eth_abi
 from eth_account import Account
 from eigensdk.chainio.clients.builder import BuildAllConfig, build_all
 from eigensdk.crypto.bls.attestation import KeyPair
 from eigensdk._types import Operator
-from routellm import inference # This import is not used and can be removed
+from task_event_stream import TaskEventStream
+from operator_pipeline import OperatorPipeline
+from policy_engine import PolicyEngine
+from verdict_cache import VerdictCache, prompt_hash
+from llm_policy import LLMPolicy
+from metrics import OperatorMetrics
+from node_api import NodeApi
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class PromptOperator: # Class name is now PromptOperator
-    def __init__(self, config):
+    def __init__(self, config, standalone=True, lead=None):
+        """lead: for further identities run by an OperatorHost, the operator whose clients and connection they share"""
         self.config = config
+        self.metrics = lead.metrics if lead is not None else OperatorMetrics()
+        self.event_stream = None
+        self.block_timestamps = OrderedDict()  # block number -> timestamp, for the event lag metric
+        # the lag metric needs RPCs, so it is recorded off the event stream's dispatch path
+        self.lag_recorder = ThreadPoolExecutor(max_workers=1, thread_name_prefix="event-lag")
         self.__load_bls_key()
         self.__load_ecdsa_key()
-        self.__load_clients()
-        self.__load_task_manager()
+        if lead is None:
+            self.clients = self.__build_clients()
+            self.__load_task_manager()
+        else:
+            # reads go through the lead's clients and RPC connection; only registration needs this identity's key
+            self.clients, self.web3, self.task_manager = lead.clients, lead.web3, lead.task_manager
         if config["register_operator_on_startup"] == 'true':
-            self.register()
+            self.register(self.__build_clients() if lead is not None else self.clients)
         # operator id can only be loaded after registration
         self.__load_operator_id()
+        # identities run by an OperatorHost share the host's policy and pipeline instead
+        if standalone:
+            self.load_task_processing([self])
 
-    def register(self):
+    def register(self, clients=None):
+        clients = clients or self.clients
         operator = Operator(
             address=self.config["operator_address"],
             earnings_receiver_address=self.config["operator_address"],
@@ -36,8 +57,8 @@ class PromptOperator: # Class name is now PromptOperator
             staker_opt_out_window_blocks=0,
             metadata_url="",
         )
-        self.clients.el_writer.register_as_operator(operator)
-        self.clients.avs_registry_writer.register_operator_in_quorum_with_avs_registry_coordinator(
+        clients.el_writer.register_as_operator(operator)
+        clients.avs_registry_writer.register_operator_in_quorum_with_avs_registry_coordinator(
             operator_ecdsa_private_key=self.operator_ecdsa_private_key,
             operator_to_avs_registration_sig_salt=randbytes(32),
             operator_to_avs_registration_sig_expiry=int(time.time()) + 3600,
@@ -48,63 +69,145 @@ class PromptOperator: # Class name is now PromptOperator
 
     def start(self):
         logger.info("Starting Operator...")
-        event_filter = self.task_manager.events.NewTaskCreated.create_filter(
-            fromBlock="latest"
+        # live NewTaskCreated events over websocket; blocks missed while down are backfilled from the checkpoint
+        self.event_stream = TaskEventStream(
+            web3=self.web3,
+            task_manager=self.task_manager,
+            ws_url=self.config["eth_ws_url"],
+            checkpoint_path=self.config.get("task_checkpoint_path", "data/operator.checkpoint.json"),
         )
-        while True:
-            logger.info("Polling for new task events...") # ADDED LOGGING
-            new_events = event_filter.get_new_entries()
-            logger.info(f"Number of new events received: {len(new_events)}") # ADDED LOGGING
-            for event in new_events:
-                logger.info(f"New task created: {event}")
-                self.process_task_event(event)
-            time.sleep(3)
-
-    def process_task_event(self, event):
-        logger.info("Entering process_task_event function") # ADDED LOGGING - CHECK IF THIS APPEARS
-        task_id = event["args"]["taskIndex"]
-        task_type = event["args"]["task"]["taskType"] # Get task_type from event
-        agent_prompt = event["args"]["task"]["agentPrompt"] # Get agent prompt from event
-
-        if task_type == 0:  # Assuming VerifyManagerInstructions is enum index 0
-            logger.info(f"New Manager Instructions Verification Task created: Task Index {task_id}")
-            logger.info(f"Agent Prompt to Review:\\n{agent_prompt}")
-
-            # --- Automated Policy Checks ---
-            is_valid_length = len(agent_prompt) <= 200 # Example: Max length 200 characters
-            required_keywords = ["ethereum", "defi", "l2"]
-            has_required_keywords = any(keyword in agent_prompt.lower() for keyword in required_keywords)
-
-            policy_length_satisfied = is_valid_length
-            policy_keyword_satisfied = has_required_keywords
-
-            verification_status = policy_length_satisfied and policy_keyword_satisfied # Approve only if ALL policies pass
-
-            logger.info(f"Policy Check Results:")
-            logger.info(f"  Length Policy Satisfied: {policy_length_satisfied}")
-            logger.info(f"  Keyword Policy Satisfied: {policy_keyword_satisfied}")
-            logger.info(f"  Overall Verification Status: {'Approved' if verification_status else 'Rejected'}")
-
-            encoded = eth_abi.encode(["uint32", "bool"], [task_id, verification_status]) # Encode task_id and verification_status
-            hash_bytes = Web3.keccak(encoded)
-            signature = self.bls_key_pair.sign_message(msg_bytes=hash_bytes).to_json()
-            logger.info(f"Operator Verdict: {'Approved' if verification_status else 'Rejected'}, Task ID: {task_id}, Signature: {signature}")
-
-            data = { # Data to send to aggregator
-                "task_id": task_id,
-                "verification_status": verification_status, # Send boolean verification status
-                "signature": signature,
-                "block_number": event['blockNumber'],
-                "operator_id": "0x" + self.operator_id.hex(),
-            }
-            logger.info(f"Submitting Operator Verdict for Task {task_id} to aggregator: {data}")
-            # prevent submitting task before initialize_new_task gets completed on aggregator
-            time.sleep(3)
-            url = f'http://{self.config["aggregator_server_ip_port_address"]}/signature'
-            requests.post(url, json=data)
-        else: # Handle other task types if you add more later - for now, just log unknown task type
-            logger.warning(f"Unknown Task Type ({task_type}) received for Task Index {task_id}. Ignoring.")
+        self.metrics.last_processed_block.set_function(lambda: self.event_stream.last_block or 0)
+        if self.config.get("enable_metrics") == "true":
+            self.metrics.start(self.config["eigen_metrics_ip_port_address"])
+        if self.config.get("enable_node_api") == "true":
+            NodeApi(self).start(self.config["node_api_ip_port_address"])
+        self.event_stream.run(self.handle_task_event)
 
+    def handle_task_event(self, event, done=None):
+        logger.info(f"New task created: {event}")
+        received_at = time.time()
+        self.pipeline.submit(event, done)
+        self.lag_recorder.submit(self.record_event_lag, event["blockNumber"], received_at)
+
+    def record_event_lag(self, block_number, received_at):
+        try:
+            self.metrics.event_lag_blocks.observe(max(0, self.event_stream.chain_head() - block_number))
+            self.metrics.event_lag_seconds.observe(max(0, received_at - self.block_timestamp(block_number)))
+        except Exception as e:
+            logger.warning(f"Recording the event lag of block {block_number} failed: {e}")
+
+    def block_timestamp(self, block_number, max_blocks=256):
+        # tasks of the same block share one get_block call
+        timestamp = self.block_timestamps.get(block_number)
+        if timestamp is None:
+            timestamp = self.web3.eth.get_block(block_number)["timestamp"]
+            self.block_timestamps[block_number] = timestamp
+            while len(self.block_timestamps) > max_blocks:
+                self.block_timestamps.popitem(last=False)
+        return timestamp
+
+    def evaluate_policies(self, tasks):
+        prompts = [task["agent_prompt"] for task in tasks]
+        # identical prompts are signed from the cached verdict; only new ones hit the policy engine
+        cached = self.verdict_cache.get_many(prompts)
+        misses = list({prompt for prompt in prompts if prompt_hash(prompt) not in cached})
+        if misses:
+            results = self.policy_engine.evaluate_batch(misses)
+            verdicts = {prompt: (result.approved, result.rules) for prompt, result in zip(misses, results)}
+            fallbacks = self.__check_with_llm(tasks, verdicts) if self.llm_policy is not None else set()
+            # rule-only fallbacks are not cached so the prompt gets a full check next time
+            self.verdict_cache.put_many([
+                (prompt, approved, rules) for prompt, (approved, rules) in verdicts.items() if prompt not in fallbacks
+            ])
+            cached.update({prompt_hash(prompt): verdict for prompt, verdict in verdicts.items()})
+        verdicts = []
+        for task in tasks:
+            approved, rules = cached[prompt_hash(task["agent_prompt"])]
+            logger.info(f"New Manager Instructions Verification Task created: Task Index {task['task_id']}")
+            logger.info(f"Agent Prompt to Review:\n{task['agent_prompt']}")
+            logger.info("Policy Check Results:")
+            for rule, satisfied in rules.items():
+                logger.info(f"  {rule} Policy Satisfied: {satisfied}")
+            logger.info(f"  Overall Verification Status: {'Approved' if approved else 'Rejected'}")
+            verdicts.append(approved)
+        return verdicts
+
+    def __check_with_llm(self, tasks, verdicts):
+        """Runs the LLM policy on prompts the rules approved, updating verdicts in place.
+
+        Each check is bounded by its task's deadline; past it the rule-based verdict stands.
+        Returns the prompts that fell back to the rule-based verdict.
+        """
+        deadlines = {}
+        for task in tasks:
+            deadline = task["received_at"] + self.llm_policy_deadline
+            deadlines[task["agent_prompt"]] = min(deadline, deadlines.get(task["agent_prompt"], deadline))
+        checks = {
+            prompt: self.llm_policy.classify(prompt, deadlines[prompt])
+            for prompt, (approved, _) in verdicts.items() if approved
+        }
+        fallbacks = set()
+        for prompt, check in checks.items():
+            try:
+                llm_rules = check.result(timeout=max(0, deadlines[prompt] - time.monotonic()))
+            except Exception as e:
+                logger.warning(f"LLM policy check unavailable ({e!r}), using the rule-based verdict")
+                fallbacks.add(prompt)
+                continue
+            rules = {**verdicts[prompt][1], **llm_rules}
+            verdicts[prompt] = (all(rules.values()), rules)
+        return fallbacks
+
+    def build_submission(self, task, verification_status, signature):
+        logger.info(f"Operator Verdict: {'Approved' if verification_status else 'Rejected'}, Task ID: {task['task_id']}, Signature: {signature}")
+        return { # Data to send to aggregator
+            "task_id": task["task_id"],
+            "verification_status": verification_status, # Send boolean verification status
+            "signature": signature,
+            "block_number": task["block_number"],
+            "operator_id": "0x" + self.operator_id.hex(),
+        }
+
+    def load_task_processing(self, identities):
+        """Sets up policy evaluation and the task pipeline; every one of identities signs each task"""
+        self.__load_policy_engine()
+        self.__load_pipeline(identities)
+
+    def __load_policy_engine(self):
+        self.policy_engine = PolicyEngine.from_config(self.config)
+        self.llm_policy = None
+        policy_version = self.policy_engine.version
+        if self.config.get("enable_llm_policy", "false") == "true":
+            from routellm import inference
+            self.llm_policy = LLMPolicy(
+                inference,
+                max_batch_size=int(self.config.get("llm_policy_batch_size", 8)),
+                max_in_flight=int(self.config.get("llm_policy_max_in_flight", 4)),
+            )
+            # leave enough of the task's time to expiry for signing and aggregation
+            self.llm_policy_deadline = (
+                int(self.config.get("task_time_to_expiry_seconds", 60))
+                - int(self.config.get("llm_policy_margin_seconds", 15))
+            )
+            policy_version = hashlib.sha256(f"{policy_version}:llm".encode()).hexdigest()
+        self.verdict_cache = VerdictCache(
+            self.config.get("verdict_cache_path", "data/operator.verdicts.sqlite"),
+            policy_version,
+        )
+
+    def __load_pipeline(self, identities):
+        self.pipeline = OperatorPipeline(
+            self,
+            identities=identities,
+            policy_workers=int(self.config.get("policy_workers", 4)),
+            policy_batch_size=int(self.config.get("policy_batch_size", 32)),
+            signing_workers=int(self.config.get("signing_workers", os.cpu_count())),
+            submission_workers=int(self.config.get("submission_workers", 8)),
+            max_in_flight=int(self.config.get("max_tasks_in_flight", 64)),
+            max_retries=int(self.config.get("aggregator_max_retries", 5)),
+            task_expiry=int(self.config.get("task_time_to_expiry_seconds", 60)),
+            metrics=self.metrics,
+        )
 
     def __load_bls_key(self):
         bls_key_password = os.environ.get("OPERATOR_BLS_KEY_PASSWORD", "")
@@ -124,7 +227,7 @@ class PromptOperator: # Class name is now PromptOperator
             keystore = json.load(f)
         self.operator_ecdsa_private_key = Account.decrypt(keystore, ecdsa_key_password).hex()
 
-    def __load_clients(self):
+    def __build_clients(self):
         cfg = BuildAllConfig(
             eth_http_url=self.config["eth_rpc_url"],
             avs_name="incredible-squaring",
@@ -132,15 +235,15 @@ class PromptOperator: # Class name is now PromptOperator
             operator_state_retriever_addr=self.config["operator_state_retriever_address"],
             prom_metrics_ip_port_address=self.config["eigen_metrics_ip_port_address"],
         )
-        self.clients = build_all(cfg, self.operator_ecdsa_private_key, logger)
+        return build_all(cfg, self.operator_ecdsa_private_key, logger)
 
     def __load_task_manager(self):
-        web3 = Web3(Web3.HTTPProvider(self.config["eth_rpc_url"]))
+        self.web3 = Web3(Web3.HTTPProvider(self.config["eth_rpc_url"]))
 
         service_manager_address = self.clients.avs_registry_writer.service_manager_addr
         with open("abis/NewsletterPromptServiceManager.json") as f:
             service_manager_abi = f.read()
-        service_manager = web3.eth.contract(
+        service_manager = self.web3.eth.contract(
             address=service_manager_address, abi=service_manager_abi
         )
 
@@ -149,7 +252,7 @@ class PromptOperator: # Class name is now PromptOperator
         )
         with open("abis/NewsletterPromptTaskManager.json") as f:
             task_manager_abi = f.read()
-        self.task_manager = web3.eth.contract(address=task_manager_address, abi=task_manager_abi)
+        self.task_manager = self.web3.eth.contract(address=task_manager_address, abi=task_manager_abi)
 
     def __load_operator_id(self):
         self.operator_id = self.clients.avs_registry_reader.get_operator_id(
@@ -0,0 +1,54 @@
+# response_submitter.py
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+class ResponseSubmitter:
+    """Posts aggregated responses on chain from a bounded queue with several concurrent workers.
+
+    Workers share the aggregator's tx manager, so a response waiting on a slow block never
+    holds up the others. A full queue blocks `submit`, and with it the aggregator's response
+    loop, until a worker takes the next response; the depth is exported as a gauge.
+    """
+    def __init__(self, aggregator, workers=4, max_queue_size=64, max_retries=3, retry_backoff=2):
+        self.aggregator = aggregator
+        self.workers = workers
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.queue = queue.Queue(maxsize=max_queue_size)
+
+    def start(self):
+        for i in range(self.workers):
+            threading.Thread(target=self._worker, name=f"response-submitter-{i}", daemon=True).start()
+
+    def submit(self, aggregated_response):
+        self._put(aggregated_response, attempt=1)
+
+    def _put(self, aggregated_response, attempt):
+        if self.queue.full():
+            logger.warning(f"Response queue is full ({self.queue.maxsize}); waiting for a submitter")
+        self.queue.put((aggregated_response, attempt))
+
+    def _worker(self):
+        while True:
+            aggregated_response, attempt = self.queue.get()
+            try:
+                receipt = self.aggregator.send_aggregated_response(aggregated_response).result(timeout=self.aggregator.tx_manager.result_timeout)
+                if receipt['status'] != 1:
+                    raise RuntimeError(f"respondToTask reverted in tx {receipt['transactionHash'].hex()}")
+            except Exception as e:
+                self._retry(aggregated_response, attempt, e)
+            finally:
+                self.queue.task_done()
+
+    def _retry(self, aggregated_response, attempt, error):
+        task_index = aggregated_response.task_response['task_index']
+        if attempt >= self.max_retries:
+            logger.error(f"Giving up on response to task {task_index} after {attempt} attempts: {error}")
+            return
+        delay = self.retry_backoff * 2 ** (attempt - 1)
+        logger.warning(f"Response to task {task_index} failed (attempt {attempt}), retrying in {delay}s: {error}")
+        # requeue from a timer so the worker is free to move on to other tasks meanwhile
+        threading.Timer(delay, self._put, args=(aggregated_response, attempt + 1)).start()
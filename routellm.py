@@ -1,20 +1,21 @@
-import openai
 import os
+import logging
+from functools import lru_cache
 
-client = openai.OpenAI(
-  base_url="https://api.openai.com/v1",
-  # Required but ignored
-  api_key=os.environ.get("OPENAI_API_KEY")
-)
-response = client.chat.completions.create(
-  # "Use the MF router with a threshold of 0.116"
-  model="gpt-3.5-turbo",
-  messages=[
-    {"role": "user", "content": "Hello!"}
-  ]
-)
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=None)
+def get_client():
+    # created on first use so importing this module neither loads openai nor calls the API
+    import openai
+    return openai.OpenAI(
+      base_url="https://api.openai.com/v1",
+      # Required but ignored
+      api_key=os.environ.get("OPENAI_API_KEY")
+    )
 
 def inference(prompt):
-    response = client.chat.completions.create(model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}])
-    print(response.choices[0].message.content)
-    return response.choices[0].message.content
+    response = get_client().chat.completions.create(model="gpt-3.5-turbo", messages=[{"role": "user", "content": prompt}])
+    content = response.choices[0].message.content
+    logger.debug(f"LLM response: {content}")
+    return content
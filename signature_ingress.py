@@ -0,0 +1,133 @@
+# signature_ingress.py
+import asyncio
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import eth_abi
+from web3 import Web3
+from eigensdk.crypto.bls.attestation import Signature, G2Point, g2_to_tupple
+
+logger = logging.getLogger(__name__)
+
+ACCEPTED = "accepted"
+DUPLICATE = "duplicate"
+LATE = "late"
+MALFORMED = "malformed"
+UNKNOWN_OPERATOR = "unknown_operator"
+INVALID_SIGNATURE = "invalid_signature"
+UNKNOWN_TASK = "unknown_task"
+NOT_READY = "not_ready"  # the task exists but is not initialized here (yet); the operator should retry
+FAILED = "failed"
+
+@lru_cache(maxsize=4096)
+def task_response_digest(task_index, verification_status):
+    """keccak256(abi.encode(taskResponse)); every operator signs the same few digests per task, so they are memoized"""
+    encoded = eth_abi.encode(["uint32", "bool"], [task_index, verification_status])
+    return Web3.keccak(encoded)
+
+def normalize_operator_id(operator_id):
+    """Operator ids as bytes, so differently cased or prefixed hex of the same id compare equal"""
+    return bytes(Web3.to_bytes(hexstr=operator_id))
+
+def verify_signature(signature_xy, g2_pub_key, digest):
+    """Runs in a worker process, so it only takes plain ints and bytes"""
+    (xa, xb), (ya, yb) = g2_pub_key
+    return Signature(*signature_xy).verify(G2Point(xa, xb, ya, yb), digest)
+
+class SignatureIngress:
+    """Screens operator signatures before they reach the BLS aggregation service.
+
+    Malformed, duplicate (per task and operator), late and far-future submissions are dropped
+    in O(1); the rest are BLS-verified against the cached operator G2 pubkeys in a process pool.
+    """
+    def __init__(self, aggregator, workers=None, max_tasks_ahead=16):
+        self.aggregator = aggregator
+        self.max_tasks_ahead = max_tasks_ahead
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.seen = {}  # task index -> operator ids (bytes) accepted or being verified
+        # tasks below closed_below are all aggregated or expired; closed_tasks only holds closed ones above it
+        self.closed_below = 0
+        self.closed_tasks = set()
+
+    async def screen(self, submissions):
+        """Returns one status per submission; only ACCEPTED ones should be passed on"""
+        loop = asyncio.get_running_loop()
+        latest_task_index = await self._latest_task_index()
+        statuses = []
+        verifications = []
+        for data in submissions:
+            status, job = self._precheck(data, latest_task_index)
+            statuses.append(status)
+            if job is not None:
+                verifications.append((len(statuses) - 1, data, loop.run_in_executor(self.pool, verify_signature, *job)))
+        for index, data, verification in verifications:
+            try:
+                valid = await verification
+            except Exception as e:
+                logger.error(f"Verifying signature failed: {e}")
+                valid = False
+            if valid:
+                statuses[index] = ACCEPTED
+            else:
+                statuses[index] = INVALID_SIGNATURE
+                # a bad signature must not stop the operator from submitting a good one
+                self.forget(data)
+        return statuses
+
+    def forget(self, data):
+        """Allows the operator to resubmit for this task, e.g. after the aggregation service refused the signature"""
+        task_index = int(data['task_id'])
+        with self.lock:
+            operator_ids = self.seen.get(task_index)
+            if operator_ids is not None:
+                operator_ids.discard(normalize_operator_id(data['operator_id']))
+                if not operator_ids:
+                    del self.seen[task_index]
+
+    def close_task(self, task_index):
+        """Called once a task has been aggregated; later signatures for it are dropped as late"""
+        oldest_open_task = self.aggregator.oldest_open_task()
+        with self.lock:
+            self.closed_tasks.add(task_index)
+            self.seen.pop(task_index, None)
+            if oldest_open_task > self.closed_below:
+                self.closed_below = oldest_open_task
+                self.closed_tasks = {index for index in self.closed_tasks if index >= oldest_open_task}
+                for index in [index for index in self.seen if index < oldest_open_task]:
+                    del self.seen[index]
+
+    async def _latest_task_index(self):
+        """Latest task index initialized here or created on chain, whichever is further along"""
+        latest_task_index = self.aggregator.latest_task_index()
+        try:
+            # cached by the aggregator, so this is at most one latestTaskNum call a second
+            latest_chain_task_index = await asyncio.to_thread(self.aggregator.latest_chain_task_index)
+        except Exception as e:
+            logger.warning(f"Reading the latest task index from chain failed: {e}")
+            return latest_task_index
+        return max(latest_task_index, latest_chain_task_index)
+
+    def _precheck(self, data, latest_task_index):
+        try:
+            task_index = int(data['task_id'])
+            operator_id = normalize_operator_id(data['operator_id'])
+            signature_xy = (int(data['signature']['X']), int(data['signature']['Y']))
+            verification_status = bool(data['verification_status'])
+        except (KeyError, TypeError, ValueError):
+            return MALFORMED, None
+        with self.lock:
+            if task_index < self.closed_below or task_index in self.closed_tasks:
+                return LATE, None
+            if operator_id in self.seen.get(task_index, ()):
+                return DUPLICATE, None
+            pub_keys = self.aggregator.operator_info_service.get_operator_pubkeys_by_id(operator_id)
+            if pub_keys is None:
+                return UNKNOWN_OPERATOR, None
+            # only tasks that exist, or may shortly, get an entry; anything else would grow `seen` without bound
+            if task_index > latest_task_index + self.max_tasks_ahead:
+                return UNKNOWN_TASK, None
+            self.seen.setdefault(task_index, set()).add(operator_id)
+        digest = bytes(task_response_digest(task_index, verification_status))
+        return None, (signature_xy, g2_to_tupple(pub_keys.g2_pub_key), digest)
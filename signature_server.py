@@ -0,0 +1,191 @@
+# signature_server.py
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from aiohttp import web
+from signature_ingress import ACCEPTED, FAILED, NOT_READY, UNKNOWN_TASK
+
+logger = logging.getLogger(__name__)
+
+class EarlySignatureBuffer:
+    """Holds signatures that arrive before the aggregator has initialized their task.
+
+    Operators see NewTaskCreated at about the same time the aggregator gets the receipt, so a
+    signature for a task index up to `max_tasks_ahead` past the latest known one (initialized
+    here or created on chain) is plausible and kept for `window` seconds; anything else is
+    rejected straight away.
+    """
+    def __init__(self, window=10, max_tasks_ahead=16):
+        self.window = window
+        self.max_tasks_ahead = max_tasks_ahead
+        self.pending = defaultdict(list)  # task index -> [(arrived at, submission, future)]
+
+    def is_plausible(self, task_index, latest_task_index):
+        return 0 <= task_index <= latest_task_index + self.max_tasks_ahead
+
+    def add(self, task_index, submission, future):
+        self.pending[task_index].append((time.monotonic(), submission, future))
+
+    def pop(self, task_index):
+        return [(submission, future) for _, submission, future in self.pending.pop(task_index, [])]
+
+    def pop_expired(self):
+        deadline = time.monotonic() - self.window
+        expired = []
+        for task_index in list(self.pending):
+            entries = self.pending[task_index]
+            expired += [(submission, future) for arrived_at, submission, future in entries if arrived_at < deadline]
+            entries[:] = [entry for entry in entries if entry[0] >= deadline]
+            if not entries:
+                del self.pending[task_index]
+        return expired
+
+class SignatureIngestionServer:
+    """Asyncio HTTP front end that queues operator signatures and feeds them to the aggregator in batches"""
+    def __init__(self, aggregator, ingress, max_batch_size=64, max_queue_size=10000, early_signature_window=10, retry_after=2):
+        self.aggregator = aggregator
+        self.retry_after = retry_after
+        self.ingress = ingress
+        self.early_signatures = EarlySignatureBuffer(window=early_signature_window)
+        self.loop = None
+        self.max_batch_size = max_batch_size
+        self.max_queue_size = max_queue_size
+        self.queue = None
+        # a single worker thread keeps process_new_signature calls serialized
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="signature-batch")
+        self.app = web.Application()
+        self.app.add_routes([
+            web.post('/signature', self.handle_signature),
+            web.post('/signatures', self.handle_signatures),
+        ])
+        self.app.on_startup.append(self._start_batch_worker)
+        self.app.on_cleanup.append(self._stop_batch_worker)
+
+    async def handle_signature(self, request):
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.Response(text='false', status=400)
+        [status] = await self.enqueue([data])
+        if status == ACCEPTED:
+            return web.Response(text='true', status=200)
+        if status == FAILED:
+            return web.Response(text='false', status=500)
+        if status == NOT_READY:
+            # the task is on chain but not initialized here yet, e.g. right after an aggregator restart
+            return web.Response(text='false', status=503, headers={'Retry-After': str(self.retry_after)})
+        return web.Response(text='false', status=400)
+
+    async def handle_signatures(self, request):
+        """Bulk endpoint: accepts a JSON list of /signature payloads and returns one status per entry"""
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({'error': 'invalid json'}, status=400)
+        if not isinstance(data, list):
+            return web.json_response({'error': 'expected a list of signatures'}, status=400)
+        results = await self.enqueue(data)
+        return web.json_response({'results': results})
+
+    async def enqueue(self, submissions):
+        loop = asyncio.get_running_loop()
+        futures = []
+        for submission in submissions:
+            future = loop.create_future()
+            await self.queue.put((submission, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    def task_initialized(self, task_index):
+        """Thread-safe hook called by the aggregator once a task is initialized; replays its buffered signatures"""
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self._replay_early_signatures, task_index)
+
+    def _replay_early_signatures(self, task_index):
+        buffered = self.early_signatures.pop(task_index)
+        if buffered:
+            logger.info(f"Replaying {len(buffered)} early signatures for task {task_index}")
+            asyncio.create_task(self._aggregate(buffered))
+
+    async def _batch_worker(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < self.max_batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            statuses = await self.ingress.screen([submission for submission, _ in batch])
+            ready = []
+            for (submission, future), status in zip(batch, statuses):
+                task_index = int(submission['task_id']) if status == ACCEPTED else None
+                if status != ACCEPTED:
+                    self._resolve(future, status)
+                elif self.aggregator.is_task_initialized(task_index):
+                    ready.append((submission, future))
+                elif await self._is_plausible(task_index):
+                    self.early_signatures.add(task_index, submission, future)
+                else:
+                    self.ingress.forget(submission)
+                    self._resolve(future, UNKNOWN_TASK)
+            await self._aggregate(ready)
+
+    async def _is_plausible(self, task_index):
+        if self.early_signatures.is_plausible(task_index, self.aggregator.latest_task_index()):
+            return True
+        # tasks created by another process, or before a restart, are only known on chain
+        latest_chain_task_index = await asyncio.to_thread(self.aggregator.latest_chain_task_index)
+        return self.early_signatures.is_plausible(task_index, latest_chain_task_index)
+
+    async def _aggregate(self, items):
+        if not items:
+            return
+        loop = asyncio.get_running_loop()
+        submissions = [submission for submission, _ in items]
+        results = await loop.run_in_executor(self.executor, self._process_batch, submissions)
+        for (submission, future), status in zip(items, results):
+            if status == FAILED:
+                self.ingress.forget(submission)
+            self._resolve(future, status)
+
+    async def _expire_early_signatures(self):
+        while True:
+            await asyncio.sleep(1)
+            for submission, future in self.early_signatures.pop_expired():
+                logger.warning(f"Signature for task {submission['task_id']} waited {self.early_signatures.window}s for the task; asking the operator to retry")
+                self.ingress.forget(submission)
+                self._resolve(future, NOT_READY)
+
+    def _resolve(self, future, status):
+        if not future.done():
+            self.aggregator.metrics.signatures.labels(status=status).inc()
+            future.set_result(status)
+
+    def _process_batch(self, submissions):
+        results = []
+        for data in submissions:
+            try:
+                self.aggregator.submit_signature(data)
+                results.append(ACCEPTED)
+            except Exception as e:
+                logger.error(f"Submitting signature failed: {e}")
+                results.append(FAILED)
+        logger.debug(f"Processed signature batch of {len(submissions)}")
+        return results
+
+    async def _start_batch_worker(self, app):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self.worker = asyncio.create_task(self._batch_worker())
+        self.expirer = asyncio.create_task(self._expire_early_signatures())
+
+    async def _stop_batch_worker(self, app):
+        self.worker.cancel()
+        self.expirer.cancel()
+        self.executor.shutdown(wait=False)
+        self.ingress.pool.shutdown(wait=False)
+
+    def run(self, host, port):
+        # signal handlers can only be installed from the main thread (e.g. not when embedded in a benchmark)
+        handle_signals = threading.current_thread() is threading.main_thread()
+        web.run_app(self.app, host=host, port=int(port), print=None, handle_signals=handle_signals)
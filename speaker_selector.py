@@ -0,0 +1,135 @@
+# speaker_selector.py
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+CODE_BLOCK = re.compile(r"```(?:python|py|sh|bash|shell)?\s*\n", re.IGNORECASE)
+INTENT_PATTERNS = {
+    "scrape": re.compile(r"\b(scrap\w*|web[-_ ]scraper|search\w*|look up|fetch\w*|more (?:info\w*|data|sources))\b", re.IGNORECASE),
+    "approve": re.compile(r"\b(approved?|looks good|lgtm|ready to (?:post|publish)|no further (?:changes|improvements))\b", re.IGNORECASE),
+    "post": re.compile(r"\b(telegram|post\w*|publish\w*|tweet\w*)\b", re.IGNORECASE),
+}
+# "not approved", "cannot approve this yet", "don't approve", "isn't yet approved"; a "not ready" elsewhere doesn't count
+NEGATED_APPROVAL = re.compile(r"(?:\bnot|\bcannot|n't)\s+(?:\w+\s+)?approv", re.IGNORECASE)
+
+def classify(message):
+    """Cheap local intent classification of one group chat message; returns a set of intents"""
+    if message.get("tool_calls") or message.get("function_call"):
+        return {"tool_call"}
+    if message.get("tool_responses") or message.get("role") in ("tool", "function"):
+        return {"tool_result"}
+    content = message.get("content")
+    if not isinstance(content, str):
+        return set()
+    intents = {intent for intent, pattern in INTENT_PATTERNS.items() if pattern.search(content)}
+    if CODE_BLOCK.search(content):
+        intents.add("code")
+    if "approve" in intents and NEGATED_APPROVAL.search(content):
+        intents.discard("approve")
+    return intents
+
+class WorkflowSpeakerSelector:
+    """Picks the next group chat speaker from the manager_instructions workflow instead of round-robin.
+
+    plan (manager) -> critic -> web-scraper when more information is asked for -> critic ->
+    telegram-poster once the critic approves the results -> manager, which terminates. Tool
+    calls go to the agent that can execute them and their results back to the caller; code
+    blocks go to the coder. Each agent only speaks when the workflow has work for it, so no LLM
+    call is spent on selecting a speaker or on a turn with nothing to do. Pass an instance as
+    `speaker_selection_method`.
+
+    Posting depends on workflow state, not on wording alone: there must be results, the critic
+    must have approved them after the latest one, and nothing may have been posted yet. Once the
+    poster has posted the selector returns None, which ends the group chat. It also ends the
+    chat when the manager and critic have taken `max_idle_rounds` turns in a row without any
+    scraper or coder result, instead of letting them talk until max_round.
+    """
+    def __init__(self, manager="manager", critic="critic", scraper="web-scraper", coder="coder", poster="telegram-poster",
+                 max_idle_rounds=6):
+        self.manager = manager
+        self.critic = critic
+        self.scraper = scraper
+        self.coder = coder
+        self.poster = poster
+        self.max_idle_rounds = max_idle_rounds
+
+    def __call__(self, last_speaker, groupchat):
+        agents = {agent.name: agent for agent in groupchat.agents}
+        messages = groupchat.messages
+        intents = classify(messages[-1]) if messages else set()
+        if "tool_call" in intents:
+            next_speaker = self._executor(messages[-1], groupchat.agents) or last_speaker.name
+        elif "tool_result" in intents:
+            # the caller turns the tool output into its reply
+            next_speaker = messages[-2].get("name", last_speaker.name) if len(messages) > 1 else last_speaker.name
+        elif self._posted(messages):
+            logger.debug(f"{self.poster} has posted, ending the chat")
+            return None
+        elif "code" in intents:
+            next_speaker = self.coder
+        elif self._idle_rounds(messages) >= self.max_idle_rounds:
+            logger.info(f"No results after {self.max_idle_rounds} manager and critic turns, ending the chat")
+            return None
+        else:
+            next_speaker = self._next(last_speaker.name, intents, messages)
+        logger.debug(f"{last_speaker.name} {sorted(intents)} -> {next_speaker}")
+        return agents.get(next_speaker) or agents[self.manager]
+
+    def _next(self, speaker, intents, messages):
+        if speaker == self.manager:
+            if not any(message.get("name") == self.critic for message in messages):
+                return self.critic  # the plan is always reviewed first
+            # research that is asked for comes first, even when the message also mentions posting
+            if "scrape" in intents:
+                return self.scraper
+            if "post" in intents and self._results_approved(messages):
+                return self.poster
+            return self.critic
+        if speaker == self.critic:
+            if "scrape" in intents:
+                return self.scraper
+            if "approve" in intents and self._results_approved(messages):
+                return self.poster
+            # feedback on the plan, or approval of it, goes back to the manager
+            return self.manager
+        if speaker in (self.scraper, self.coder):
+            return self.critic
+        return self.manager
+
+    def _results_approved(self, messages):
+        """True once the critic has approved after the latest scraper or coder result"""
+        last_result = last_approval = -1
+        for index, message in enumerate(messages):
+            if message.get("name") in (self.scraper, self.coder):
+                last_result = index
+            elif message.get("name") == self.critic and "approve" in classify(message):
+                last_approval = index
+        return 0 <= last_result < last_approval
+
+    def _idle_rounds(self, messages):
+        """Manager and critic turns since the latest scraper or coder result (or the start)"""
+        rounds = 0
+        for message in reversed(messages):
+            name = message.get("name")
+            if name in (self.scraper, self.coder):
+                break
+            if name in (self.manager, self.critic) and not classify(message) & {"tool_call", "tool_result"}:
+                rounds += 1
+        return rounds
+
+    def _posted(self, messages):
+        # the poster's own reply after its tool round, as opposed to the tool call and result
+        return any(
+            message.get("name") == self.poster and not classify(message) & {"tool_call", "tool_result"}
+            for message in messages
+        )
+
+    @staticmethod
+    def _executor(message, agents):
+        calls = message.get("tool_calls") or [{"function": message.get("function_call") or {}}]
+        name = calls[0].get("function", {}).get("name")
+        for agent in agents:
+            if name and hasattr(agent, "can_execute_function") and agent.can_execute_function(name):
+                return agent.name
+        return None
@@ -0,0 +1,733 @@
+# standin_chain.py
+"""In-process stand-in for the anvil deployment, for fast perf experiments.
+
+Speaks enough Ethereum JSON-RPC (HTTP and websocket eth_subscribe) for the code paths the
+aggregator and operators use: the NewsletterPrompt task and service managers, the registry
+coordinator / BLS apk registry / operator state retriever reads, and pipelined raw
+transactions. Blocks are sealed every `block_time` seconds, or on every transaction when it
+is 0. Contract logic is simulated: respondToTask does not verify the BLS signature.
+
+    python standin_chain.py --port 8545 --block-time 1
+"""
+import os
+import time
+import heapq
+import asyncio
+import logging
+import argparse
+import threading
+from collections import defaultdict
+import rlp
+import eth_abi
+from aiohttp import web, WSMsgType
+from eth_account import Account
+from eth_utils import keccak, to_checksum_address
+from web3 import Web3
+
+logger = logging.getLogger(__name__)
+
+# addresses from config-files/*.yaml, so the stock configs work against the stand-in unchanged
+REGISTRY_COORDINATOR_ADDRESS = "0xa82fF9aFd8f496c3d6ac40E2a0F282E47488CFc9"
+OPERATOR_STATE_RETRIEVER_ADDRESS = "0x95401dc811bb5740090279Ba06cfA8fcF6113778"
+TASK_MANAGER_ADDRESS = "0x9E545E3C0baAB3E08CdfD552C960A1050f373042"
+
+# other contracts eigensdk looks up by getter; they only need distinct addresses
+ADDRESS_GETTERS = (
+    "serviceManager", "stakeRegistry", "blsApkRegistry", "indexRegistry", "delegation",
+    "avsDirectory", "slasher", "strategyManager", "eigenPodManager", "registryCoordinator",
+)
+
+ZERO_WORD = b"\x00" * 32
+OPERATOR_STAKE = 10 ** 18
+
+def placeholder_address(name):
+    return to_checksum_address(keccak(text=f"standin:{name}")[:20])
+
+def split_types(signature):
+    """'f(uint256,(uint256,string)[])' -> ['uint256', '(uint256,string)[]']"""
+    inner = signature[signature.index("(") + 1:signature.rindex(")")]
+    types, depth, current = [], 0, ""
+    for char in inner:
+        if char == "," and depth == 0:
+            types.append(current)
+            current = ""
+            continue
+        depth += (char == "(") - (char == ")")
+        current += char
+    if current:
+        types.append(current)
+    return types
+
+def to_hex(value):
+    if isinstance(value, int):
+        return hex(value)
+    return "0x" + bytes(value).hex()
+
+class RpcError(Exception):
+    def __init__(self, message, code=-32000):
+        super().__init__(message)
+        self.code = code
+
+class Revert(Exception):
+    pass
+
+class StandInContract:
+    """Dispatches calls by selector to handler methods.
+
+    `functions` maps a Solidity signature to (output types, handler name, mutates state).
+    """
+    functions = {}
+
+    def __init__(self, chain, address):
+        self.chain = chain
+        self.address = to_checksum_address(address)
+        self.selectors = {
+            keccak(text=signature)[:4]: (signature, outputs, handler, mutates)
+            for signature, (outputs, handler, mutates) in self.functions.items()
+        }
+        self.getters = {keccak(text=f"{name}()")[:4]: name for name in ADDRESS_GETTERS}
+
+    def dispatch(self, data, sender, transact):
+        selector = bytes(data[:4])
+        if selector not in self.selectors:
+            if selector in self.getters:
+                return eth_abi.encode(["address"], [self.chain.address_of(self.getters[selector])])
+            # anything else (e.g. EigenLayer core registration) is accepted as a no-op
+            return ZERO_WORD
+        signature, outputs, handler, mutates = self.selectors[selector]
+        if mutates and not transact:
+            return b""
+        args = eth_abi.decode(split_types(signature), bytes(data[4:]))
+        result = getattr(self, handler)(sender, *args)
+        return eth_abi.encode(outputs, result) if outputs else b""
+
+    def emit(self, event_signature, indexed, values):
+        """indexed: one flag per event argument; indexed arguments must be static types"""
+        types = split_types(event_signature)
+        topics = [keccak(text=event_signature)]
+        data_types, data_values = [], []
+        for arg_type, is_indexed, value in zip(types, indexed, values):
+            if is_indexed:
+                topics.append(eth_abi.encode([arg_type], [value]))
+            else:
+                data_types.append(arg_type)
+                data_values.append(value)
+        self.chain.record_log(self.address, topics, eth_abi.encode(data_types, data_values))
+
+class TaskManager(StandInContract):
+    functions = {
+        "createNewTask(uint256,string,uint32,bytes)": ([], "create_new_task", True),
+        "respondToTask((uint256,string,uint32,bytes,uint32),(uint32,uint256),"
+        "(uint32[],(uint256,uint256)[],(uint256,uint256)[],(uint256[2],uint256[2]),(uint256,uint256),uint32[],uint32[],uint32[][]))":
+            ([], "respond_to_task", True),
+        "latestTaskNum()": (["uint32"], "latest_task_num", False),
+    }
+
+    def __init__(self, chain, address):
+        super().__init__(chain, address)
+        self.tasks = []
+        self.responded = set()
+
+    def create_new_task(self, sender, task_type, agent_prompt, quorum_threshold_percentage, quorum_numbers):
+        task = (task_type, agent_prompt, self.chain.current_block_number, quorum_numbers, quorum_threshold_percentage)
+        task_index = len(self.tasks)
+        self.tasks.append(task)
+        self.emit("NewTaskCreated(uint32,(uint256,string,uint32,bytes,uint32))", (True, False), (task_index, task))
+
+    def respond_to_task(self, sender, task, task_response, non_signer_stakes_and_signature):
+        task_index = task_response[0]
+        if task_index >= len(self.tasks):
+            raise Revert("task does not exist")
+        if task_index in self.responded:
+            raise Revert("task already responded")
+        self.responded.add(task_index)
+        hash_of_non_signers = keccak(eth_abi.encode(["(uint256,uint256)[]"], [non_signer_stakes_and_signature[1]]))
+        self.emit(
+            "TaskResponded((uint32,uint256),(uint32,bytes32))", (False, False),
+            (task_response, (self.chain.current_block_number, hash_of_non_signers)),
+        )
+
+    def latest_task_num(self, sender):
+        return [len(self.tasks)]
+
+class ServiceManager(StandInContract):
+    functions = {
+        "newsletterPromptTaskManager()": (["address"], "task_manager", False),
+    }
+
+    def task_manager(self, sender):
+        return [self.chain.task_manager.address]
+
+class BlsApkRegistry(StandInContract):
+    functions = {
+        "operatorToPubkeyHash(address)": (["bytes32"], "operator_to_pubkey_hash", False),
+        "getRegisteredPubkey(address)": (["(uint256,uint256)", "bytes32"], "get_registered_pubkey", False),
+    }
+
+    def operator_to_pubkey_hash(self, sender, operator):
+        registered = self.chain.registry.operators.get(to_checksum_address(operator))
+        return [registered["operator_id"] if registered else ZERO_WORD]
+
+    def get_registered_pubkey(self, sender, operator):
+        registered = self.chain.registry.operators.get(to_checksum_address(operator))
+        if registered is None:
+            raise Revert("operator is not registered")
+        return [registered["g1"], registered["operator_id"]]
+
+class RegistryCoordinator(StandInContract):
+    functions = {
+        "getOperatorId(address)": (["bytes32"], "get_operator_id", False),
+        "getCurrentQuorumBitmap(bytes32)": (["uint192"], "get_current_quorum_bitmap", False),
+        "quorumCount()": (["uint8"], "quorum_count", False),
+        "pubkeyRegistrationMessageHash(address)": (["(uint256,uint256)"], "pubkey_registration_message_hash", False),
+        "calculateOperatorAVSRegistrationDigestHash(address,address,bytes32,uint256)":
+            (["bytes32"], "registration_digest_hash", False),
+        "registerOperator(bytes,string,((uint256,uint256),(uint256,uint256),(uint256[2],uint256[2])),(bytes,bytes32,uint256))":
+            ([], "register_operator", True),
+    }
+
+    def __init__(self, chain, address):
+        super().__init__(chain, address)
+        self.operators = {}  # address -> {"operator_id", "g1", "g2", "socket", "registered_at"}
+        self.operators_by_id = {}
+
+    def get_operator_id(self, sender, operator):
+        registered = self.operators.get(to_checksum_address(operator))
+        return [registered["operator_id"] if registered else ZERO_WORD]
+
+    def get_current_quorum_bitmap(self, sender, operator_id):
+        return [1 if operator_id in self.operators_by_id else 0]
+
+    def quorum_count(self, sender):
+        return [1]
+
+    def pubkey_registration_message_hash(self, sender, operator):
+        return [(1, 2)]  # the BN254 G1 generator; the stand-in does not check the registration signature
+
+    def registration_digest_hash(self, sender, operator, avs, salt, expiry):
+        return [keccak(eth_abi.encode(["address", "address", "bytes32", "uint256"], [operator, avs, salt, expiry]))]
+
+    def register_operator(self, sender, quorum_numbers, socket, params, operator_signature):
+        _, g1, g2 = params
+        self.register(sender, g1, g2, socket)
+
+    def register(self, operator, g1, g2, socket):
+        operator = to_checksum_address(operator)
+        if operator in self.operators:
+            raise Revert("operator already registered")
+        operator_id = keccak(eth_abi.encode(["uint256", "uint256"], list(g1)))
+        registered = {
+            "operator_id": operator_id, "g1": tuple(g1), "g2": tuple(map(tuple, g2)),
+            "socket": socket, "registered_at": self.chain.current_block_number,
+        }
+        self.operators[operator] = registered
+        self.operators_by_id[operator_id] = operator
+        self.chain.bls_apk_registry.emit(
+            "NewPubkeyRegistration(address,(uint256,uint256),(uint256[2],uint256[2]))", (True, False, False),
+            (operator, registered["g1"], registered["g2"]),
+        )
+        self.emit("OperatorRegistered(address,bytes32)", (True, True), (operator, operator_id))
+        self.emit("OperatorSocketUpdate(bytes32,string)", (True, False), (operator_id, socket))
+
+    def operators_at(self, block_number):
+        return [
+            (operator, registered["operator_id"], OPERATOR_STAKE)
+            for operator, registered in self.operators.items() if registered["registered_at"] <= block_number
+        ]
+
+class OperatorStateRetriever(StandInContract):
+    functions = {
+        "getOperatorState(address,bytes,uint32)": (["(address,bytes32,uint96)[][]"], "get_operator_state", False),
+        "getOperatorState(address,bytes32,uint32)":
+            (["uint256", "(address,bytes32,uint96)[][]"], "get_operator_state_by_id", False),
+        "getCheckSignaturesIndices(address,uint32,bytes,bytes32[])":
+            (["(uint32[],uint32[],uint32[],uint32[][])"], "get_check_signatures_indices", False),
+    }
+
+    def get_operator_state(self, sender, registry_coordinator, quorum_numbers, block_number):
+        return [[self.chain.registry.operators_at(block_number) for _ in quorum_numbers]]
+
+    def get_operator_state_by_id(self, sender, registry_coordinator, operator_id, block_number):
+        return [1, [self.chain.registry.operators_at(block_number)]]
+
+    def get_check_signatures_indices(self, sender, registry_coordinator, block_number, quorum_numbers, non_signer_ids):
+        quorums = len(quorum_numbers)
+        return [(
+            [0] * len(non_signer_ids),
+            [0] * quorums,
+            [0] * quorums,
+            [[0] * len(non_signer_ids) for _ in range(quorums)],
+        )]
+
+def decode_raw_transaction(raw):
+    sender = Account.recover_transaction(raw)
+    if raw[0] >= 0xC0:
+        nonce, gas_price, gas, to, value, data, _, _, _ = rlp.decode(raw)
+    elif raw[0] == 2:
+        _, nonce, _, gas_price, gas, to, value, data, _, _, _, _ = rlp.decode(raw[1:])
+    else:
+        raise RpcError(f"unsupported transaction type {raw[0]}")
+    as_int = lambda field: int.from_bytes(field, "big")
+    return {
+        "hash": keccak(raw),
+        "from": to_checksum_address(sender),
+        "nonce": as_int(nonce),
+        "gasPrice": as_int(gas_price),
+        "gas": as_int(gas),
+        "to": to_checksum_address(to) if to else None,
+        "value": as_int(value),
+        "input": bytes(data),
+    }
+
+class StandInChain:
+    """Chain state and block production; `rpc` answers JSON-RPC requests"""
+    def __init__(self, block_time=1.0, chain_id=31337, gas_price=Web3.to_wei(1, "gwei")):
+        self.block_time = block_time
+        self.chain_id = chain_id
+        self.gas_price = gas_price
+        self.lock = threading.RLock()
+        self.blocks = []
+        self.logs = []
+        self.transactions = {}
+        self.receipts = {}
+        self.mempool = {}  # (sender, nonce) -> transaction
+        self.nonces = defaultdict(int)  # mined nonces
+        self.listeners = []  # called with (block, logs) after every sealed block
+        self.current_block_number = 0
+        self._block_logs = []
+        self.contracts = {}
+        self.addresses = {name: placeholder_address(name) for name in ADDRESS_GETTERS}
+        self.addresses["registryCoordinator"] = REGISTRY_COORDINATOR_ADDRESS
+        self.registry = self._install(RegistryCoordinator, REGISTRY_COORDINATOR_ADDRESS)
+        self.bls_apk_registry = self._install(BlsApkRegistry, self.addresses["blsApkRegistry"])
+        self.service_manager = self._install(ServiceManager, self.addresses["serviceManager"])
+        self.task_manager = self._install(TaskManager, TASK_MANAGER_ADDRESS)
+        self._install(OperatorStateRetriever, OPERATOR_STATE_RETRIEVER_ADDRESS)
+        self._seal([])  # genesis
+        if block_time > 0:
+            threading.Thread(target=self._produce_blocks, name="standin-blocks", daemon=True).start()
+
+    def _install(self, contract_class, address):
+        contract = contract_class(self, address)
+        self.contracts[contract.address] = contract
+        return contract
+
+    def address_of(self, name):
+        return self.addresses[name]
+
+    def register_operator(self, operator, g1, g2, socket="Not Needed"):
+        """Seeds an operator registration directly, without a registerOperator transaction"""
+        with self.lock:
+            self._seal([{"apply": lambda: self.registry.register(operator, g1, g2, socket)}])
+
+    # --- block production ---
+
+    def _produce_blocks(self):
+        while True:
+            time.sleep(self.block_time)
+            with self.lock:
+                self._seal(self._ready_transactions())
+
+    def _ready_transactions(self):
+        """Pending transactions whose nonces follow on from their sender's mined nonce.
+
+        Each sender's transactions stay in nonce order; senders are interleaved by the gas price
+        of their next transaction, like a node's miner picks from its per-account queues.
+        """
+        by_sender = defaultdict(dict)
+        for (sender, nonce), tx in self.mempool.items():
+            by_sender[sender][nonce] = tx
+        queues = []
+        for sender, txs in by_sender.items():
+            queue = []
+            nonce = self.nonces[sender]
+            while nonce in txs:
+                queue.append(txs[nonce])
+                nonce += 1
+            if queue:
+                queues.append(queue)
+        heads = [(-queue[0]["gasPrice"], i, 0) for i, queue in enumerate(queues)]
+        heapq.heapify(heads)
+        ready = []
+        while heads:
+            _, i, position = heapq.heappop(heads)
+            ready.append(queues[i][position])
+            if position + 1 < len(queues[i]):
+                heapq.heappush(heads, (-queues[i][position + 1]["gasPrice"], i, position + 1))
+        return ready
+
+    def _seal(self, txs):
+        number = len(self.blocks)
+        self.current_block_number = number
+        parent_hash = self.blocks[-1]["hash"] if self.blocks else ZERO_WORD
+        block_hash = keccak(parent_hash + number.to_bytes(32, "big") + str(time.time()).encode())
+        block = {
+            "number": number, "hash": block_hash, "parentHash": parent_hash,
+            "timestamp": max(int(time.time()), self.blocks[-1]["timestamp"] if self.blocks else 0),
+            "transactions": [], "gasUsed": 0,
+        }
+        block_logs = []
+        for tx in txs:
+            self._block_logs = []
+            status = 1
+            if "apply" in tx:
+                tx = {"hash": keccak(block_hash + len(block["transactions"]).to_bytes(4, "big")),
+                      "from": self.registry.address, "to": self.registry.address, "nonce": 0,
+                      "gasPrice": 0, "gas": 0, "value": 0, "input": b"", "apply": tx["apply"]}
+                tx["apply"]()
+            else:
+                self.mempool.pop((tx["from"], tx["nonce"]), None)
+                self.nonces[tx["from"]] = tx["nonce"] + 1
+                contract = self.contracts.get(tx["to"])
+                if contract is not None:
+                    try:
+                        contract.dispatch(tx["input"], tx["from"], transact=True)
+                    except Revert as e:
+                        logger.debug(f"Tx {tx['hash'].hex()} reverted: {e}")
+                        status = 0
+                        self._block_logs = []
+            index = len(block["transactions"])
+            logs = []
+            for address, topics, data in self._block_logs:
+                logs.append({
+                    "address": address, "topics": topics, "data": data, "blockNumber": number,
+                    "blockHash": block_hash, "transactionHash": tx["hash"], "transactionIndex": index,
+                    "logIndex": len(block_logs) + len(logs), "removed": False,
+                })
+            calldata_gas = sum(16 if byte else 4 for byte in tx["input"])
+            gas_used = 21000 + calldata_gas + 20000 * len(logs) if "apply" not in tx else 0
+            block["gasUsed"] += gas_used
+            block["transactions"].append(tx["hash"])
+            self.transactions[tx["hash"]] = {**tx, "blockNumber": number, "blockHash": block_hash, "transactionIndex": index}
+            self.receipts[tx["hash"]] = {
+                "transactionHash": tx["hash"], "transactionIndex": index, "blockHash": block_hash,
+                "blockNumber": number, "from": tx["from"], "to": tx["to"], "gasUsed": gas_used,
+                "cumulativeGasUsed": block["gasUsed"], "effectiveGasPrice": tx["gasPrice"],
+                "status": status, "logs": logs,
+            }
+            block_logs += logs
+        self._block_logs = []
+        self.blocks.append(block)
+        self.logs += block_logs
+        for listener in list(self.listeners):
+            try:
+                listener(block, block_logs)
+            except Exception as e:
+                logger.error(f"Block listener failed: {e}")
+        return block
+
+    def record_log(self, address, topics, data):
+        self._block_logs.append((address, topics, data))
+
+    # --- JSON-RPC ---
+
+    def rpc(self, method, params):
+        handler = getattr(self, f"_rpc_{method}", None)
+        if handler is None:
+            raise RpcError(f"the method {method} does not exist/is not available", code=-32601)
+        with self.lock:
+            return handler(*params)
+
+    def _block_number(self, tag):
+        if tag in (None, "latest", "pending", "safe", "finalized"):
+            return len(self.blocks) - 1
+        if tag == "earliest":
+            return 0
+        return int(tag, 16) if isinstance(tag, str) else int(tag)
+
+    def _rpc_web3_clientVersion(self):
+        return "standin/v0.0.1"
+
+    def _rpc_net_version(self):
+        return str(self.chain_id)
+
+    def _rpc_eth_chainId(self):
+        return hex(self.chain_id)
+
+    def _rpc_eth_blockNumber(self):
+        return hex(len(self.blocks) - 1)
+
+    def _rpc_eth_gasPrice(self):
+        return hex(self.gas_price)
+
+    def _rpc_eth_maxPriorityFeePerGas(self):
+        return hex(self.gas_price)
+
+    def _rpc_eth_getBalance(self, address, tag=None):
+        return hex(10 ** 24)
+
+    def _rpc_eth_getCode(self, address, tag=None):
+        return "0x00" if to_checksum_address(address) in self.contracts else "0x"
+
+    def _rpc_eth_estimateGas(self, tx, tag=None):
+        return hex(1_000_000)
+
+    def _rpc_eth_getTransactionCount(self, address, tag=None):
+        address = to_checksum_address(address)
+        nonce = self.nonces[address]
+        if tag == "pending":
+            while (address, nonce) in self.mempool:
+                nonce += 1
+        return hex(nonce)
+
+    def _rpc_eth_sendRawTransaction(self, raw):
+        tx = decode_raw_transaction(bytes.fromhex(raw[2:]))
+        if tx["nonce"] < self.nonces[tx["from"]]:
+            raise RpcError("nonce too low")
+        replaced = self.mempool.get((tx["from"], tx["nonce"]))
+        if replaced is not None and replaced["hash"] != tx["hash"] and replaced["gasPrice"] >= tx["gasPrice"]:
+            raise RpcError("replacement transaction underpriced")
+        self.mempool[(tx["from"], tx["nonce"])] = tx
+        if self.block_time <= 0:
+            self._seal(self._ready_transactions())
+        return to_hex(tx["hash"])
+
+    def _rpc_eth_call(self, tx, tag=None):
+        contract = self.contracts.get(to_checksum_address(tx["to"]))
+        if contract is None:
+            return "0x"
+        data = bytes.fromhex((tx.get("data") or tx.get("input") or "0x")[2:])
+        sender = to_checksum_address(tx["from"]) if tx.get("from") else None
+        try:
+            return to_hex(contract.dispatch(data, sender, transact=False))
+        except Revert as e:
+            raise RpcError(f"execution reverted: {e}", code=3)
+
+    def _rpc_eth_getTransactionReceipt(self, tx_hash):
+        receipt = self.receipts.get(bytes.fromhex(tx_hash[2:]))
+        return self._format_receipt(receipt) if receipt is not None else None
+
+    def _rpc_eth_getTransactionByHash(self, tx_hash):
+        tx_hash = bytes.fromhex(tx_hash[2:])
+        tx = self.transactions.get(tx_hash)
+        if tx is None:
+            tx = next((tx for tx in self.mempool.values() if tx["hash"] == tx_hash), None)
+        return self._format_transaction(tx) if tx is not None else None
+
+    def _rpc_eth_getBlockByNumber(self, tag, full_transactions=False):
+        number = self._block_number(tag)
+        return self._format_block(self.blocks[number], full_transactions) if number < len(self.blocks) else None
+
+    def _rpc_eth_getBlockByHash(self, block_hash, full_transactions=False):
+        block_hash = bytes.fromhex(block_hash[2:])
+        block = next((block for block in self.blocks if block["hash"] == block_hash), None)
+        return self._format_block(block, full_transactions) if block is not None else None
+
+    def _rpc_eth_getLogs(self, log_filter):
+        return [self._format_log(log) for log in self.logs if self.matches(log, log_filter)]
+
+    def matches(self, log, log_filter):
+        if "blockHash" in log_filter:
+            if log["blockHash"] != bytes.fromhex(log_filter["blockHash"][2:]):
+                return False
+        else:
+            from_block = self._block_number(log_filter.get("fromBlock", "latest"))
+            to_block = self._block_number(log_filter.get("toBlock", "latest"))
+            if not from_block <= log["blockNumber"] <= to_block:
+                return False
+        addresses = log_filter.get("address")
+        if addresses:
+            addresses = [addresses] if isinstance(addresses, str) else addresses
+            if log["address"] not in [to_checksum_address(address) for address in addresses]:
+                return False
+        for position, wanted in enumerate(log_filter.get("topics") or []):
+            if wanted is None:
+                continue
+            wanted = [wanted] if isinstance(wanted, str) else wanted
+            if position >= len(log["topics"]) or to_hex(log["topics"][position]) not in [topic.lower() for topic in wanted]:
+                return False
+        return True
+
+    def _format_log(self, log):
+        return {
+            "address": log["address"],
+            "topics": [to_hex(topic) for topic in log["topics"]],
+            "data": to_hex(log["data"]),
+            "blockNumber": hex(log["blockNumber"]),
+            "blockHash": to_hex(log["blockHash"]),
+            "transactionHash": to_hex(log["transactionHash"]),
+            "transactionIndex": hex(log["transactionIndex"]),
+            "logIndex": hex(log["logIndex"]),
+            "removed": False,
+        }
+
+    def _format_receipt(self, receipt):
+        return {
+            "transactionHash": to_hex(receipt["transactionHash"]),
+            "transactionIndex": hex(receipt["transactionIndex"]),
+            "blockHash": to_hex(receipt["blockHash"]),
+            "blockNumber": hex(receipt["blockNumber"]),
+            "from": receipt["from"],
+            "to": receipt["to"],
+            "gasUsed": hex(receipt["gasUsed"]),
+            "cumulativeGasUsed": hex(receipt["cumulativeGasUsed"]),
+            "effectiveGasPrice": hex(receipt["effectiveGasPrice"]),
+            "contractAddress": None,
+            "logs": [self._format_log(log) for log in receipt["logs"]],
+            "logsBloom": to_hex(b"\x00" * 256),
+            "status": hex(receipt["status"]),
+            "type": "0x0",
+        }
+
+    def _format_transaction(self, tx):
+        mined = "blockNumber" in tx
+        return {
+            "hash": to_hex(tx["hash"]),
+            "from": tx["from"],
+            "to": tx["to"],
+            "nonce": hex(tx["nonce"]),
+            "gas": hex(tx["gas"]),
+            "gasPrice": hex(tx["gasPrice"]),
+            "value": hex(tx["value"]),
+            "input": to_hex(tx["input"]),
+            "blockNumber": hex(tx["blockNumber"]) if mined else None,
+            "blockHash": to_hex(tx["blockHash"]) if mined else None,
+            "transactionIndex": hex(tx["transactionIndex"]) if mined else None,
+            "type": "0x0",
+            "chainId": hex(self.chain_id),
+            "v": "0x0", "r": "0x0", "s": "0x0",
+        }
+
+    def _format_block(self, block, full_transactions):
+        transactions = [
+            self._format_transaction(self.transactions[tx_hash]) if full_transactions else to_hex(tx_hash)
+            for tx_hash in block["transactions"]
+        ]
+        return {
+            "number": hex(block["number"]),
+            "hash": to_hex(block["hash"]),
+            "parentHash": to_hex(block["parentHash"]),
+            "timestamp": hex(block["timestamp"]),
+            "gasUsed": hex(block["gasUsed"]),
+            "gasLimit": hex(30_000_000),
+            "baseFeePerGas": hex(0),
+            "miner": "0x0000000000000000000000000000000000000000",
+            "difficulty": "0x0",
+            "totalDifficulty": "0x0",
+            "extraData": "0x",
+            "size": hex(1000),
+            "nonce": "0x0000000000000000",
+            "mixHash": to_hex(ZERO_WORD),
+            "sha3Uncles": to_hex(ZERO_WORD),
+            "stateRoot": to_hex(ZERO_WORD),
+            "transactionsRoot": to_hex(ZERO_WORD),
+            "receiptsRoot": to_hex(ZERO_WORD),
+            "logsBloom": to_hex(b"\x00" * 256),
+            "uncles": [],
+            "transactions": transactions,
+        }
+
+class StandInRpcServer:
+    """Serves a StandInChain over HTTP JSON-RPC and websocket (eth_subscribe logs/newHeads) on one port"""
+    def __init__(self, chain):
+        self.chain = chain
+        self.app = web.Application()
+        self.app.add_routes([web.post("/", self.handle_http), web.get("/", self.handle_websocket)])
+
+    def _call(self, request):
+        try:
+            result = self.chain.rpc(request["method"], request.get("params") or [])
+            return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+        except RpcError as e:
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": e.code, "message": str(e)}}
+        except Exception as e:
+            logger.exception(f"{request.get('method')} failed")
+            return {"jsonrpc": "2.0", "id": request.get("id"), "error": {"code": -32603, "message": str(e)}}
+
+    async def handle_http(self, request):
+        payload = await request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._call(item) for item in payload])
+        return web.json_response(self._call(payload))
+
+    async def handle_websocket(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        loop = asyncio.get_running_loop()
+        outbox = asyncio.Queue()
+        subscriptions = {}  # id -> listener
+
+        def subscribe(kind, log_filter=None):
+            subscription_id = "0x" + os.urandom(16).hex()
+
+            def listener(block, logs):
+                if kind == "newHeads":
+                    results = [self.chain._format_block(block, False)]
+                else:
+                    results = [self.chain._format_log(log) for log in logs if self.chain.matches(log, {
+                        "fromBlock": "earliest", "address": log_filter.get("address"), "topics": log_filter.get("topics"),
+                    })]
+                for result in results:
+                    loop.call_soon_threadsafe(outbox.put_nowait, {
+                        "jsonrpc": "2.0", "method": "eth_subscription",
+                        "params": {"subscription": subscription_id, "result": result},
+                    })
+
+            subscriptions[subscription_id] = listener
+            with self.chain.lock:
+                self.chain.listeners.append(listener)
+            return subscription_id
+
+        async def send_loop():
+            while True:
+                await websocket.send_json(await outbox.get())
+
+        sender = asyncio.create_task(send_loop())
+        try:
+            async for message in websocket:
+                if message.type != WSMsgType.TEXT:
+                    continue
+                request = message.json()
+                if request["method"] == "eth_subscribe":
+                    kind, *rest = request["params"]
+                    if kind not in ("logs", "newHeads"):
+                        reply = {"jsonrpc": "2.0", "id": request["id"], "error": {"code": -32602, "message": f"unsupported subscription {kind}"}}
+                    else:
+                        reply = {"jsonrpc": "2.0", "id": request["id"], "result": subscribe(kind, rest[0] if rest else {})}
+                elif request["method"] == "eth_unsubscribe":
+                    listener = subscriptions.pop(request["params"][0], None)
+                    if listener is not None:
+                        with self.chain.lock:
+                            self.chain.listeners.remove(listener)
+                    reply = {"jsonrpc": "2.0", "id": request["id"], "result": listener is not None}
+                else:
+                    reply = self._call(request)
+                await outbox.put(reply)
+        finally:
+            sender.cancel()
+            with self.chain.lock:
+                for listener in subscriptions.values():
+                    self.chain.listeners.remove(listener)
+        return websocket
+
+    def run(self, host, port):
+        web.run_app(self.app, host=host, port=int(port), print=None)
+
+    def start_in_background(self, host, port):
+        """Serves from a daemon thread; returns once the port is bound"""
+        started = threading.Event()
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            runner = web.AppRunner(self.app)
+            loop.run_until_complete(runner.setup())
+            loop.run_until_complete(web.TCPSite(runner, host, int(port)).start())
+            started.set()
+            loop.run_forever()
+
+        threading.Thread(target=serve, name="standin-rpc", daemon=True).start()
+        started.wait()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="In-process stand-in chain for the NewsletterPrompt AVS")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8545)
+    parser.add_argument("--block-time", type=float, default=1.0, help="seconds between blocks; 0 seals a block per transaction")
+    parser.add_argument("--chain-id", type=int, default=31337)
+    args = parser.parse_args()
+
+    chain = StandInChain(block_time=args.block_time, chain_id=args.chain_id)
+    logger.info(f"Stand-in chain on {args.host}:{args.port}, task manager {chain.task_manager.address}")
+    StandInRpcServer(chain).run(args.host, args.port)
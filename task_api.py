@@ -0,0 +1,56 @@
+# task_api.py
+import asyncio
+import logging
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+class TaskApi:
+    """HTTP endpoints on the aggregator server for creating verification tasks from other processes.
+
+    Tasks have to be created by the aggregator service itself: it owns the aggregator key's
+    nonces, initializes the task for BLS aggregation and is where operators send their
+    signatures. agents.py creates its tasks here and long-polls for the on-chain verdict.
+
+        POST /tasks                              {"prompts": [...]} -> {"task_indexes": [...]}
+        GET  /tasks/{index}/response?timeout=60  -> {"task_index": ..., "verdict": true/false/null}
+    """
+    def __init__(self, aggregator, max_wait=300):
+        self.aggregator = aggregator
+        self.max_wait = max_wait
+
+    def add_to_app(self, app):
+        app.add_routes([
+            web.post('/tasks', self.handle_create),
+            web.get('/tasks/{index}/response', self.handle_response),
+        ])
+
+    async def handle_create(self, request):
+        try:
+            data = await request.json()
+        except ValueError:
+            return web.json_response({'error': 'invalid json'}, status=400)
+        prompts = data.get('prompts') if isinstance(data, dict) else None
+        if not isinstance(prompts, list) or not prompts or not all(isinstance(prompt, str) for prompt in prompts):
+            return web.json_response({'error': 'expected {"prompts": ["..."]}'}, status=400)
+        try:
+            # blocks until the createNewTask receipts are in, so keep it off the event loop
+            task_indexes = await asyncio.to_thread(
+                self.aggregator.send_new_manager_instructions_verification_tasks, prompts
+            )
+        except Exception as e:
+            logger.error(f"Creating {len(prompts)} verification tasks failed: {e}")
+            return web.json_response({'error': str(e)}, status=500)
+        return web.json_response({'task_indexes': task_indexes})
+
+    async def handle_response(self, request):
+        try:
+            task_index = int(request.match_info['index'])
+            timeout = min(float(request.query.get('timeout', 60)), self.max_wait)
+        except ValueError:
+            return web.json_response({'error': 'invalid task index or timeout'}, status=400)
+        try:
+            verdict = await asyncio.wait_for(self.aggregator.await_task_response(task_index), timeout)
+        except asyncio.TimeoutError:
+            verdict = None
+        return web.json_response({'task_index': task_index, 'verdict': verdict})
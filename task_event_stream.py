@@ -0,0 +1,171 @@
+# task_event_stream.py
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from web3 import Web3
+from eth_utils import event_abi_to_log_topic
+from chain_events import LogSubscription
+
+logger = logging.getLogger(__name__)
+
+class TaskEventStream:
+    """Delivers NewTaskCreated events to a handler without gaps.
+
+    Events arrive live over a websocket subscription. On startup and after every reconnect,
+    blocks between the persisted checkpoint and the chain head are backfilled with chunked
+    eth_getLogs queries that run in parallel.
+
+    The handler is called as `handler(event, done)` and calls `done()` once it has finished
+    with the event, possibly from another thread. The checkpoint only moves past a block when
+    every event of it is done, so a restart replays whatever was still being processed.
+    """
+    def __init__(self, web3, task_manager, ws_url, checkpoint_path, chunk_size=2000,
+                 backfill_workers=4, reconnect_delay=3):
+        self.web3 = web3
+        self.task_manager = task_manager
+        self.ws_url = ws_url
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self.backfill_workers = backfill_workers
+        self.reconnect_delay = reconnect_delay
+        self.topic = Web3.to_hex(event_abi_to_log_topic(task_manager.events.NewTaskCreated._get_event_abi()))
+        self.last_block = self._load_checkpoint()
+        self.head_block = None
+        self.head_checked_at = None
+        self.connected = False
+        self.checkpoint_lock = threading.Lock()
+        self.dispatched_through = self.last_block  # every event up to this block has been handed to the handler
+        self.unfinished = Counter()  # block number -> events handed to the handler and not done yet
+
+    def chain_head(self, max_age=1):
+        """Current chain head; eth_blockNumber is called at most every `max_age` seconds"""
+        if self.head_checked_at is None or time.monotonic() - self.head_checked_at > max_age:
+            self.head_block = max(self.head_block or 0, self.web3.eth.block_number)
+            self.head_checked_at = time.monotonic()
+        return self.head_block
+
+    def run(self, handler):
+        asyncio.run(self._run(handler))
+
+    async def _run(self, handler):
+        while True:
+            try:
+                async with LogSubscription(self.ws_url, self.task_manager.address, [self.topic]) as subscription:
+                    self.connected = True
+                    # subscribe first so nothing emitted while backfilling is lost
+                    backfilled_to = await self._backfill(handler)
+                    async for log in subscription:
+                        if log["removed"] or log["blockNumber"] <= backfilled_to:
+                            continue
+                        self.head_block = max(self.head_block, log["blockNumber"])
+                        # later logs of this block may still be on their way, so only earlier blocks are complete
+                        self._dispatched_through(log["blockNumber"] - 1)
+                        await self._dispatch(handler, log)
+            except Exception as e:
+                self.connected = False
+                logger.error(f"Task event subscription failed, reconnecting in {self.reconnect_delay}s: {e}")
+                await asyncio.sleep(self.reconnect_delay)
+
+    async def _backfill(self, handler):
+        head = await asyncio.to_thread(lambda: self.web3.eth.block_number)
+        self.head_block = head
+        if self.dispatched_through is None:
+            # first start: nothing to catch up on
+            self._dispatched_through(head)
+            return head
+        # after a reconnect, events dispatched before it may still be in flight; they are not fetched again
+        start_block = self.dispatched_through + 1
+        ranges = [
+            (start, min(start + self.chunk_size - 1, head))
+            for start in range(start_block, head + 1, self.chunk_size)
+        ]
+        if ranges:
+            logger.info(f"Backfilling task events for blocks {start_block}-{head} in {len(ranges)} chunks")
+            loop = asyncio.get_running_loop()
+            with ThreadPoolExecutor(max_workers=self.backfill_workers) as executor:
+                chunks = await asyncio.gather(*[
+                    loop.run_in_executor(executor, self._get_logs, from_block, to_block)
+                    for from_block, to_block in ranges
+                ])
+            for log in sorted((log for chunk in chunks for log in chunk), key=lambda log: (log["blockNumber"], log["logIndex"])):
+                await self._dispatch(handler, log)
+        self._dispatched_through(head)
+        return head
+
+    def _get_logs(self, from_block, to_block):
+        return self.web3.eth.get_logs({
+            "fromBlock": from_block,
+            "toBlock": to_block,
+            "address": self.task_manager.address,
+            "topics": [self.topic],
+        })
+
+    async def _dispatch(self, handler, log):
+        event = self.task_manager.events.NewTaskCreated().process_log(log)
+        block_number = log["blockNumber"]
+        with self.checkpoint_lock:
+            self.unfinished[block_number] += 1
+        done = _Once(lambda: self._finished(block_number))
+        try:
+            await asyncio.to_thread(handler, event, done)
+        except Exception as e:
+            logger.error(f"Handling task {event['args']['taskIndex']} failed: {e}")
+            done()
+
+    def _dispatched_through(self, block_number):
+        with self.checkpoint_lock:
+            if self.dispatched_through is None or block_number > self.dispatched_through:
+                self.dispatched_through = block_number
+            self._advance_checkpoint()
+
+    def _finished(self, block_number):
+        """Thread-safe: one event of the block is done"""
+        with self.checkpoint_lock:
+            self.unfinished[block_number] -= 1
+            if self.unfinished[block_number] == 0:
+                del self.unfinished[block_number]
+            self._advance_checkpoint()
+
+    def _advance_checkpoint(self):
+        """Saves the last block below the lowest one with unfinished events; call with checkpoint_lock held"""
+        if self.dispatched_through is None:
+            return
+        block_number = self.dispatched_through
+        if self.unfinished:
+            block_number = min(block_number, min(self.unfinished) - 1)
+        self._save_checkpoint(block_number)
+
+    def _load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r") as f:
+            return json.load(f)["last_processed_block"]
+
+    def _save_checkpoint(self, block_number):
+        if self.last_block is not None and block_number <= self.last_block:
+            return
+        self.last_block = block_number
+        os.makedirs(os.path.dirname(self.checkpoint_path) or ".", exist_ok=True)
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"last_processed_block": block_number}, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+class _Once:
+    """Calls `callback` on the first call only, so a handler calling done() twice can't skew the counts"""
+    def __init__(self, callback):
+        self.callback = callback
+        self.called = False
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            if self.called:
+                return
+            self.called = True
+        self.callback()
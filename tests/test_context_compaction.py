@@ -0,0 +1,97 @@
+# test_context_compaction.py
+import pytest
+
+pytest.importorskip("autogen")
+import context_compaction
+from context_compaction import LargeOutputReferencer, OutputStore, RollingSummary, TokenBudget, message_tokens
+
+LARGE = "\n".join(f"row {i}: " + "lorem ipsum dolor sit amet " * 4 for i in range(200))
+
+@pytest.fixture(autouse=True)
+def word_tokens(monkeypatch):
+    # tiktoken downloads its encodings on first use; a word count keeps the tests offline and exact
+    monkeypatch.setattr(context_compaction, "count_text_tokens", lambda text: len(str(text).split()))
+
+def count_text_tokens(text):
+    return context_compaction.count_text_tokens(text)
+
+def say(name, content):
+    return {"role": "user", "name": name, "content": content}
+
+def tool_call(name, call_id="call-1"):
+    return {"role": "assistant", "name": name, "content": None,
+            "tool_calls": [{"id": call_id, "type": "function", "function": {"name": "scrape_page", "arguments": "{}"}}]}
+
+def tool_result(name, content, call_id="call-1"):
+    return {"role": "tool", "name": name, "content": content,
+            "tool_responses": [{"tool_call_id": call_id, "role": "tool", "content": content}]}
+
+def test_message_tokens_counts_what_is_sent():
+    result = tool_result("web-scraper", "word " * 100)
+    # the parent content of a "tool" message is not sent, its unrolled responses are
+    assert message_tokens(result) == count_text_tokens("word " * 100)
+    assert message_tokens(say("critic", "hello")) == count_text_tokens("hello")
+    assert message_tokens(tool_call("web-scraper")) > 0
+
+def test_large_outputs_are_referenced_by_handle_except_in_the_newest_message():
+    store = OutputStore()
+    messages = [say("manager", "plan"), tool_result("web-scraper", LARGE), say("coder", LARGE), say("web-scraper", LARGE)]
+    compacted = LargeOutputReferencer(store, max_tokens=400, excerpt_tokens=50).apply_transform(messages)
+    assert compacted[0]["content"] == "plan"
+    assert compacted[-1]["content"] == LARGE
+    for message in compacted[1:3]:
+        assert message_tokens(message) < 100
+    referenced = compacted[1]["tool_responses"][0]["content"]
+    assert referenced.startswith("row 0:")
+    handle = referenced.split('fetch_output("')[1].split('"')[0]
+    assert store.get(handle) == LARGE
+
+def test_fetch_tool_returns_stored_outputs():
+    from autogen import ConversableAgent
+    store = OutputStore()
+    handle = store.put(LARGE)
+    agent = ConversableAgent("critic", llm_config={"config_list": [{"model": "gpt-4o-mini", "api_key": "unused"}]})
+    store.add_fetch_tool(agent)
+    assert [tool["function"]["name"] for tool in agent.llm_config["tools"]] == ["fetch_output"]
+    assert agent.can_execute_function("fetch_output")
+    assert agent.function_map["fetch_output"](handle) == LARGE
+    assert "No stored output" in agent.function_map["fetch_output"]("out-missing")
+
+def test_rolling_summary_folds_aged_messages_incrementally():
+    calls = []
+
+    def summarize(summary, messages):
+        calls.append(len(messages))
+        return summary + "".join(f"[{message['content']}]" for message in messages)
+
+    summary = RollingSummary(keep_recent=2, summarize=summarize)
+    messages = [say("manager", str(i)) for i in range(5)]
+    compacted = summary.apply_transform(messages)
+    assert compacted[0]["name"] == "context_summary"
+    assert compacted[0]["content"].endswith("[0][1][2]")
+    assert compacted[1:] == messages[3:]
+    compacted = summary.apply_transform(messages + [say("critic", "5")])
+    assert compacted[0]["content"].endswith("[0][1][2][3]")
+    assert calls == [3, 1]
+
+def test_rolling_summary_keeps_a_tool_result_with_its_call():
+    messages = [say("manager", "plan"), tool_call("web-scraper"), tool_result("web-scraper", "out"), say("critic", "ok")]
+    compacted = RollingSummary(keep_recent=2).apply_transform(messages)
+    assert compacted[1:] == messages[1:]
+
+def test_token_budget_drops_tool_calls_and_results_together():
+    messages = [
+        say("manager", "word " * 50),
+        tool_call("web-scraper", "call-1"), tool_result("web-scraper", "word " * 50, "call-1"),
+        tool_call("web-scraper", "call-2"), tool_result("web-scraper", "word " * 50, "call-2"),
+    ]
+    compacted = TokenBudget(max_tokens=10).apply_transform(messages)
+    # the newest result is kept together with the call it answers, even over budget
+    assert compacted == messages[3:]
+
+def test_token_budget_keeps_the_summary_and_drops_the_oldest_first():
+    summary = {"role": "user", "name": "context_summary", "content": "summary"}
+    messages = [summary, say("manager", "word " * 50), say("critic", "word " * 50), say("manager", "last")]
+    compacted = TokenBudget(max_tokens=60).apply_transform(messages)
+    assert compacted == [summary, messages[2], messages[3]]
+    assert TokenBudget(max_tokens=10_000).apply_transform(messages) == messages
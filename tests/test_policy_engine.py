@@ -0,0 +1,57 @@
+# test_policy_engine.py
+import pytest
+from policy_engine import AhoCorasick, PolicyEngine
+
+def test_aho_corasick_finds_overlapping_and_nested_patterns():
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert automaton.search("ushers") == {0, 1, 3}
+    assert automaton.search("this") == {2}
+    assert automaton.search("nothing here") == {0}
+    assert automaton.search("") == set()
+
+def test_aho_corasick_search_many_resets_between_texts():
+    automaton = AhoCorasick(["ab"])
+    # "a" at the end of one text must not combine with "b" at the start of the next
+    assert automaton.search_many(["xa", "bx", "ab"]) == [set(), set(), {0}]
+
+def test_default_rules():
+    engine = PolicyEngine()
+    assert engine.evaluate("Summarize DeFi news").approved
+    result = engine.evaluate("Summarize sports news")
+    assert not result.approved
+    assert result.rules == {"length": True, "keyword": False}
+    assert not engine.evaluate("ethereum " * 30).rules["length"]
+
+def test_rule_types_and_report_order():
+    engine = PolicyEngine([
+        {"name": "banned", "type": "banned", "keywords": ["scam"]},
+        {"name": "all", "type": "required_all", "keywords": ["eth", "L2"]},
+        {"name": "short", "type": "min_length", "limit": "5"},
+        {"name": "url", "type": "banned_regex", "pattern": r"https?://"},
+        {"name": "cased", "type": "regex", "pattern": "ETH", "case_sensitive": "true"},
+    ])
+    result = engine.evaluate("ETH on l2")
+    assert list(result.rules) == ["banned", "all", "short", "url", "cased"]
+    assert result.approved
+    assert engine.evaluate("eth on l2").rules["cased"] is False
+    assert engine.evaluate("ETH l2 scam").rules["banned"] is False
+    assert engine.evaluate("ETH l2 http://x").rules["url"] is False
+    assert engine.evaluate("ETH").rules == {"banned": True, "all": False, "short": False, "url": True, "cased": True}
+
+def test_evaluate_batch_matches_evaluate_and_keeps_order():
+    engine = PolicyEngine()
+    prompts = ["defi", "sports", "defi", "l2 rollups", ""]
+    assert engine.evaluate_batch(prompts) == [engine.evaluate(prompt) for prompt in prompts]
+
+def test_version_follows_the_rules():
+    assert PolicyEngine().version == PolicyEngine().version
+    assert PolicyEngine().version != PolicyEngine([{"name": "length", "type": "max_length", "limit": "100"}]).version
+
+def test_invalid_rules_are_rejected():
+    with pytest.raises(ValueError):
+        PolicyEngine([{"name": "x", "type": "nope"}])
+    with pytest.raises(ValueError):
+        PolicyEngine([
+            {"name": "x", "type": "max_length", "limit": "10"},
+            {"name": "x", "type": "min_length", "limit": "1"},
+        ])
@@ -0,0 +1,124 @@
+# test_signature_ingress.py
+import time
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("eigensdk.crypto.bls.attestation")
+from signature_ingress import SignatureIngress, DUPLICATE, LATE, MALFORMED, UNKNOWN_OPERATOR, UNKNOWN_TASK
+
+OPERATOR_ID = "0x" + "ab" * 32
+
+class FakeOperatorInfoService:
+    def get_operator_pubkeys_by_id(self, operator_id):
+        if operator_id == bytes.fromhex("ab" * 32):
+            return SimpleNamespace(g2_pub_key=None)
+        return None
+
+class FakeAggregator:
+    def __init__(self):
+        self.operator_info_service = FakeOperatorInfoService()
+        self.oldest_open = 0
+
+    def oldest_open_task(self):
+        return self.oldest_open
+
+def submission(task_id, operator_id=OPERATOR_ID):
+    return {"task_id": task_id, "operator_id": operator_id, "signature": {"X": 1, "Y": 2}, "verification_status": True}
+
+@pytest.fixture
+def ingress():
+    ingress = SignatureIngress(FakeAggregator(), workers=1)
+    yield ingress
+    ingress.pool.shutdown()
+
+def status(ingress, data, latest_task_index=10):
+    return ingress._precheck(data, latest_task_index)[0]
+
+def test_precheck_rejects_malformed_and_unknown_operators(ingress):
+    assert status(ingress, {"task_id": 1}) == MALFORMED
+    assert status(ingress, submission(1, operator_id="not hex")) == MALFORMED
+    assert status(ingress, submission(1, operator_id="0x" + "cd" * 32)) == UNKNOWN_OPERATOR
+    assert ingress.seen == {}
+
+def test_precheck_dedups_operator_ids_regardless_of_hex_case(ingress):
+    assert status(ingress, submission(1)) is None
+    assert status(ingress, submission(1, operator_id=OPERATOR_ID.upper().replace("0X", "0x"))) == DUPLICATE
+    assert status(ingress, submission(2)) is None
+
+def test_forget_allows_a_resubmission_and_drops_empty_entries(ingress):
+    assert status(ingress, submission(1)) is None
+    ingress.forget(submission(1))
+    assert ingress.seen == {}
+    assert status(ingress, submission(1)) is None
+    ingress.forget(submission(5))  # never seen: no entry is created
+    assert 5 not in ingress.seen
+
+def test_precheck_does_not_track_tasks_far_ahead_of_the_latest(ingress):
+    assert status(ingress, submission(10 + ingress.max_tasks_ahead), latest_task_index=10) is None
+    assert status(ingress, submission(11 + ingress.max_tasks_ahead), latest_task_index=10) == UNKNOWN_TASK
+    assert status(ingress, submission(2 ** 31), latest_task_index=10) == UNKNOWN_TASK
+    assert set(ingress.seen) == {10 + ingress.max_tasks_ahead}
+
+def test_closed_tasks_are_late_and_the_watermark_prunes_them(ingress):
+    for task_index in (1, 2, 3):
+        assert status(ingress, submission(task_index)) is None
+    ingress.close_task(2)  # task 1 is still open, so only task 2 itself is closed
+    assert status(ingress, submission(2)) == LATE
+    assert status(ingress, submission(1, operator_id="0x" + "AB" * 32)) == DUPLICATE
+    ingress.aggregator.oldest_open = 3
+    ingress.close_task(1)
+    assert ingress.closed_below == 3
+    assert ingress.closed_tasks == set()
+    assert set(ingress.seen) == {3}
+    assert status(ingress, submission(1)) == LATE
+
+class TestOldestOpenTask:
+    @pytest.fixture
+    def aggregator(self):
+        pytest.importorskip("eigensdk.services.bls_aggregation.blsagg")
+        from aggregator import Aggregator
+        aggregator = Aggregator.__new__(Aggregator)
+        aggregator.task_lock = threading.Lock()
+        aggregator.initialized_tasks = set()
+        aggregator.open_tasks = {}
+        aggregator.task_time_to_expiry = 0.1
+        aggregator.closed_below = 0
+        aggregator.task_gap = None
+        return aggregator
+
+    @staticmethod
+    def initialize(aggregator, task_index):
+        aggregator.initialized_tasks.add(task_index)
+        aggregator.open_tasks[task_index] = time.monotonic()
+
+    def test_stops_at_an_open_task(self, aggregator):
+        for task_index in (0, 1, 2):
+            self.initialize(aggregator, task_index)
+        aggregator.open_tasks.pop(0)
+        aggregator.open_tasks.pop(2)
+        assert aggregator.oldest_open_task() == 1
+        aggregator.open_tasks.pop(1)
+        assert aggregator.oldest_open_task() == 3
+
+    def test_does_not_pass_a_task_that_is_not_initialized_yet(self, aggregator):
+        # task 1 closes before the concurrent creation of task 0 has initialized it
+        self.initialize(aggregator, 1)
+        aggregator.open_tasks.pop(1)
+        assert aggregator.oldest_open_task() == 0
+        self.initialize(aggregator, 0)
+        assert aggregator.oldest_open_task() == 0
+        aggregator.open_tasks.pop(0)
+        assert aggregator.oldest_open_task() == 2
+
+    def test_passes_a_gap_once_it_could_have_expired(self, aggregator):
+        self.initialize(aggregator, 2)
+        aggregator.open_tasks.pop(2)
+        assert aggregator.oldest_open_task() == 0
+        time.sleep(0.15)
+        assert aggregator.oldest_open_task() == 3
+
+    def test_passes_expired_tasks(self, aggregator):
+        self.initialize(aggregator, 0)
+        time.sleep(0.15)
+        assert aggregator.oldest_open_task() == 1
@@ -0,0 +1,90 @@
+# test_speaker_selector.py
+from types import SimpleNamespace
+import pytest
+from speaker_selector import WorkflowSpeakerSelector, classify
+
+class Agent:
+    def __init__(self, name, functions=()):
+        self.name = name
+        self.functions = set(functions)
+
+    def can_execute_function(self, name):
+        return name in self.functions
+
+AGENTS = [
+    Agent("manager"), Agent("critic"), Agent("web-scraper", ["scrape_page"]), Agent("coder"),
+    Agent("telegram-poster", ["send_telegram_message"]),
+]
+
+def next_speaker(messages, selector=None):
+    selector = selector or WorkflowSpeakerSelector()
+    last_speaker = next(agent for agent in AGENTS if agent.name == messages[-1]["name"])
+    speaker = selector(last_speaker, SimpleNamespace(agents=AGENTS, messages=messages))
+    return speaker.name if speaker is not None else None
+
+def say(name, content):
+    return {"name": name, "content": content}
+
+def tool_call(name, function):
+    return {"name": name, "content": None, "tool_calls": [{"function": {"name": function}}]}
+
+def tool_result(name):
+    return {"name": name, "role": "tool", "content": "ok", "tool_responses": [{"content": "ok"}]}
+
+@pytest.mark.parametrize("content", [
+    "Not approved yet.", "I cannot approve this yet", "I don't approve", "This isn't approved", "It cannot be approved",
+])
+def test_negated_approval(content):
+    assert "approve" not in classify(say("critic", content))
+
+@pytest.mark.parametrize("content", [
+    "Approved, ready to post.", "LGTM", "Approved. The first draft was not ready, this one is.",
+])
+def test_approval(content):
+    assert "approve" in classify(say("critic", content))
+
+def test_classify_tool_messages_and_code():
+    assert classify(tool_call("web-scraper", "scrape_page")) == {"tool_call"}
+    assert classify(tool_result("web-scraper")) == {"tool_result"}
+    assert "code" in classify(say("manager", "```python\nprint(1)\n```"))
+
+def test_full_workflow():
+    messages = [say("manager", "Plan: research L2 news.")]
+    assert next_speaker(messages) == "critic"
+    messages.append(say("critic", "The plan looks good."))
+    assert next_speaker(messages) == "manager"
+    messages.append(say("manager", "web-scraper, please scrape the latest L2 news; then we post the summary."))
+    assert next_speaker(messages) == "web-scraper"
+    messages.append(tool_call("web-scraper", "scrape_page"))
+    assert next_speaker(messages) == "web-scraper"
+    messages.append(tool_result("web-scraper"))
+    assert next_speaker(messages) == "web-scraper"
+    messages.append(say("web-scraper", "Results: ..."))
+    assert next_speaker(messages) == "critic"
+    messages.append(say("critic", "Approved, ready to post."))
+    assert next_speaker(messages) == "telegram-poster"
+    messages.append(tool_call("telegram-poster", "send_telegram_message"))
+    messages.append(tool_result("telegram-poster"))
+    assert next_speaker(messages) == "telegram-poster"
+    messages.append(say("telegram-poster", "Posted."))
+    assert next_speaker(messages) is None
+
+def test_no_posting_before_results_are_approved():
+    messages = [say("manager", "plan"), say("critic", "Approved"), say("manager", "telegram-poster, please post")]
+    assert next_speaker(messages) == "critic"
+    messages += [say("web-scraper", "Results"), say("critic", "Approved"), say("web-scraper", "More results")]
+    assert next_speaker(messages[:-1]) == "telegram-poster"
+    # a result after the approval needs a new one
+    assert next_speaker(messages + [say("critic", "Not approved yet, too long")]) == "manager"
+
+def test_code_goes_to_the_coder():
+    assert next_speaker([say("manager", "plan"), say("critic", "```python\nprint(1)\n```")]) == "coder"
+
+def test_chat_ends_when_manager_and_critic_never_get_results():
+    selector = WorkflowSpeakerSelector(max_idle_rounds=4)
+    messages = [say("manager", "plan"), say("critic", "rework the plan"), say("manager", "new plan")]
+    assert next_speaker(messages, selector) == "critic"
+    messages.append(say("critic", "rework it again"))
+    assert next_speaker(messages, selector) is None
+    # results reset the count
+    assert next_speaker([*messages[:3], say("web-scraper", "Results"), say("critic", "more detail")], selector) == "manager"
@@ -0,0 +1,70 @@
+# test_standin_tx_manager.py
+import socket
+import pytest
+from web3 import Web3
+from eth_account import Account
+from standin_chain import StandInChain, StandInRpcServer, TASK_MANAGER_ADDRESS
+from tx_manager import TxManager
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def connect(chain):
+    port = free_port()
+    StandInRpcServer(chain).start_in_background("127.0.0.1", port)
+    web3 = Web3(Web3.HTTPProvider(f"http://127.0.0.1:{port}"))
+    with open("abis/NewsletterPromptTaskManager.json") as f:
+        task_manager = web3.eth.contract(address=TASK_MANAGER_ADDRESS, abi=f.read())
+    return web3, task_manager
+
+def create_task(task_manager, prompt):
+    return task_manager.functions.createNewTask(0, prompt, 100, b"\x00")
+
+def created_index(task_manager, receipt):
+    return task_manager.events.NewTaskCreated().process_receipt(receipt)[0]["args"]["taskIndex"]
+
+def test_ready_transactions_keep_nonce_order_per_sender():
+    chain = StandInChain(block_time=3600)
+    tx = lambda sender, nonce, gas_price: {"from": sender, "nonce": nonce, "gasPrice": gas_price}
+    # a replacement at a higher gas price must not overtake its sender's earlier nonce
+    for pending in (tx("a", 0, 1), tx("a", 1, 5), tx("a", 3, 9), tx("b", 0, 3), tx("b", 1, 2)):
+        chain.mempool[(pending["from"], pending["nonce"])] = pending
+    ready = [(pending["from"], pending["nonce"]) for pending in chain._ready_transactions()]
+    assert ready == [("b", 0), ("b", 1), ("a", 0), ("a", 1)]
+
+def test_pipelined_sends_are_mined_in_nonce_order():
+    web3, task_manager = connect(StandInChain(block_time=0.1))
+    account = Account.create()
+    tx_manager = TxManager(web3, account.key.hex(), account.address, max_in_flight=4, poll_interval=0.05)
+    futures = [tx_manager.send(create_task(task_manager, f"prompt {i}"), gas=1_000_000) for i in range(10)]
+    receipts = [future.result(timeout=tx_manager.result_timeout) for future in futures]
+    assert [receipt["status"] for receipt in receipts] == [1] * 10
+    assert [created_index(task_manager, receipt) for receipt in receipts] == list(range(10))
+    assert task_manager.functions.latestTaskNum().call() == 10
+    assert tx_manager.in_flight() == 0
+
+def test_stuck_transactions_are_resubmitted_and_still_mined_in_order():
+    chain = StandInChain(block_time=1.0)
+    web3, task_manager = connect(chain)
+    account = Account.create()
+    tx_manager = TxManager(web3, account.key.hex(), account.address, resubmit_after=0.2, poll_interval=0.05)
+    sent = []
+    sign_and_send = tx_manager._sign_and_send
+    tx_manager._sign_and_send = lambda tx: sent.append(tx["nonce"]) or sign_and_send(tx)
+    futures = [tx_manager.send(create_task(task_manager, f"prompt {i}"), gas=1_000_000) for i in range(3)]
+    receipts = [future.result(timeout=10) for future in futures]
+    assert len(sent) > 3
+    assert [created_index(task_manager, receipt) for receipt in receipts] == [0, 1, 2]
+    assert chain.nonces[account.address] == 3
+
+def test_a_transaction_that_is_never_mined_fails():
+    chain = StandInChain(block_time=3600)
+    web3, task_manager = connect(chain)
+    account = Account.create()
+    tx_manager = TxManager(web3, account.key.hex(), account.address, resubmit_after=0.05, max_resubmits=2, poll_interval=0.02)
+    future = tx_manager.send(create_task(task_manager, "prompt"), gas=1_000_000)
+    with pytest.raises(Exception, match="resubmission"):
+        future.result(timeout=5)
+    assert tx_manager.in_flight() == 0
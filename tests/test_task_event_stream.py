@@ -0,0 +1,102 @@
+# test_task_event_stream.py
+import json
+import asyncio
+import eth_abi
+from web3 import Web3
+from hexbytes import HexBytes
+from task_event_stream import TaskEventStream
+
+TASK_MANAGER_ADDRESS = "0x9E545E3C0baAB3E08CdfD552C960A1050f373042"
+NEW_TASK_CREATED = "NewTaskCreated(uint32,(uint256,string,uint32,bytes,uint32))"
+
+def task_manager():
+    with open("abis/NewsletterPromptTaskManager.json") as f:
+        abi = f.read()
+    return Web3().eth.contract(address=TASK_MANAGER_ADDRESS, abi=abi)
+
+def new_task_log(task_index, block_number, log_index=0):
+    task = (0, f"prompt {task_index}", block_number, b"\x00", 100)
+    return {
+        "address": TASK_MANAGER_ADDRESS,
+        "topics": [Web3.keccak(text=NEW_TASK_CREATED), HexBytes(eth_abi.encode(["uint32"], [task_index]))],
+        "data": HexBytes(eth_abi.encode(["(uint256,string,uint32,bytes,uint32)"], [task])),
+        "blockNumber": block_number,
+        "blockHash": HexBytes(b"\x01" * 32),
+        "transactionHash": HexBytes(block_number.to_bytes(32, "big")),
+        "transactionIndex": 0,
+        "logIndex": log_index,
+        "removed": False,
+    }
+
+class FakeEth:
+    def __init__(self, block_number, logs):
+        self.block_number = block_number
+        self.logs = logs
+        self.queries = []
+
+    def get_logs(self, log_filter):
+        self.queries.append((log_filter["fromBlock"], log_filter["toBlock"]))
+        # returned per chunk in reverse, as nothing guarantees the order across parallel chunks
+        return [log for log in reversed(self.logs) if log_filter["fromBlock"] <= log["blockNumber"] <= log_filter["toBlock"]]
+
+class FakeWeb3:
+    def __init__(self, block_number, logs):
+        self.eth = FakeEth(block_number, logs)
+
+def make_stream(tmp_path, web3, last_block=None, chunk_size=10):
+    checkpoint_path = tmp_path / "checkpoint.json"
+    if last_block is not None:
+        checkpoint_path.write_text(json.dumps({"last_processed_block": last_block}))
+    return TaskEventStream(web3, task_manager(), "ws://unused", str(checkpoint_path), chunk_size=chunk_size)
+
+def saved_checkpoint(stream):
+    with open(stream.checkpoint_path) as f:
+        return json.load(f)["last_processed_block"]
+
+def test_first_start_checkpoints_the_head_without_backfilling(tmp_path):
+    web3 = FakeWeb3(50, [new_task_log(0, 10)])
+    stream = make_stream(tmp_path, web3)
+    handled = []
+    assert asyncio.run(stream._backfill(lambda event, done: handled.append(event))) == 50
+    assert handled == []
+    assert web3.eth.queries == []
+    assert saved_checkpoint(stream) == 50
+
+def test_backfill_dispatches_missed_events_in_order_in_chunks(tmp_path):
+    logs = [new_task_log(0, 12), new_task_log(1, 12, log_index=1), new_task_log(2, 25), new_task_log(3, 31)]
+    web3 = FakeWeb3(33, logs)
+    stream = make_stream(tmp_path, web3, last_block=11)
+    handled = []
+
+    def handler(event, done):
+        handled.append(event["args"]["taskIndex"])
+        done()
+
+    assert asyncio.run(stream._backfill(handler)) == 33
+    assert handled == [0, 1, 2, 3]
+    assert sorted(web3.eth.queries) == [(12, 21), (22, 31), (32, 33)]
+    assert saved_checkpoint(stream) == 33
+
+def test_checkpoint_stops_below_the_lowest_unfinished_block(tmp_path):
+    logs = [new_task_log(0, 12), new_task_log(1, 15), new_task_log(2, 18)]
+    stream = make_stream(tmp_path, FakeWeb3(20, logs), last_block=11)
+    pending = {}
+    asyncio.run(stream._backfill(lambda event, done: pending.setdefault(event["args"]["taskIndex"], done)))
+    assert stream.last_block == 11
+
+    pending[1]()
+    assert stream.last_block == 11  # block 12 is still being processed
+    pending[0]()
+    assert saved_checkpoint(stream) == 17
+    pending[2]()
+    pending[2]()  # a second done() is ignored
+    assert saved_checkpoint(stream) == 20
+    assert not stream.unfinished
+
+def test_a_failing_handler_does_not_hold_back_the_checkpoint(tmp_path):
+    def handler(event, done):
+        raise RuntimeError("boom")
+
+    stream = make_stream(tmp_path, FakeWeb3(20, [new_task_log(0, 15)]), last_block=11)
+    asyncio.run(stream._backfill(handler))
+    assert saved_checkpoint(stream) == 20
@@ -0,0 +1,25 @@
+# test_verdict_cache.py
+from verdict_cache import VerdictCache, prompt_hash
+
+def test_put_and_get_many(tmp_path):
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"), "v1")
+    assert cache.get_many([]) == {}
+    cache.put_many([("a", True, {"length": True}), ("b", False, {"length": False})])
+    assert cache.get_many(["a", "b", "c", "a"]) == {
+        prompt_hash("a"): (True, {"length": True}),
+        prompt_hash("b"): (False, {"length": False}),
+    }
+
+def test_put_replaces_an_existing_verdict(tmp_path):
+    cache = VerdictCache(str(tmp_path / "verdicts.sqlite"), "v1")
+    cache.put_many([("a", True, {})])
+    cache.put_many([("a", False, {"keyword": False})])
+    assert cache.get_many(["a"]) == {prompt_hash("a"): (False, {"keyword": False})}
+
+def test_verdicts_persist_for_the_same_policy_only(tmp_path):
+    path = str(tmp_path / "nested" / "verdicts.sqlite")
+    VerdictCache(path, "v1").put_many([("a", True, {})])
+    assert VerdictCache(path, "v1").get_many(["a"]) == {prompt_hash("a"): (True, {})}
+    assert VerdictCache(path, "v2").get_many(["a"]) == {}
+    # opening with v2 dropped the v1 verdicts
+    assert VerdictCache(path, "v1").get_many(["a"]) == {}
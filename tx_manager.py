@@ -0,0 +1,157 @@
+# tx_manager.py
+import logging
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import List
+from web3 import Web3
+from web3.exceptions import TransactionNotFound
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class PendingTx:
+    nonce: int
+    tx: dict
+    tx_hashes: List[bytes]
+    submitted_at: float
+    first_submitted_at: float = 0.0
+    resubmits: int = 0
+    future: Future = field(default_factory=Future)
+
+class TxFailed(Exception):
+    """A transaction that was given up on without a receipt"""
+
+class TxManager:
+    """Signs and sends transactions with locally assigned nonces, keeping several in flight at once.
+
+    Receipts are tracked on a background thread; transactions that stay unmined for
+    `resubmit_after` seconds are re-sent with the same nonce and a bumped gas price. A
+    transaction still unmined after `max_age` seconds or `max_resubmits` resubmissions fails
+    its future with TxFailed, so callers waiting on `result(timeout)` are never stuck.
+    """
+    def __init__(self, web3, private_key, address, max_in_flight=16, resubmit_after=30, max_age=300,
+                 max_resubmits=5, fee_bump_percent=15, gas_price=None, max_gas_price=None, poll_interval=0.5):
+        self.web3 = web3
+        self.private_key = private_key
+        self.address = address
+        self.resubmit_after = resubmit_after
+        self.max_age = max_age
+        self.max_resubmits = max_resubmits
+        # for callers' result(timeout): the tracker itself fails futures shortly after max_age
+        self.result_timeout = max_age + resubmit_after
+        self.fee_bump_percent = fee_bump_percent
+        self.gas_price = gas_price or Web3.to_wei(20, "gwei")
+        self.max_gas_price = max_gas_price
+        self.poll_interval = poll_interval
+        self.chain_id = web3.eth.chain_id
+        self._nonce = web3.eth.get_transaction_count(address, "pending")
+        self._nonce_lock = threading.Lock()
+        self._in_flight = threading.BoundedSemaphore(max_in_flight)
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._tracker = threading.Thread(target=self._track_receipts, daemon=True)
+        self._tracker.start()
+
+    def send(self, contract_function, gas):
+        """Sends a contract call and returns a Future that resolves to its receipt"""
+        self._in_flight.acquire()
+        try:
+            # nonces are assigned and broadcast under one lock so they always reach the node in order
+            with self._nonce_lock:
+                tx = contract_function.build_transaction({
+                    "from": self.address,
+                    "gas": gas,
+                    "gasPrice": self.gas_price,
+                    "nonce": self._nonce,
+                    "chainId": self.chain_id,
+                })
+                try:
+                    tx_hash = self._sign_and_send(tx)
+                except Exception:
+                    self.resync_nonce()
+                    raise
+                self._nonce += 1
+        except Exception:
+            self._in_flight.release()
+            raise
+        now = time.time()
+        pending = PendingTx(nonce=tx["nonce"], tx=tx, tx_hashes=[tx_hash], submitted_at=now, first_submitted_at=now)
+        with self._pending_lock:
+            self._pending[pending.nonce] = pending
+        logger.debug(f"Sent tx {tx_hash.hex()} with nonce {pending.nonce}")
+        return pending.future
+
+    def resync_nonce(self):
+        self._nonce = self.web3.eth.get_transaction_count(self.address, "pending")
+
+    def in_flight(self):
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _sign_and_send(self, tx):
+        signed_tx = self.web3.eth.account.sign_transaction(tx, private_key=self.private_key)
+        return self.web3.eth.send_raw_transaction(signed_tx.raw_transaction)
+
+    def _track_receipts(self):
+        while True:
+            with self._pending_lock:
+                pending_txs = list(self._pending.values())
+            for pending in pending_txs:
+                try:
+                    receipt = self._find_receipt(pending)
+                    if receipt is not None:
+                        self._complete(pending, receipt)
+                    elif time.time() - pending.first_submitted_at > self.max_age:
+                        self._fail(pending, f"not mined within {self.max_age}s")
+                    elif time.time() - pending.submitted_at > self.resubmit_after:
+                        self._resubmit(pending)
+                except Exception as e:
+                    logger.error(f"Tracking tx with nonce {pending.nonce} failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _find_receipt(self, pending):
+        # a replaced transaction may still be the one that gets mined, so check every hash we sent
+        for tx_hash in reversed(pending.tx_hashes):
+            try:
+                return self.web3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                continue
+        return None
+
+    def _complete(self, pending, receipt):
+        with self._pending_lock:
+            self._pending.pop(pending.nonce, None)
+        self._in_flight.release()
+        if receipt["status"] != 1:
+            logger.warning(f"Tx {receipt['transactionHash'].hex()} with nonce {pending.nonce} reverted")
+        pending.future.set_result(receipt)
+
+    def _fail(self, pending, reason):
+        with self._pending_lock:
+            if self._pending.pop(pending.nonce, None) is None:
+                return
+        self._in_flight.release()
+        logger.error(f"Giving up on tx with nonce {pending.nonce}: {reason}")
+        # the nonce may never be mined now, so later transactions would queue up behind it
+        with self._nonce_lock:
+            self.resync_nonce()
+        pending.future.set_exception(TxFailed(f"Tx with nonce {pending.nonce} failed: {reason}"))
+
+    def _resubmit(self, pending):
+        # counted before sending, so a resubmission the node keeps refusing also runs out
+        if pending.resubmits >= self.max_resubmits:
+            self._fail(pending, f"still unmined after {pending.resubmits} resubmission attempts")
+            return
+        pending.resubmits += 1
+        gas_price = pending.tx["gasPrice"] * (100 + self.fee_bump_percent) // 100
+        if self.max_gas_price is not None and gas_price > self.max_gas_price:
+            logger.warning(f"Tx with nonce {pending.nonce} is stuck but already at the gas price cap")
+            pending.submitted_at = time.time()
+            return
+        pending.tx = {**pending.tx, "gasPrice": gas_price}
+        tx_hash = self._sign_and_send(pending.tx)
+        pending.tx_hashes.append(tx_hash)
+        pending.submitted_at = time.time()
+        logger.info(f"Resubmitted stuck tx with nonce {pending.nonce} at gas price {gas_price}: {tx_hash.hex()}")
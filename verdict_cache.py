@@ -0,0 +1,58 @@
+# verdict_cache.py
+import os
+import json
+import sqlite3
+import hashlib
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def prompt_hash(prompt):
+    return hashlib.sha256(prompt.encode()).hexdigest()
+
+class VerdictCache:
+    """Persistent policy verdicts keyed by sha256(prompt) and the policy version.
+
+    Agents resubmit the same manager instructions every session, so their verdict is looked
+    up instead of re-evaluated. Verdicts of any other policy version are dropped on open,
+    so changing the policy config invalidates the cache.
+    """
+    def __init__(self, path, policy_version):
+        self.policy_version = policy_version
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.db:
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS verdicts ("
+                "prompt_hash TEXT, policy_version TEXT, approved INTEGER, rules TEXT, "
+                "PRIMARY KEY (prompt_hash, policy_version))"
+            )
+            dropped = self.db.execute("DELETE FROM verdicts WHERE policy_version != ?", (policy_version,)).rowcount
+        if dropped:
+            logger.info(f"Policy changed, dropped {dropped} cached verdicts")
+
+    def get_many(self, prompts):
+        """Returns {prompt hash: (approved, rules)} for the prompts that have a cached verdict"""
+        hashes = list({prompt_hash(prompt) for prompt in prompts})
+        if not hashes:
+            return {}
+        placeholders = ",".join("?" * len(hashes))
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT prompt_hash, approved, rules FROM verdicts "
+                f"WHERE policy_version = ? AND prompt_hash IN ({placeholders})",
+                [self.policy_version, *hashes],
+            ).fetchall()
+        return {digest: (bool(approved), json.loads(rules)) for digest, approved, rules in rows}
+
+    def put_many(self, verdicts):
+        """verdicts: [(prompt, approved, rules)]"""
+        rows = [
+            (prompt_hash(prompt), self.policy_version, int(approved), json.dumps(rules))
+            for prompt, approved, rules in verdicts
+        ]
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?, ?)", rows)